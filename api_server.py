@@ -1,15 +1,46 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Depends, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-import pandas as pd
-import io
-from typing import Dict, Any
+from starlette.background import BackgroundTask
+import asyncio
+import contextlib
+import os
+import re
+import tempfile
+import time
+import uuid
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import numpy as np
-import json
 from backend.sklearn_comparison import SklearnComparison
+from backend.training_worker import TrainingWorkerPool
+from backend.session_registry import Session, SessionRegistry
+from backend.job_manager import JobManager, TrainingJob
+from backend.csv_ingest import spool_upload, read_csv_columns
+from backend.csv_loader import CSVLoader, CleaningPipeline
+from backend.dataset_cache import DatasetCache
+from backend import columnar_transport
+from backend.plot_aggregation import PlotPyramid
+from backend.serialization import (
+    FastJSONResponse, JSONCompressionMiddleware, dumps_text, epoch_json, loads, sse_event, websocket_message
+)
+from backend.event_channel import CoalescingEventBuffer
+from backend.model_storage import ModelStorage, DB_FILE, DEFAULT_PAGE_SIZE
+from backend import bulk_predict
+from backend.model_cache import ModelCache
+from backend import instrumentation
+from backend.instrumentation import STREAM_BYTES_TOTAL, STREAM_EVENTS_TOTAL, observe_stage, stage_timer, timed
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Flush queued model writes and stop the worker pool on shutdown."""
+    yield
+    if _model_storage is not None:
+        _model_storage.close()
+    training_pool.shutdown()
+
 
-app = FastAPI(title="Linear Regression API", version="1.0.0")
+app = FastAPI(title="Linear Regression API", version="1.0.0", lifespan=lifespan)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -23,8 +54,133 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global storage for session data
-session_data: Dict[str, Any] = {}
+# gzip/brotli for large JSON bodies (streamed responses are left as-is)
+app.add_middleware(JSONCompressionMiddleware)
+
+# Per-user session storage, bounded by a memory budget (LRU spill/evict)
+SESSION_COOKIE = "session_id"
+SESSION_HEADER = "X-Session-ID"
+session_registry = SessionRegistry(
+    memory_budget_bytes=int(float(os.environ.get("SESSION_MEMORY_BUDGET_MB", "1024")) * 1024 * 1024),
+    spill_dir=os.environ.get("SESSION_SPILL_DIR") or None,
+    max_sessions=int(os.environ.get("SESSION_MAX_COUNT", "10000"))
+)
+
+# Session IDs are issued by the server (uuid4 hex); anything else is not trusted
+SESSION_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+def valid_session_id(session_id: Optional[str]) -> Optional[str]:
+    """The session ID if it has the form of a server-issued ID, else None."""
+    return session_id if session_id and SESSION_ID_PATTERN.fullmatch(session_id) else None
+
+
+# Directory for spooled uploads (default: system temp dir)
+UPLOAD_SPOOL_DIR = os.environ.get("UPLOAD_SPOOL_DIR") or None
+
+# Content-addressed cache of cleaned datasets (memory-mapped on hits)
+dataset_cache = DatasetCache(
+    cache_dir=os.environ.get("DATASET_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "lr_dataset_cache"),
+    max_bytes=int(float(os.environ.get("DATASET_CACHE_MAX_MB", "2048")) * 1024 * 1024)
+)
+
+# Training jobs, addressable by ID for pause/resume/stop/status
+job_manager = JobManager()
+
+# Live values read on every /api/metrics scrape
+instrumentation.registry.callback("lr_active_jobs", "Training jobs running, paused or stopping.",
+                                  lambda: job_manager.active_count)
+instrumentation.registry.callback("lr_sessions", "Sessions held by the registry.",
+                                  lambda: session_registry.stats()["sessions"])
+instrumentation.registry.callback("lr_session_memory_bytes", "Memory held by session data.",
+                                  lambda: session_registry.total_bytes)
+instrumentation.registry.callback("lr_session_memory_budget_bytes", "Session memory budget.",
+                                  lambda: session_registry.memory_budget_bytes)
+instrumentation.registry.callback("lr_dataset_cache_hits_total", "Dataset cache hits.",
+                                  lambda: dataset_cache.hits, kind="counter")
+instrumentation.registry.callback("lr_dataset_cache_misses_total", "Dataset cache misses.",
+                                  lambda: dataset_cache.misses, kind="counter")
+
+# Pending epoch updates per WebSocket client before they are coalesced
+WS_MAX_PENDING_EPOCHS = int(os.environ.get("WS_MAX_PENDING_EPOCHS", "32"))
+
+# Largest hyperparameter grid accepted by /api/sweep
+MAX_SWEEP_CONFIGS = int(os.environ.get("MAX_SWEEP_CONFIGS", "10000"))
+
+# Saved models (SQLite), opened on first use
+MODEL_DB_FILE = os.environ.get("MODEL_DB_FILE") or DB_FILE
+_model_storage: Optional[ModelStorage] = None
+
+
+def get_model_storage() -> ModelStorage:
+    """The shared model storage, created on first use."""
+    global _model_storage
+    if _model_storage is None:
+        _model_storage = ModelStorage(MODEL_DB_FILE)
+    return _model_storage
+
+
+def load_predictor(model_id: str) -> Optional[bulk_predict.LinearPredictor]:
+    """Load a saved model's parameters from storage (None if it does not exist)."""
+    stored = get_model_storage().get_model(model_id)
+    if stored is None:
+        return None
+    return bulk_predict.LinearPredictor(stored['theta0'], stored['coefficients'], stored['x_columns'])
+
+
+# Hot saved models, so repeat predictions never hit SQLite
+model_cache = ModelCache(
+    load_predictor,
+    max_entries=int(os.environ.get("MODEL_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.environ.get("MODEL_CACHE_TTL_SECONDS", "300"))
+)
+instrumentation.registry.callback("lr_model_cache_hits_total", "Saved-model cache hits.",
+                                  lambda: model_cache.hits, kind="counter")
+instrumentation.registry.callback("lr_model_cache_misses_total", "Saved-model cache misses.",
+                                  lambda: model_cache.misses, kind="counter")
+
+
+def get_session(request: Request, response: Response) -> Iterator[Session]:
+    """
+    Resolve the caller's session from the X-Session-ID header or session cookie.
+    
+    The session is held for the request, so another request's budget enforcement
+    cannot spill or evict it while the handler is using it. IDs not issued by the
+    server are replaced by a new session. FastAPI runs this (sync) dependency in
+    its thread pool, so restoring a spilled session does not block the event loop.
+    """
+    session_id = valid_session_id(request.headers.get(SESSION_HEADER) or request.cookies.get(SESSION_COOKIE))
+    if not session_id:
+        session_id = uuid.uuid4().hex
+    response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite="lax")
+    response.headers[SESSION_HEADER] = session_id
+    session = session_registry.acquire(session_id)
+    try:
+        yield session
+    finally:
+        session_registry.release(session)
+
+
+def json_response(content: Any, response: Optional[Response] = None) -> FastJSONResponse:
+    """
+    Serialize an endpoint result with the fast NumPy-aware encoder.
+    
+    FastAPI drops headers set on the dependency response when an endpoint returns
+    a Response, so the session cookie/header are copied over from `response`.
+    """
+    result = FastJSONResponse(content)
+    if response is not None:
+        result.raw_headers.extend(
+            (key, value) for key, value in response.raw_headers
+            if key not in (b"content-length", b"content-type")
+        )
+    return result
+
+# Pool that runs training off the event loop ("thread" or "process")
+training_pool = TrainingWorkerPool(
+    mode=os.environ.get("TRAINING_EXECUTOR", "thread"),
+    max_workers=int(os.environ["TRAINING_WORKERS"]) if os.environ.get("TRAINING_WORKERS") else None
+)
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -34,104 +190,680 @@ async def root() -> HTMLResponse:
         return HTMLResponse(content=f.read())
 
 
+def parse_x_columns(x_column: Optional[str], x_columns: Optional[List[str]]) -> List[str]:
+    """Feature column names from x_columns (repeated or comma-separated) or the single x_column."""
+    names = [name.strip() for value in (x_columns or []) for name in value.split(',') if name.strip()]
+    if not names and x_column:
+        names = [x_column]
+    if not names:
+        raise HTTPException(status_code=400, detail="x_column or x_columns is required")
+    if len(set(names)) != len(names):
+        raise HTTPException(status_code=400, detail="x_columns must not contain duplicates")
+    return names
+
+
+async def clean_with_pipeline(
+    pipeline: CleaningPipeline, cleaning_options: Dict[str, Any], all_columns: List[str]
+) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+    """
+    Clean a parsed dataset with the given options, reusing the pipeline's cached stages.
+    
+    Returns:
+        Tuple of (X_clean, y_clean, meta) as stored in the dataset cache
+    """
+    feature_columns, y_column = cleaning_options['x_columns'], cleaning_options['y_column']
+    df_clean = await training_pool.run_local(
+        pipeline.clean, cleaning_options['remove_duplicates'], cleaning_options['remove_outliers'],
+        cleaning_options['handle_missing'], cleaning_options['remove_strings']
+    )
+    # Features as one C-contiguous n×d matrix (a plain vector for a single feature)
+    if len(feature_columns) > 1:
+        X_clean = np.ascontiguousarray(df_clean[feature_columns].to_numpy(dtype=np.float64))
+    else:
+        X_clean = df_clean[feature_columns[0]].to_numpy(dtype=np.float64)
+    y_clean = df_clean[y_column].to_numpy(dtype=np.float64)
+    meta = {
+        "x_column": feature_columns[0],
+        "x_columns": feature_columns,
+        "y_column": y_column,
+        "original_shape": [pipeline.original_rows, len(all_columns)],
+        "all_columns": all_columns,
+        "cleaning_summary": pipeline.get_cleaning_summary(df_clean)
+    }
+    return X_clean, y_clean, meta
+
+
+async def store_dataset(session_data: Session, X_clean: np.ndarray, y_clean: np.ndarray, meta: Dict[str, Any],
+                  filename: Optional[str], dataset_key: str, cleaning_options: Dict[str, Any],
+                  transport: str) -> Dict[str, Any]:
+    """Make a cleaned dataset the session's current data and build the /api/process-data response."""
+    x_column, feature_columns, y_column = (
+        cleaning_options['x_column'], cleaning_options['x_columns'], cleaning_options['y_column']
+    )
+    
+    # Single-feature views (training, plots) use the first feature column
+    if X_clean.ndim > 1:
+        x_clean = np.ascontiguousarray(X_clean[:, 0])
+        session_data['X_clean'] = X_clean
+    else:
+        x_clean = X_clean
+        session_data.pop('X_clean', None)
+    
+    # Store results
+    session_data['columns'] = meta['all_columns']
+    session_data['filename'] = filename
+    session_data['x_clean'] = x_clean
+    session_data['y_clean'] = y_clean
+    session_data['dataset_key'] = dataset_key
+    session_data['cleaning_options'] = cleaning_options
+    await training_pool.run_local(session_registry.enforce_budget, keep=session_data.session_id)
+    
+    # Create the response
+    response_data = {
+        "message": "Data processed successfully!",
+        "file_info": {"filename": filename, "original_shape": meta['original_shape'], "cleaned_shape": [len(x_clean), len(feature_columns) + 1]},
+        "columns": {"x_column": x_column, "x_columns": feature_columns, "y_column": y_column, "all_columns": meta['all_columns']},
+        "cleaning_summary": meta['cleaning_summary'],
+        "statistics": {
+            "x_mean": float(np.mean(x_clean)),
+            "y_mean": float(np.mean(y_clean)),
+            "x_std": float(np.std(x_clean, ddof=1)),
+            "y_std": float(np.std(y_clean, ddof=1))
+        },
+        "model_summary": {
+            "data_quality": "clean",
+            "total_features": len(feature_columns) + 1,
+            "data_type": "numerical",
+            "ready_for_training": True
+        },
+        "next_step": "ready_for_training"
+    }
+    
+    if transport == "binary":
+        # Only metadata and a handle; the columns are fetched as raw buffers
+        response_data["dataset"] = {
+            "dataset_id": dataset_key,
+            "rows": len(x_clean),
+            "columns": feature_columns + [y_column],
+            "columns_url": f"/api/datasets/{dataset_key}/columns"
+        }
+    else:
+        response_data["statistics"]["x_data"] = x_clean.tolist()
+        response_data["statistics"]["y_data"] = y_clean.tolist()
+    
+    return response_data
+
+
 @app.post("/api/process-data")
 async def process_data(
+    response: Response,
     file: UploadFile = File(...),
-    x_column: str = Form(...),
+    x_column: Optional[str] = Form(None),
     y_column: str = Form(...),
+    x_columns: List[str] = Form([]),
     remove_duplicates: bool = Form(True),
     remove_outliers: bool = Form(False),
     handle_missing: str = Form("remove"),
-    remove_strings: bool = Form(True)
-):
-    """Process CSV data with cleaning options"""
+    remove_strings: bool = Form(True),
+    transport: str = Form("json"),
+    session_data: Session = Depends(get_session)
+) -> FastJSONResponse:
+    """
+    Process CSV data with cleaning options.
+    
+    With transport="binary" the cleaned points are not embedded in the JSON
+    response; it carries a dataset handle for /api/datasets/{id}/columns instead.
+    
+    For multivariate data pass several feature columns as x_columns (repeated
+    form fields or one comma-separated value); x_column is then the first of them.
+    """
     try:
-        print(f"📁 File: {file.filename}, X: {x_column}, Y: {y_column}")
-        
-        # Read CSV
-        content = await file.read()
-        df = pd.read_csv(io.StringIO(content.decode('utf-8')))
-        
-        # Validate columns
-        if x_column not in df.columns or y_column not in df.columns:
-            raise HTTPException(status_code=400, detail="Columns not found")
-        
-        # Store data
-        session_data['csv_data'] = df
-        session_data['columns'] = df.columns.tolist()
-        session_data['filename'] = file.filename
-        
-        # Clean data using CSVLoader
-        from backend.csv_loader import CSVLoader
-        loader = CSVLoader(x_column, y_column)
-        df_clean = loader.clean_data(df, remove_duplicates, remove_outliers, handle_missing, remove_strings)
-        
-        # Get statistics for visualization
-        statistics = loader.get_statistics(df_clean)
-        
-        # Store results
-        session_data['cleaned_data'] = df_clean
-        session_data['csv_loader'] = loader
-        session_data['cleaning_options'] = {
-            'x_column': x_column, 'y_column': y_column,
+        feature_columns = parse_x_columns(x_column, x_columns)
+        x_column = feature_columns[0]
+        print(f"📁 File: {file.filename}, X: {', '.join(feature_columns)}, Y: {y_column}")
+        
+        cleaning_options = {
+            'x_column': x_column, 'x_columns': feature_columns, 'y_column': y_column,
             'remove_duplicates': remove_duplicates, 'remove_outliers': remove_outliers,
             'handle_missing': handle_missing, 'remove_strings': remove_strings
         }
         
-        # Create the response
-        response_data = {
-            "message": "Data processed successfully!",
-            "file_info": {"filename": file.filename, "original_shape": df.shape, "cleaned_shape": df_clean.shape},
-            "columns": {"x_column": x_column, "y_column": y_column, "all_columns": df.columns.tolist()},
-            "cleaning_summary": loader.get_cleaning_summary(df, df_clean),
-            "statistics": {
-                "x_data": df_clean[x_column].values.tolist(),
-                "y_data": df_clean[y_column].values.tolist(),
-                "x_mean": float(df_clean[x_column].mean()),
-                "y_mean": float(df_clean[y_column].mean()),
-                "x_std": float(df_clean[x_column].std()),
-                "y_std": float(df_clean[y_column].std())
-            },
-            "model_summary": {
-                "data_quality": "clean",
-                "total_features": 2,
-                "data_type": "numerical",
-                "ready_for_training": True
-            },
-            "next_step": "ready_for_training"
-        }
+        # Copy the received upload to disk in chunks, hashing it on the way
+        hasher = dataset_cache.new_hasher()
+        upload_start = time.perf_counter()
+        upload = await spool_upload(file, spool_dir=UPLOAD_SPOOL_DIR, on_chunk=hasher.update)
+        upload_seconds = time.perf_counter() - upload_start
+        content_hash = hasher.hexdigest()
+        dataset_key = dataset_cache.make_key(content_hash, x_column, y_column, cleaning_options)
+        cleaning_source = {'content_hash': content_hash, 'x_columns': feature_columns, 'y_column': y_column}
+        
+        try:
+            with timed("dataset_cache_lookup") as timer:
+                cached = await training_pool.run_local(dataset_cache.get, dataset_key)
+                timer.rows = len(cached['y']) if cached is not None else None
+            if cached is not None:
+                # Cache hit: memory-map the cleaned arrays, skipping parsing and cleaning
+                print(f"⚡ Dataset cache hit: {dataset_key[:12]}")
+                X_clean, y_clean, meta = cached['x'], cached['y'], cached['meta']
+                if session_data.get('cleaning_source') != cleaning_source:
+                    session_data.pop('cleaning_pipeline', None)
+            else:
+                print(f"📦 Upload spooled: {upload.size} bytes (compression: {upload.compression or 'none'})")
+                
+                # Parse only the X/Y columns off the event loop
+                try:
+                    with timed("csv_parse") as timer:
+                        df, all_columns = await training_pool.run(
+                            read_csv_columns, upload.path, feature_columns + [y_column], upload.compression
+                        )
+                        timer.rows = len(df)
+                except KeyError:
+                    raise HTTPException(status_code=400, detail="Columns not found")
+                except ValueError as e:
+                    # Unsupported compression or a malformed CSV
+                    raise HTTPException(status_code=400, detail=str(e))
+                
+                # Clean data through a stage-cached pipeline, kept for /api/reclean
+                loader = CSVLoader(feature_columns, y_column)
+                with timed("cleaning", len(df)):
+                    pipeline = await training_pool.run_local(loader.pipeline, df)
+                    X_clean, y_clean, meta = await clean_with_pipeline(pipeline, cleaning_options, all_columns)
+                with timed("dataset_cache_store", len(y_clean)):
+                    await training_pool.run_local(dataset_cache.put, dataset_key, X_clean, y_clean, meta)
+                session_data['cleaning_pipeline'] = pipeline
+        finally:
+            upload.remove()
+        observe_stage("upload_receive", upload_seconds, meta['original_shape'][0])
+        session_data['cleaning_source'] = cleaning_source
+        
+        response_data = await store_dataset(
+            session_data, X_clean, y_clean, meta, file.filename, dataset_key, cleaning_options, transport
+        )
         
         # Debug print
         print("=== RESPONSE DATA ===")
-        print(f"X data length: {len(response_data['statistics']['x_data'])}")
-        print(f"Y data length: {len(response_data['statistics']['y_data'])}")
+        print(f"Transport: {transport}, rows: {len(y_clean)}, features: {len(feature_columns)}")
         print(f"X mean: {response_data['statistics']['x_mean']}")
         print(f"Y mean: {response_data['statistics']['y_mean']}")
         print("====================")
         
-        return response_data
+        with timed("serialization", len(y_clean)):
+            return json_response(response_data, response)
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error: {e}")
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
 
 
+@app.post("/api/reclean")
+async def reclean(
+    response: Response,
+    remove_duplicates: bool = Form(True),
+    remove_outliers: bool = Form(False),
+    handle_missing: str = Form("remove"),
+    remove_strings: bool = Form(True),
+    transport: str = Form("json"),
+    session_data: Session = Depends(get_session)
+) -> FastJSONResponse:
+    """
+    Clean the session's uploaded data again with other cleaning options.
+    
+    Takes the cleaning options of /api/process-data and returns the same response,
+    without re-uploading the file. The result comes from the dataset cache or from
+    the session's cleaning pipeline, which recomputes only the stages downstream
+    of the options that changed; "stages_recomputed" lists them.
+    """
+    try:
+        source = session_data.get('cleaning_source')
+        if source is None or 'cleaning_options' not in session_data:
+            raise HTTPException(status_code=400, detail="No data uploaded")
+        
+        cleaning_options = {
+            **session_data['cleaning_options'],
+            'remove_duplicates': remove_duplicates, 'remove_outliers': remove_outliers,
+            'handle_missing': handle_missing, 'remove_strings': remove_strings
+        }
+        x_column, y_column = cleaning_options['x_column'], cleaning_options['y_column']
+        dataset_key = dataset_cache.make_key(source['content_hash'], x_column, y_column, cleaning_options)
+        
+        with timed("dataset_cache_lookup") as timer:
+            cached = await training_pool.run_local(dataset_cache.get, dataset_key)
+            timer.rows = len(cached['y']) if cached is not None else None
+        if cached is not None:
+            print(f"⚡ Dataset cache hit: {dataset_key[:12]}")
+            X_clean, y_clean, meta = cached['x'], cached['y'], cached['meta']
+            stages_recomputed = []
+        else:
+            pipeline = session_data.get('cleaning_pipeline')
+            if pipeline is None:
+                raise HTTPException(status_code=409, detail="Parsed data is no longer available; upload the file again")
+            with timed("cleaning", pipeline.original_rows):
+                X_clean, y_clean, meta = await clean_with_pipeline(pipeline, cleaning_options, session_data['columns'])
+            stages_recomputed = list(pipeline.last_recomputed)
+            with timed("dataset_cache_store", len(y_clean)):
+                await training_pool.run_local(dataset_cache.put, dataset_key, X_clean, y_clean, meta)
+        
+        response_data = await store_dataset(
+            session_data, X_clean, y_clean, meta, session_data.get('filename'), dataset_key, cleaning_options, transport
+        )
+        response_data["message"] = "Data re-cleaned successfully!"
+        response_data["stages_recomputed"] = stages_recomputed
+        
+        with timed("serialization", len(y_clean)):
+            return json_response(response_data, response)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        raise HTTPException(status_code=500, detail=f"Re-cleaning failed: {str(e)}")
+
+
+
+def get_dataset_columns_or_404(dataset_id: str, session_data: Session) -> Dict[str, np.ndarray]:
+    """Cleaned columns of a dataset, from the session or the dataset cache."""
+    if session_data.get('dataset_key') == dataset_id:
+        options = session_data['cleaning_options']
+        features = session_data.get('X_clean', session_data['x_clean'])
+        x_columns, y_column = options.get('x_columns', [options['x_column']]), options['y_column']
+        y = session_data['y_clean']
+    else:
+        cached = dataset_cache.get(dataset_id)
+        if cached is None:
+            raise HTTPException(status_code=404, detail=f"Dataset not found: {dataset_id}")
+        meta = cached['meta']
+        features, y = cached['x'], cached['y']
+        x_columns, y_column = meta.get('x_columns', [meta.get('x_column', 'x')]), meta.get('y_column', 'y')
+    
+    if features.ndim == 1:
+        columns = {x_columns[0]: features}
+    else:
+        columns = {name: features[:, j] for j, name in enumerate(x_columns)}
+    columns[y_column] = y
+    return columns
+
+
+@app.get("/api/datasets/{dataset_id}/columns")
+async def get_dataset_columns(
+    dataset_id: str,
+    columns: str = "",
+    dtype: str = "float64",
+    format: str = "raw",
+    session_data: Session = Depends(get_session)
+):
+    """
+    Serve cleaned dataset columns in a binary columnar format.
+    
+    format="raw" streams the selected columns back to back as little-endian
+    Float32/Float64 buffers (layout in the X-Columns/X-Rows/X-Dtype headers);
+    format="arrow" returns an Arrow IPC stream.
+    """
+    if dtype not in columnar_transport.DTYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported dtype: {dtype}")
+    
+    dataset = get_dataset_columns_or_404(dataset_id, session_data)
+    try:
+        names = columnar_transport.parse_column_names(columns, list(dataset.keys()))
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    selected = {name: dataset[name] for name in names}
+    
+    if format == "arrow":
+        if not columnar_transport.ARROW_AVAILABLE:
+            raise HTTPException(status_code=501, detail="Arrow transport requires pyarrow")
+        body = await training_pool.run(columnar_transport.arrow_ipc_bytes, selected, dtype)
+        return Response(content=body, media_type=columnar_transport.ARROW_MEDIA_TYPE)
+    if format != "raw":
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    
+    return StreamingResponse(
+        columnar_transport.raw_column_chunks(selected, dtype),
+        media_type=columnar_transport.RAW_MEDIA_TYPE,
+        headers=columnar_transport.raw_headers(selected, dtype)
+    )
+
 
 # Add this debug endpoint to check what's in session_data
 @app.get("/api/debug")
-async def debug_session():
+async def debug_session(response: Response, session_data: Session = Depends(get_session)) -> FastJSONResponse:
     """Debug: Check what's in session_data"""
     cleaning_options = session_data.get('cleaning_options', {})
-    return {
+    return json_response({
         "session_keys": list(session_data.keys()),
-        "has_cleaned_data": 'cleaned_data' in session_data,
+        "has_cleaned_data": 'x_clean' in session_data,
         "cleaning_options": cleaning_options,
         "x_column": cleaning_options.get('x_column', 'NOT FOUND'),
         "y_column": cleaning_options.get('y_column', 'NOT FOUND'),
-        "data_shape": session_data.get('cleaned_data', {}).shape if 'cleaned_data' in session_data else 'No data'
+        "data_shape": [len(session_data['x_clean']), 2] if 'x_clean' in session_data else 'No data',
+        "dataset_cache": dataset_cache.stats(),
+        "model_cache": model_cache.stats()
+    }, response)
+
+
+@app.get("/api/metrics")
+async def metrics() -> PlainTextResponse:
+    """
+    Server metrics in the Prometheus text format.
+    
+    lr_stage_duration_seconds is a histogram per processing stage (upload_receive,
+    csv_parse, cleaning, model_init, split, epoch_compute, metrics, serialization,
+    sse_send, ...) labelled with the dataset size as an order of magnitude of rows,
+    so the dominant stage can be read off per dataset size. Stages timed inside the
+    model run in the training workers; with TRAINING_EXECUTOR=process those
+    observations stay in the worker processes and are not reported here.
+    """
+    return PlainTextResponse(instrumentation.registry.render(), media_type=instrumentation.CONTENT_TYPE)
+
+
+def build_final_data(model, x_test: np.ndarray, y_test: np.ndarray,
+                     x_data: np.ndarray, y_data: np.ndarray) -> Dict[str, Any]:
+    """Build the final training payload (test metrics, parameters and sklearn comparison)."""
+    # Final results
+    test_predictions = model.predict(x_test)
+    test_mse = np.mean((test_predictions - y_test) ** 2)
+    
+    ss_res = np.sum((y_test - test_predictions) ** 2)
+    ss_tot = np.sum((y_test - np.mean(y_test)) ** 2)
+    test_r2 = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
+    
+    final_params = model.get_original_scale_parameters()
+    
+    # Get final training metrics
+    final_metrics = model.get_latest_metrics()
+    metrics_summary = model.get_model_summary()
+    
+    # Calculate sklearn comparison during training
+    print("🔍 Calculating sklearn comparison during training...")
+    try:
+        sklearn_comp = SklearnComparison()
+        
+        # Calculate sklearn results on the full dataset
+        sklearn_results = sklearn_comp.calculate_sklearn_results(x_data, y_data)
+        
+        print("✅ Sklearn comparison completed successfully")
+        print(f"🔍 Sklearn results: {sklearn_results}")
+        
+    except Exception as e:
+        print(f"⚠️ Warning: Sklearn comparison failed: {e}")
+        print(f"⚠️ Error details: {type(e).__name__}: {str(e)}")
+        import traceback
+        print(f"⚠️ Full traceback: {traceback.format_exc()}")
+        sklearn_results = None
+    
+    return {
+        "training_complete": True,
+        "final_theta0": final_params['theta0'],
+        "final_theta1": final_params['theta1'],
+        "equation": f"y = {final_params['theta0']:.4f} + {final_params['theta1']:.4f} * x",
+        "test_mse": test_mse,
+        "test_r2": test_r2,
+        "x_range": [float(np.min(x_data)), float(np.max(x_data))],
+        "y_range": [float(np.min(y_data)), float(np.max(y_data))],
+        # Add final performance metrics
+        "final_rmse": final_metrics.get('rmse', 0.0),
+        "final_mae": final_metrics.get('mae', 0.0),
+        "final_r2": final_metrics.get('r2', 0.0),
+        "metrics_summary": metrics_summary,
+        # Include sklearn comparison results
+        "sklearn_comparison": {
+            "sklearn_results": sklearn_results,
+            "status": "success" if sklearn_results else "failed"
+        }
     }
 
 
+# Training parameters shared by the HTTP and WebSocket endpoints: name -> (type, default)
+TRAINING_PARAMS = {
+    "learning_rate": (float, None),
+    "epochs": (int, None),
+    "tolerance": (float, None),
+    "early_stopping": (bool, True),
+    "train_split": (float, 0.8),
+    "training_speed": (str, "1.0"),
+    "metrics_mode": (str, "exact"),
+    "metrics_checkpoint_every": (int, 0),
+    "solver": (str, "gd"),
+    "decimate_every": (int, 0),
+    "max_events_per_second": (float, 20.0)
+}
+
+
+def parse_training_params(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Coerce client-supplied training parameters (form fields or a WebSocket message)."""
+    if not isinstance(raw, dict):
+        raise HTTPException(status_code=400, detail="Training parameters must be an object")
+    params = {}
+    for name, (kind, default) in TRAINING_PARAMS.items():
+        value = raw.get(name, default)
+        if value is None:
+            raise HTTPException(status_code=400, detail=f"Missing training parameter: {name}")
+        try:
+            if kind is bool and isinstance(value, str):
+                value = value.strip().lower() in ("true", "1", "yes", "on")
+            params[name] = kind(value)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail=f"Invalid training parameter: {name}")
+    return params
+
+
+async def prepare_training(session_data: Session, params: Dict[str, Any]):
+    """
+    Validate training parameters, set up the model and register the run as a job.
+    
+    Args:
+        session_data: Session holding the cleaned data
+        params: Parameters as described by TRAINING_PARAMS
+        
+    Returns:
+        Tuple of (job, model, split_result)
+    """
+    if 'x_clean' not in session_data:
+        raise HTTPException(status_code=400, detail="No cleaned data available")
+    ensure_no_active_job(session_data)
+    
+    training_speed = params['training_speed'].strip().lower()
+    if training_speed != "max":
+        try:
+            float(training_speed)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid training speed: {params['training_speed']}")
+    elif params['decimate_every'] <= 0 and params['max_events_per_second'] <= 0:
+        raise HTTPException(status_code=400, detail="max_events_per_second must be positive")
+    
+    from backend.linear_regression import LinearRegressionModel
+    solver = params['solver']
+    if solver != "gd" and solver not in LinearRegressionModel.CLOSED_FORM_SOLVERS:
+        raise HTTPException(status_code=400, detail=f"Unknown solver: {solver}")
+    
+    # Get data (possibly memory-mapped from the dataset cache)
+    x_data = session_data['x_clean']
+    y_data = session_data['y_clean']
+    
+    # Initialize and setup model off the event loop
+    def setup_model():
+        with timed("model_init", len(x_data)):
+            model = LinearRegressionModel(x_data, y_data)
+        with timed("split", len(x_data)):
+            split_result = model.train_test_split(train_ratio=params['train_split'])
+            model.set_training_data(split_result['x_train'], split_result['y_train'])
+        return model, split_result
+    
+    model, split_result = await training_pool.run_local(setup_model)
+    
+    # Register the run as a job so it can be controlled by ID (checked again:
+    # another start may have registered one while the model was set up)
+    ensure_no_active_job(session_data)
+    job = job_manager.create(session_data.session_id, dict(params))
+    session_data['training_job_id'] = job.job_id
+    print(f"🆔 Training job {job.job_id} created")
+    return job, model, split_result
+
+
+def ensure_no_active_job(session_data: Session):
+    """Reject a training start while the session's previous job is still active (409)."""
+    job = get_session_job(session_data)
+    if job is not None and job.is_active:
+        raise HTTPException(status_code=409, detail=f"Training already running (job {job.job_id})")
+
+
+def end_job(job: TrainingJob):
+    """Finish a job whose events were not consumed to the end (client gone or stream never started)."""
+    if job.is_active:
+        job.stop()
+        job.finish()
+
+
+async def training_events(session_data: Session, job: TrainingJob, model, split_result: Dict[str, Any]):
+    """
+    Run a prepared training job and yield its events.
+    
+    Shared by the HTTP stream and the WebSocket channel.
+    
+    Yields:
+        Tuples of (kind, JSON payload) where kind is "epoch", "complete" or "error"
+    """
+    params = job.params
+    solver = params['solver']
+    max_speed = params['training_speed'].strip().lower() == "max"
+    x_data = session_data['x_clean']
+    y_data = session_data['y_clean']
+    
+    try:
+        # Store training state in session (busy sessions are never evicted)
+        session_data['training_active'] = True
+        session_data['training_model'] = model
+        
+        # Closed-form solvers fit in one pass and only send the final event
+        if solver != "gd":
+            await training_pool.run_local(model.fit_closed_form, solver)
+        elif max_speed:
+            decimate_every = params['decimate_every']
+            max_events_per_second = params['max_events_per_second']
+            print(f"🚀 Training at max speed (decimation: "
+                  f"{f'every {decimate_every} epochs' if decimate_every > 0 else f'{max_events_per_second} events/s'})")
+            epoch_delay = 0.0
+            epoch_stream = training_pool.stream(
+                model,
+                "train_decimated",
+                learning_rate=params['learning_rate'],
+                max_epochs=params['epochs'],
+                tolerance=params['tolerance'],
+                early_stopping=params['early_stopping'],
+                every_n_epochs=decimate_every,
+                max_events_per_second=max_events_per_second
+            )
+        else:
+            # Map speed to actual delays (in seconds)
+            speed_delays = {
+                1.0: 0.1,    # Fast: 100ms between epochs
+                0.8: 0.3,    # Fast-Medium: 300ms between epochs
+                0.6: 0.6,    # Medium: 800ms between epochs
+                0.4: 1,    # Slow: 2s between epochs
+                0.2: 1.5     # Very Slow: 4s between epochs
+            }
+            
+            # Get delay for current speed (snap to nearest valid speed)
+            speed = float(params['training_speed'])
+            current_speed = min(speed_delays.keys(), key=lambda x: abs(x - speed))
+            epoch_delay = speed_delays[current_speed]
+            
+            print(f"🚀 Training with speed {current_speed} (delay: {epoch_delay}s between epochs)")
+            
+            # Epochs are computed in the worker pool; the event loop only streams them
+            epoch_stream = training_pool.stream(
+                model,
+                "train_epoch_by_epoch",
+                learning_rate=params['learning_rate'],
+                max_epochs=params['epochs'],
+                tolerance=params['tolerance'],
+                early_stopping=params['early_stopping'],
+                metrics_mode=params['metrics_mode'],
+                metrics_checkpoint_every=params['metrics_checkpoint_every']
+            )
+        
+        if solver == "gd":
+            serialization_timer = stage_timer("serialization", len(x_data))
+            async with contextlib.aclosing(epoch_stream):
+                async for epoch_data in epoch_stream:
+                    # Wait while paused; wakes as soon as the job is resumed or stopped
+                    if job.is_paused:
+                        print(f"⏸️ Job {job.job_id} paused - waiting for resume...")
+                    await job.wait_if_paused()
+                    
+                    # Check if training was stopped
+                    if job.stop_requested:
+                        print(f"🛑 Job {job.job_id} stopped by user request")
+                        break
+                    
+                    job.record_epoch(epoch_data['epoch'])
+                    serialization_start = time.perf_counter()
+                    
+                    # Get original scale parameters for this epoch (the worker may be ahead)
+                    original_params = model.get_original_scale_parameters(
+                        epoch_data['theta0'], epoch_data['theta1']
+                    )
+                    
+                    # Original scale cost comes from the cached moments (O(1) per event,
+                    # so decimated max-speed trajectories get it for every event too)
+                    original_cost = model.compute_original_scale_mse(
+                        epoch_data['theta0'], epoch_data['theta1']
+                    )
+                    
+                    # Send epoch data immediately (fixed-shape event, formatted from a template)
+                    payload = epoch_json(
+                        epoch=epoch_data['epoch'],
+                        max_epochs=epoch_data['max_epochs'],
+                        theta0=original_params['theta0'],
+                        theta1=original_params['theta1'],
+                        cost=original_cost,
+                        converged=epoch_data['converged'],
+                        is_complete=epoch_data['is_complete'],
+                        # Performance metrics from backend
+                        rmse=epoch_data.get('rmse', 0.0),
+                        mae=epoch_data.get('mae', 0.0),
+                        r2=epoch_data.get('r2', 0.0),
+                        metrics_exact=epoch_data.get('metrics_exact', True)
+                    )
+                    serialization_timer.observe(time.perf_counter() - serialization_start)
+                    yield "epoch", payload
+                    
+                    # Add delay between epochs (except for the last one; none at max speed)
+                    if not epoch_data['is_complete']:
+                        await job.sleep(epoch_delay)
+        
+        # Mark training as complete
+        job.finish()
+        session_data['training_active'] = False
+        
+        with timed("final_evaluation", len(x_data)):
+            final_data = await training_pool.run_local(
+                build_final_data, model, split_result['x_test'], split_result['y_test'], x_data, y_data
+            )
+        final_data['job_id'] = job.job_id
+        
+        session_data['trained_model'] = model
+        await training_pool.run_local(session_registry.enforce_budget, keep=session_data.session_id)
+        print(f"✅ Trained model stored in session_data. Model type: {type(model)}")
+        print(f"✅ Session data keys after storing model: {list(session_data.keys())}")
+        print(f"✅ Model has metrics_calculator: {hasattr(model, 'metrics_calculator')}")
+        if hasattr(model, 'metrics_calculator'):
+            print(f"✅ Metrics calculator type: {type(model.metrics_calculator)}")
+            print(f"✅ Metrics calculator methods: {[method for method in dir(model.metrics_calculator) if not method.startswith('_')]}")
+        with timed("serialization", len(x_data)):
+            payload = dumps_text(final_data)
+        yield "complete", payload
+        
+    except Exception as e:
+        job.finish(error=str(e))
+        yield "error", dumps_text({'error': True, 'message': str(e)})
+    finally:
+        # Client disconnected or stream closed early
+        end_job(job)
+        session_data['training_active'] = False
+
+
 # Clean training endpoint
 @app.post("/api/start-training")
 async def start_training(
@@ -140,235 +872,451 @@ async def start_training(
     tolerance: float = Form(...),
     early_stopping: bool = Form(True),
     train_split: float = Form(0.8),
-    training_speed: float = Form(1.0)
+    training_speed: str = Form("1.0"),
+    metrics_mode: str = Form("exact"),
+    metrics_checkpoint_every: int = Form(0),
+    solver: str = Form("gd"),
+    decimate_every: int = Form(0),
+    max_events_per_second: float = Form(20.0),
+    session_data: Session = Depends(get_session)
 ) -> StreamingResponse:
-    """Start linear regression training."""
+    """
+    Start linear regression training (gradient descent or a closed-form solver).
+    
+    training_speed="max" trains at full speed without delays and streams a
+    decimated trajectory: every `decimate_every` epochs, or at most
+    `max_events_per_second` updates per second when decimate_every is 0.
+    """
     try:
-        if 'cleaned_data' not in session_data:
-            raise HTTPException(status_code=400, detail="No cleaned data available")
-        
-        # Get data
-        df_clean = session_data['cleaned_data']
-        cleaning_options = session_data['cleaning_options']
-        x_column = cleaning_options['x_column']
-        y_column = cleaning_options['y_column']
-        
-        x_data = df_clean[x_column].values
-        y_data = df_clean[y_column].values
-        print(x_data)
-        print(y_data)
-        # Initialize and setup model
-        from backend.linear_regression import LinearRegressionModel
-        model = LinearRegressionModel(x_data, y_data)
-        split_result = model.train_test_split(train_ratio=train_split)
-        model.set_training_data(split_result['x_train'], split_result['y_train'])
-        
-        x_test = split_result['x_test']
-        y_test = split_result['y_test']
-        x_train_orig = split_result['x_train']
-        y_train_orig = split_result['y_train']
+        params = parse_training_params({
+            "learning_rate": learning_rate, "epochs": epochs, "tolerance": tolerance,
+            "early_stopping": early_stopping, "train_split": train_split,
+            "training_speed": training_speed, "metrics_mode": metrics_mode,
+            "metrics_checkpoint_every": metrics_checkpoint_every, "solver": solver,
+            "decimate_every": decimate_every, "max_events_per_second": max_events_per_second
+        })
+        job, model, split_result = await prepare_training(session_data, params)
         
         async def training_stream():
-            try:
-                # Calculate delay based on training speed
-                import asyncio
-                
-                # Map speed to actual delays (in seconds)
-                speed_delays = {
-                    1.0: 0.1,    # Fast: 100ms between epochs
-                    0.8: 0.3,    # Fast-Medium: 300ms between epochs
-                    0.6: 0.6,    # Medium: 800ms between epochs
-                    0.4: 1,    # Slow: 2s between epochs
-                    0.2: 1.5     # Very Slow: 4s between epochs
-                }
-                
-                # Get delay for current speed (snap to nearest valid speed)
-                current_speed = min(speed_delays.keys(), key=lambda x: abs(x - training_speed))
-                epoch_delay = speed_delays[current_speed]
-                
-                print(f"🚀 Training with speed {current_speed} (delay: {epoch_delay}s between epochs)")
-                
-                # Store training state in session for potential pausing/stopping
-                session_data['training_active'] = True
-                session_data['training_paused'] = False
-                session_data['training_model'] = model
-                
-                for epoch_data in model.train_epoch_by_epoch(
-                    learning_rate=learning_rate,
-                    max_epochs=epochs,
-                    tolerance=tolerance,
-                    early_stopping=early_stopping
-                ):
-                    # Check if training was stopped
-                    if not session_data.get('training_active', False):
-                        print("🛑 Training stopped by user request")
-                        break
-                    
-                    # Check if training is paused
-                    while session_data.get('training_paused', False) and session_data.get('training_active', False):
-                        print("⏸️ Training paused - waiting for resume...")
-                        await asyncio.sleep(0.5)  # Check every 500ms
-                    
-                    # Check again if training was stopped while paused
-                    if not session_data.get('training_active', False):
-                        print("🛑 Training stopped while paused")
-                        break
-                    
-                    # Get original scale parameters
-                    original_params = model.get_original_scale_parameters()
-                    
-                    # Calculate original scale cost every 10 epochs for performance
-                    if epoch_data['epoch'] % 10 == 0 or epoch_data['is_complete']:
-                        train_predictions = model.predict(x_train_orig)
-                        original_cost = np.mean((train_predictions - y_train_orig) ** 2)
-                    else:
-                        original_cost = epoch_data['cost']  # Use normalized cost
-                    
-                    response_data = {
-                        "epoch": int(epoch_data['epoch']),
-                        "max_epochs": int(epoch_data['max_epochs']),
-                        "theta0": float(original_params['theta0']),
-                        "theta1": float(original_params['theta1']),
-                        "cost": float(original_cost),
-                        "converged": bool(epoch_data['converged']),
-                        "is_complete": bool(epoch_data['is_complete']),
-                        # Add performance metrics from backend
-                        "rmse": float(epoch_data.get('rmse', 0.0)),
-                        "mae": float(epoch_data.get('mae', 0.0)),
-                        "r2": float(epoch_data.get('r2', 0.0))
-                    }
-                    
-                    # Send epoch data immediately
-                    yield f"data: {json.dumps(response_data)}\n\n"
-                    
-                    # Add delay between epochs (except for the last one)
-                    if not epoch_data['is_complete']:
-                        print(f"⏳ Waiting {epoch_delay}s before next epoch...")
-                        await asyncio.sleep(epoch_delay)
-                
-                # Mark training as complete
-                session_data['training_active'] = False
-                session_data['training_paused'] = False
-                
-                # Final results
-                test_predictions = model.predict(x_test)
-                test_mse = np.mean((test_predictions - y_test) ** 2)
-                
-                ss_res = np.sum((y_test - test_predictions) ** 2)
-                ss_tot = np.sum((y_test - np.mean(y_test)) ** 2)
-                test_r2 = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
-                
-                final_params = model.get_original_scale_parameters()
-                
-                # Get final training metrics
-                final_metrics = model.get_latest_metrics()
-                metrics_summary = model.get_model_summary()
-                
-                # Calculate sklearn comparison during training
-                print("🔍 Calculating sklearn comparison during training...")
-                try:
-                    sklearn_comp = SklearnComparison()
-                    
-                    # Calculate sklearn results on the full dataset
-                    sklearn_results = sklearn_comp.calculate_sklearn_results(x_data, y_data)
-                    
-                    print("✅ Sklearn comparison completed successfully")
-                    print(f"🔍 Sklearn results: {sklearn_results}")
-                    
-                except Exception as e:
-                    print(f"⚠️ Warning: Sklearn comparison failed: {e}")
-                    print(f"⚠️ Error details: {type(e).__name__}: {str(e)}")
-                    import traceback
-                    print(f"⚠️ Full traceback: {traceback.format_exc()}")
-                    sklearn_results = None
-                final_data = {
-                    "training_complete": True,
-                    "final_theta0": final_params['theta0'],
-                    "final_theta1": final_params['theta1'],
-                    "equation": f"y = {final_params['theta0']:.4f} + {final_params['theta1']:.4f} * x",
-                    "test_mse": test_mse,
-                    "test_r2": test_r2,
-                    "x_range": [float(np.min(x_data)), float(np.max(x_data))],
-                    "y_range": [float(np.min(y_data)), float(np.max(y_data))],
-                    # Add final performance metrics
-                    "final_rmse": final_metrics.get('rmse', 0.0),
-                    "final_mae": final_metrics.get('mae', 0.0),
-                    "final_r2": final_metrics.get('r2', 0.0),
-                    "metrics_summary": metrics_summary,
-                                    # Include sklearn comparison results
-                "sklearn_comparison": {
-                    "sklearn_results": sklearn_results,
-                    "status": "success" if sklearn_results else "failed"
-                }
-                }
-                
-                session_data['trained_model'] = model
-                print(f"✅ Trained model stored in session_data. Model type: {type(model)}")
-                print(f"✅ Session data keys after storing model: {list(session_data.keys())}")
-                print(f"✅ Model has metrics_calculator: {hasattr(model, 'metrics_calculator')}")
-                if hasattr(model, 'metrics_calculator'):
-                    print(f"✅ Metrics calculator type: {type(model.metrics_calculator)}")
-                    print(f"✅ Metrics calculator methods: {[method for method in dir(model.metrics_calculator) if not method.startswith('_')]}")
-                yield f"data: {json.dumps(final_data)}\n\n"
-                
-            except Exception as e:
-                yield f"data: {json.dumps({'error': True, 'message': str(e)})}\n\n"
+            events = training_events(session_data, job, model, split_result)
+            send_timer = stage_timer("sse_send", len(session_data['x_clean']))
+            async with contextlib.aclosing(events):
+                async for _, payload in events:
+                    chunk = sse_event(payload).encode('utf-8')
+                    STREAM_BYTES_TOTAL.inc(len(chunk), channel="sse")
+                    STREAM_EVENTS_TOTAL.inc(channel="sse")
+                    # Resumes once Starlette has written the chunk to the client
+                    send_start = time.perf_counter()
+                    yield chunk
+                    send_timer.observe(time.perf_counter() - send_start)
         
-        return StreamingResponse(training_stream(), media_type="text/plain")
+        # The background task also ends the job if the client left before the stream started
+        return StreamingResponse(
+            training_stream(), media_type="text/plain", headers={"X-Job-ID": job.job_id},
+            background=BackgroundTask(end_job, job)
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Training failed: {str(e)}")
 
-@app.post("/api/pause-training")
-async def pause_training():
-    """Pause ongoing training."""
+
+@app.websocket("/ws/training")
+async def training_websocket(websocket: WebSocket):
+    """
+    Training channel carrying both control messages and epoch updates.
+    
+    Client messages:
+        {"action": "start", "params": {...}}  (same parameters as /api/start-training)
+        {"action": "pause" | "resume" | "stop" | "status"}
+    Server messages:
+        {"type": "started" | "epoch" | "complete" | "error" | "ack" | "status", "data": {...}}
+    
+    Outgoing messages go through a coalescing buffer: if the client falls behind
+    and more than WS_MAX_PENDING_EPOCHS epoch updates are waiting, they are
+    collapsed to the latest one, so a slow client never slows training or grows
+    server memory. Control replies and final results are never dropped.
+    """
+    session_id = valid_session_id(websocket.headers.get(SESSION_HEADER) or websocket.cookies.get(SESSION_COOKIE)
+                                  or websocket.query_params.get("session_id"))
+    await websocket.accept()
+    if not session_id:
+        await websocket.send_text(websocket_message("error", dumps_text({"error": True, "message": "No session"})))
+        await websocket.close(code=1008)
+        return
+    
+    # Held for the lifetime of the connection (see get_session)
+    session_data = await training_pool.run_local(session_registry.acquire, session_id)
+    outbox = CoalescingEventBuffer(WS_MAX_PENDING_EPOCHS)
+    job: Optional[TrainingJob] = None
+    producer: Optional[asyncio.Task] = None
+    
+    def reply(kind: str, payload: Any):
+        outbox.put(websocket_message(kind, dumps_text(payload)))
+    
+    async def send_loop():
+        while True:
+            message = await outbox.get()
+            send_start = time.perf_counter()
+            await websocket.send_text(message)
+            observe_stage("websocket_send", time.perf_counter() - send_start)
+            STREAM_BYTES_TOTAL.inc(len(message.encode('utf-8')), channel="websocket")
+            STREAM_EVENTS_TOTAL.inc(channel="websocket")
+    
+    async def pump(events):
+        async with contextlib.aclosing(events):
+            async for kind, payload in events:
+                outbox.put(websocket_message(kind, payload), coalescable=(kind == "epoch"))
+        if outbox.coalesced:
+            print(f"📉 Job {job.job_id}: {outbox.coalesced} epoch updates coalesced for a slow client")
+    
+    sender = asyncio.create_task(send_loop())
     try:
-        if 'training_active' in session_data and session_data['training_active']:
-            if not session_data.get('training_paused', False):
-                session_data['training_paused'] = True
-                print("⏸️ Training pause requested by user")
-                return {"message": "Training paused"}
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except (ValueError, KeyError):
+                # Not JSON, or a binary frame: report it and keep the connection open
+                reply("error", {"error": True, "message": "Messages must be JSON text frames"})
+                continue
+            action = message.get("action") if isinstance(message, dict) else None
+            
+            if action == "start":
+                if job is not None and job.is_active:
+                    reply("error", {"error": True, "message": "Training already running", "job_id": job.job_id})
+                    continue
+                try:
+                    params = parse_training_params(message.get("params") or {})
+                    job, model, split_result = await prepare_training(session_data, params)
+                except HTTPException as e:
+                    reply("error", {"error": True, "message": e.detail})
+                    continue
+                except ValueError as e:
+                    reply("error", {"error": True, "message": str(e)})
+                    continue
+                reply("started", {"job_id": job.job_id})
+                producer = asyncio.create_task(pump(training_events(session_data, job, model, split_result)))
+            
+            elif action in ("pause", "resume", "stop"):
+                ok = job is not None and getattr(job, action)()
+                reply("ack", {"action": action, "ok": ok, "job": job.to_dict() if job else None})
+            
+            elif action == "status":
+                reply("status", job.to_dict() if job else None)
+            
             else:
-                return {"message": "Training already paused"}
-        else:
-            return {"message": "No active training to pause"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to pause training: {str(e)}")
+                reply("error", {"error": True, "message": f"Unknown action: {action}"})
+    
+    except WebSocketDisconnect:
+        print(f"🔌 Training WebSocket closed (session {session_id[:8]})")
+    finally:
+        # Cancelling the producer closes the event generator, which stops the job
+        for task in (producer, sender):
+            if task is not None:
+                task.cancel()
+        for task in (producer, sender):
+            if task is not None:
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await task
+        session_registry.release(session_data)
+
+def get_session_job(session_data: Session) -> TrainingJob | None:
+    """Most recent training job started by this session."""
+    job_id = session_data.get('training_job_id')
+    return job_manager.get(job_id) if job_id else None
+
+
+def get_job_or_404(job_id: str, session_data: Session) -> TrainingJob:
+    """The job with this ID, if it belongs to the session (404 otherwise, so IDs of other sessions are not revealed)."""
+    job = job_manager.get(job_id)
+    if job is None or job.session_id != session_data.session_id:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
+@app.post("/api/pause-training")
+async def pause_training(response: Response, session_data: Session = Depends(get_session)) -> FastJSONResponse:
+    """Pause the session's ongoing training."""
+    job = get_session_job(session_data)
+    if job is None or not job.is_active:
+        return json_response({"message": "No active training to pause"}, response)
+    if job.pause():
+        print(f"⏸️ Training pause requested by user (job {job.job_id})")
+        return json_response({"message": "Training paused", "job_id": job.job_id}, response)
+    return json_response({"message": "Training already paused", "job_id": job.job_id}, response)
 
 @app.post("/api/resume-training")
-async def resume_training():
-    """Resume paused training."""
+async def resume_training(response: Response, session_data: Session = Depends(get_session)) -> FastJSONResponse:
+    """Resume the session's paused training."""
+    job = get_session_job(session_data)
+    if job is None or not job.is_active:
+        return json_response({"message": "No active training to resume"}, response)
+    if job.resume():
+        print(f"▶️ Training resume requested by user (job {job.job_id})")
+        return json_response({"message": "Training resumed", "job_id": job.job_id}, response)
+    return json_response({"message": "Training not paused", "job_id": job.job_id}, response)
+
+@app.post("/api/stop-training")
+async def stop_training(response: Response, session_data: Session = Depends(get_session)) -> FastJSONResponse:
+    """Stop the session's ongoing training."""
+    job = get_session_job(session_data)
+    if job is None or not job.stop():
+        return json_response({"message": "No active training to stop"}, response)
+    print(f"🛑 Training stop requested by user (job {job.job_id})")
+    return json_response({"message": "Training stop requested", "job_id": job.job_id}, response)
+
+
+@app.get("/api/jobs")
+async def list_jobs(response: Response, session_data: Session = Depends(get_session)) -> FastJSONResponse:
+    """List the training jobs started by this session."""
+    jobs = job_manager.list(session_id=session_data.session_id)
+    return json_response({"jobs": [job.to_dict() for job in jobs], "active_jobs": job_manager.active_count}, response)
+
+
+@app.get("/api/jobs/{job_id}/status")
+async def job_status(job_id: str, response: Response, session_data: Session = Depends(get_session)) -> FastJSONResponse:
+    """Get the status of one of the session's training jobs."""
+    return json_response(get_job_or_404(job_id, session_data).to_dict(), response)
+
+
+@app.post("/api/jobs/{job_id}/pause")
+async def pause_job(job_id: str, response: Response, session_data: Session = Depends(get_session)) -> FastJSONResponse:
+    """Pause one of the session's training jobs."""
+    job = get_job_or_404(job_id, session_data)
+    if not job.pause():
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}, cannot pause")
+    print(f"⏸️ Job {job_id} paused")
+    return json_response(job.to_dict(), response)
+
+
+@app.post("/api/jobs/{job_id}/resume")
+async def resume_job(job_id: str, response: Response, session_data: Session = Depends(get_session)) -> FastJSONResponse:
+    """Resume one of the session's paused training jobs."""
+    job = get_job_or_404(job_id, session_data)
+    if not job.resume():
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}, cannot resume")
+    print(f"▶️ Job {job_id} resumed")
+    return json_response(job.to_dict(), response)
+
+
+@app.post("/api/jobs/{job_id}/stop")
+async def stop_job(job_id: str, response: Response, session_data: Session = Depends(get_session)) -> FastJSONResponse:
+    """Stop one of the session's training jobs."""
+    job = get_job_or_404(job_id, session_data)
+    if not job.stop():
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}, cannot stop")
+    print(f"🛑 Job {job_id} stop requested")
+    return json_response(job.to_dict(), response)
+
+
+def parse_number_list(raw: str, name: str, cast=float) -> list:
+    """Parse a comma-separated form field into a list of numbers (400 on bad input)."""
     try:
-        if 'training_active' in session_data and session_data['training_active']:
-            if session_data.get('training_paused', False):
-                session_data['training_paused'] = False
-                print("▶️ Training resume requested by user")
-                return {"message": "Training resumed"}
-            else:
-                return {"message": "Training not paused"}
-        else:
-            return {"message": "No active training to resume"}
+        values = [cast(part) for part in raw.split(',') if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {raw}")
+    if not values:
+        raise HTTPException(status_code=400, detail=f"{name} must not be empty")
+    return values
+
+
+@app.post("/api/sweep")
+async def sweep_hyperparameters(
+    response: Response,
+    learning_rates: str = Form(...),
+    tolerances: str = Form("1e-6"),
+    epochs: str = Form("1000"),
+    early_stopping: bool = Form(True),
+    train_split: float = Form(0.8),
+    top_k: int = Form(0),
+    session_data: Session = Depends(get_session)
+) -> FastJSONResponse:
+    """
+    Train every combination of the given learning rates, tolerances and epoch
+    caps (comma-separated) in one vectorized gradient-descent run and return
+    the configurations ranked by final cost. top_k > 0 limits the result size.
+    """
+    try:
+        if 'x_clean' not in session_data:
+            raise HTTPException(status_code=400, detail="No cleaned data available")
+        
+        lr_values = parse_number_list(learning_rates, "learning_rates")
+        tol_values = parse_number_list(tolerances, "tolerances")
+        epoch_values = parse_number_list(epochs, "epochs", cast=int)
+        if min(lr_values) <= 0 or min(tol_values) < 0 or min(epoch_values) <= 0:
+            raise HTTPException(status_code=400, detail="learning_rates and epochs must be positive, tolerances non-negative")
+        
+        total = len(lr_values) * len(tol_values) * len(epoch_values)
+        if total > MAX_SWEEP_CONFIGS:
+            raise HTTPException(status_code=400, detail=f"Sweep has {total} configurations (limit {MAX_SWEEP_CONFIGS})")
+        
+        # Cartesian product of the grid axes, one row per configuration
+        grid_lr, grid_tol, grid_epochs = (axis.ravel() for axis in np.meshgrid(
+            lr_values, tol_values, epoch_values, indexing='ij'
+        ))
+        
+        from backend.linear_regression import LinearRegressionModel
+        x_data = session_data['x_clean']
+        y_data = session_data['y_clean']
+        
+        def run_sweep():
+            model = LinearRegressionModel(x_data, y_data)
+            split_result = model.train_test_split(train_ratio=train_split)
+            model.set_training_data(split_result['x_train'], split_result['y_train'])
+            return model.sweep(grid_lr, grid_tol, grid_epochs, early_stopping=early_stopping)
+        
+        start_time = time.perf_counter()
+        configurations = await training_pool.run_local(run_sweep)
+        elapsed = time.perf_counter() - start_time
+        
+        return json_response({
+            "configurations": configurations[:top_k] if top_k > 0 else configurations,
+            "total_configurations": total,
+            "best": configurations[0] if configurations else None,
+            "elapsed_seconds": elapsed
+        }, response)
+        
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to resume training: {str(e)}")
+        print(f"❌ Sweep error: {e}")
+        raise HTTPException(status_code=500, detail=f"Sweep failed: {str(e)}")
 
-@app.post("/api/stop-training")
-async def stop_training():
-    """Stop ongoing training."""
+
+@app.post("/api/cross-validate")
+async def cross_validate(
+    response: Response,
+    k: int = Form(5),
+    seed: int = Form(42),
+    solver: str = Form("normal_equation"),
+    learning_rate: float = Form(0.01),
+    epochs: int = Form(1000),
+    tolerance: float = Form(1e-6),
+    early_stopping: bool = Form(True),
+    session_data: Session = Depends(get_session)
+) -> FastJSONResponse:
+    """
+    K-fold cross-validation of the cleaned data.
+    
+    Folds are fitted in closed form (solver="normal_equation") or with gradient
+    descent (solver="gd") and evaluated on their held-out rows; returns per-fold
+    and aggregate RMSE, MAE and R².
+    """
     try:
-        if 'training_active' in session_data and session_data['training_active']:
-            session_data['training_active'] = False
-            session_data['training_paused'] = False
-            print("🛑 Training stop requested by user")
-            return {"message": "Training stop requested"}
-        else:
-            return {"message": "No active training to stop"}
+        if 'x_clean' not in session_data:
+            raise HTTPException(status_code=400, detail="No cleaned data available")
+        
+        from backend.cross_validation import CrossValidator
+        if solver not in CrossValidator.SOLVERS:
+            raise HTTPException(status_code=400, detail=f"Unknown solver: {solver}")
+        if solver == "gd" and (learning_rate <= 0 or epochs <= 0):
+            raise HTTPException(status_code=400, detail="learning_rate and epochs must be positive")
+        
+        x_data = session_data['x_clean']
+        y_data = session_data['y_clean']
+        
+        def run_cross_validation():
+            validator = CrossValidator(x_data, y_data, k=k, seed=seed)
+            return validator.run(solver, learning_rate=learning_rate, max_epochs=epochs,
+                                 tolerance=tolerance, early_stopping=early_stopping)
+        
+        result = await training_pool.run_local(run_cross_validation)
+        return json_response(result, response)
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to stop training: {str(e)}")     
+        print(f"❌ Cross-validation error: {e}")
+        raise HTTPException(status_code=500, detail=f"Cross-validation failed: {str(e)}")
+
+
+@app.post("/api/train-multivariate")
+async def train_multivariate(
+    response: Response,
+    solver: str = Form("cholesky"),
+    learning_rate: float = Form(0.01),
+    epochs: int = Form(1000),
+    tolerance: float = Form(1e-6),
+    early_stopping: bool = Form(True),
+    train_split: float = Form(0.8),
+    seed: Optional[int] = Form(None),
+    save: bool = Form(False),
+    session_data: Session = Depends(get_session)
+) -> FastJSONResponse:
+    """
+    Fit a multivariate model on all feature columns of the processed data.
+    
+    solver is "cholesky", "qr" or "gd" (gradient descent over the cached Gram
+    matrix). Returns the original-scale intercept and coefficients with train and
+    test metrics; save=True also stores the model and returns its model_id.
+    """
+    try:
+        if 'x_clean' not in session_data:
+            raise HTTPException(status_code=400, detail="No cleaned data available")
+        
+        from backend.multivariate_regression import MultivariateRegressionModel
+        if solver not in MultivariateRegressionModel.SOLVERS:
+            raise HTTPException(status_code=400, detail=f"Unknown solver: {solver}")
+        if not 0.0 < train_split < 1.0:
+            raise HTTPException(status_code=400, detail="train_split must be between 0.0 and 1.0")
+        
+        options = session_data['cleaning_options']
+        feature_columns = options.get('x_columns', [options['x_column']])
+        X = session_data.get('X_clean')
+        if X is None:
+            X = np.asarray(session_data['x_clean']).reshape(-1, 1)
+        y = session_data['y_clean']
+        
+        def fit_model():
+            indices = np.random.default_rng(seed).permutation(len(y))
+            n_train = int(len(y) * train_split)
+            train_idx, test_idx = indices[:n_train], indices[n_train:]
+            model = MultivariateRegressionModel(X[train_idx], y[train_idx], feature_names=feature_columns)
+            result = model.fit(solver, learning_rate=learning_rate, max_epochs=epochs,
+                               tolerance=tolerance, early_stopping=early_stopping)
+            result["train_metrics"] = model.evaluate(model.X, model.y)
+            result["test_metrics"] = model.evaluate(X[test_idx], y[test_idx])
+            result["train_size"], result["test_size"] = len(train_idx), len(test_idx)
+            return result
+        
+        result = await training_pool.run_local(fit_model)
+        result["y_column"] = options['y_column']
+        session_data['multivariate_model'] = {
+            "x_columns": feature_columns, "y_column": options['y_column'],
+            "intercept": result["intercept"], "coefficients": result["coefficients"]
+        }
+        
+        if save:
+            # Batched by the storage writer thread; waits for the commit so failures are reported
+            result["model_id"] = await training_pool.run_local(
+                get_model_storage().add_multivariate_model,
+                session_data.session_id, session_data.get('filename'),
+                feature_columns, options['y_column'], result["intercept"], result["coefficients"],
+                result.get("epochs_run", 0), tolerance, wait=True
+            )
+            print(f"💾 Multivariate model saved: {result['model_id']}")
+        
+        return json_response(result, response)
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"❌ Multivariate training error: {e}")
+        raise HTTPException(status_code=500, detail=f"Multivariate training failed: {str(e)}")
+
+
 # Optional: Add endpoint to get model predictions for visualization
 @app.post("/api/get-predictions")
 async def get_predictions(
+    response: Response,
     x_values: list = Form(...),  # List of X values to predict
-) -> dict:
+    session_data: Session = Depends(get_session)
+) -> FastJSONResponse:
     """Get model predictions for visualization."""
     try:
         if 'trained_model' not in session_data:
@@ -378,31 +1326,376 @@ async def get_predictions(
         x_array = np.array(x_values, dtype=float)
         predictions = model.predict(x_array)
         
-        return {
+        return json_response({
             "x_values": x_values,
-            "predictions": predictions.tolist(),
+            "predictions": predictions,
             "equation": f"y = {model.get_original_scale_parameters()['theta0']:.4f} + {model.get_original_scale_parameters()['theta1']:.4f} * x"
-        }
+        }, response)
         
     except Exception as e:
         print(f"❌ Prediction error: {e}")
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
+async def get_saved_predictor(model_id: str) -> bulk_predict.LinearPredictor:
+    """Saved model from the hot-model cache; misses load from SQLite off the event loop."""
+    predictor = model_cache.lookup(model_id)
+    if predictor is None:
+        predictor = await training_pool.run_local(model_cache.get, model_id)
+    if predictor is None:
+        raise HTTPException(status_code=404, detail=f"Model not found: {model_id}")
+    return predictor
+
+
+async def resolve_predictor(session_data: Session, model_id: Optional[str] = None,
+                            model_source: str = "trained") -> bulk_predict.LinearPredictor:
+    """
+    Predictor for a saved model (model_id) or one of the session's models.
+    
+    model_source selects the session model when no model_id is given: "trained"
+    (last gradient-descent/closed-form run) or "multivariate".
+    """
+    if model_id:
+        return await get_saved_predictor(model_id)
+    
+    options = session_data.get('cleaning_options', {})
+    if model_source == "trained":
+        if 'trained_model' not in session_data:
+            raise HTTPException(status_code=400, detail="No trained model available")
+        params = session_data['trained_model'].get_original_scale_parameters()
+        return bulk_predict.LinearPredictor(params['theta0'], [params['theta1']], [options.get('x_column', 'x')])
+    if model_source == "multivariate":
+        if 'multivariate_model' not in session_data:
+            raise HTTPException(status_code=400, detail="No multivariate model available")
+        model = session_data['multivariate_model']
+        return bulk_predict.LinearPredictor(model['intercept'], model['coefficients'], model['x_columns'])
+    raise HTTPException(status_code=400, detail=f"Unknown model source: {model_source}")
+
+
+@app.post("/api/models")
+async def save_model(
+    response: Response,
+    model_source: str = Form("trained"),
+    session_data: Session = Depends(get_session)
+) -> FastJSONResponse:
+    """
+    Save the session's trained (or multivariate) model so it can be served by model_id.
+    
+    The write is batched with concurrent saves by the storage writer thread; the
+    request returns once it is committed, or fails if the write did.
+    """
+    try:
+        options = session_data.get('cleaning_options', {})
+        storage = get_model_storage()
+        if model_source == "trained":
+            if 'trained_model' not in session_data:
+                raise HTTPException(status_code=400, detail="No trained model available")
+            params = session_data['trained_model'].get_original_scale_parameters()
+            job = get_session_job(session_data)
+            training = job.params if job is not None else {}
+            model_id = await training_pool.run_local(
+                storage.add_model,
+                session_data.session_id, session_data.get('filename'),
+                options.get('x_column'), options.get('y_column'), params['theta0'], params['theta1'],
+                training.get('epochs', 0), training.get('tolerance', 0.0), wait=True
+            )
+        elif model_source == "multivariate":
+            if 'multivariate_model' not in session_data:
+                raise HTTPException(status_code=400, detail="No multivariate model available")
+            model = session_data['multivariate_model']
+            model_id = await training_pool.run_local(
+                storage.add_multivariate_model,
+                session_data.session_id, session_data.get('filename'),
+                model['x_columns'], model['y_column'], model['intercept'], model['coefficients'], 0, 0.0,
+                wait=True
+            )
+        else:
+            raise HTTPException(status_code=400, detail=f"Unknown model source: {model_source}")
+        
+        print(f"💾 Model saved: {model_id}")
+        return json_response({"model_id": model_id, "predict_url": f"/api/models/{model_id}/predict"}, response)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Save model error: {e}")
+        raise HTTPException(status_code=500, detail=f"Saving model failed: {str(e)}")
+
+
+@app.get("/api/models")
+async def list_saved_models(
+    response: Response,
+    user_id: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None
+) -> FastJSONResponse:
+    """
+    List saved models, oldest first, one keyset page at a time.
+    
+    Pass the returned next_cursor as `cursor` to fetch the following page;
+    next_cursor is null on the last page.
+    """
+    try:
+        if not 1 <= limit <= 1000:
+            raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
+        after = None
+        if cursor:
+            created_at, sep, model_id = cursor.partition('|')
+            if not sep:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            after = (created_at, model_id)
+        
+        rows = await training_pool.run_local(get_model_storage().list_models, user_id, limit, after)
+        models = [{"model_id": r[0], "x_col": r[1], "y_col": r[2], "created_at": r[3]} for r in rows]
+        next_cursor = f"{rows[-1][3]}|{rows[-1][0]}" if len(rows) == limit else None
+        return json_response({"models": models, "next_cursor": next_cursor}, response)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ List models error: {e}")
+        raise HTTPException(status_code=500, detail=f"Listing models failed: {str(e)}")
+
+
+async def read_json_body(request: Request) -> Dict[str, Any]:
+    """Parse a JSON object request body (400 if it is not one)."""
+    try:
+        payload = loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body must be valid JSON")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Request body must be a JSON object")
+    return payload
+
+
+@app.post("/api/models/{model_id}/predict")
+async def predict_with_model(model_id: str, request: Request) -> FastJSONResponse:
+    """
+    Predict with a saved model.
+    
+    Body: {"x": [...]}; a flat list (or scalar) for single-feature models, rows
+    of feature values for multivariate ones. Parameters come from the hot-model
+    cache, so only the first request for a model reads the database.
+    """
+    try:
+        payload = await read_json_body(request)
+        if 'x' not in payload:
+            raise HTTPException(status_code=400, detail="Missing 'x'")
+        predictor = await get_saved_predictor(model_id)
+        block = bulk_predict.as_feature_block(payload['x'], predictor.n_features)
+        return json_response({"model_id": model_id, "n": len(block), "predictions": predictor.predict(block)})
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"❌ Prediction error: {e}")
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+
+@app.post("/api/predict-batch")
+async def predict_batch(request: Request) -> FastJSONResponse:
+    """
+    Score a batch of (model_id, x) pairs across many saved models.
+    
+    Body: {"model_ids": [...], "x": [...]} (parallel arrays) or
+    {"items": [{"model_id": ..., "x": ...}, ...]}. Pairs are grouped by model and
+    each group is scored with one vectorized call; predictions keep the input order.
+    """
+    try:
+        payload = await read_json_body(request)
+        if 'items' in payload:
+            items = payload['items']
+            try:
+                model_ids = [item['model_id'] for item in items]
+                x_values = [item['x'] for item in items]
+            except (KeyError, TypeError):
+                raise HTTPException(status_code=400, detail="Each item needs 'model_id' and 'x'")
+        else:
+            model_ids, x_values = payload.get('model_ids'), payload.get('x')
+            if not isinstance(model_ids, list) or not isinstance(x_values, list):
+                raise HTTPException(status_code=400, detail="Body needs 'items' or 'model_ids' and 'x' lists")
+        
+        predictors = {}
+        missing = []
+        for model_id in dict.fromkeys(map(str, model_ids)):
+            try:
+                predictors[model_id] = await get_saved_predictor(model_id)
+            except HTTPException:
+                missing.append(model_id)
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Models not found: {missing}")
+        
+        predictions = bulk_predict.predict_by_model(model_ids, x_values, predictors)
+        return json_response({"n": len(predictions), "models": len(predictors), "predictions": predictions})
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"❌ Batch prediction error: {e}")
+        raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
+
+
+@app.get("/api/models/cache")
+async def model_cache_stats() -> FastJSONResponse:
+    """Hot-model cache counters (hits, misses, evictions, expirations)."""
+    return json_response(model_cache.stats())
+
+
+@app.post("/api/predict-bulk")
+async def predict_bulk(
+    file: UploadFile = File(...),
+    input_format: str = Form("csv"),
+    columns: str = Form(""),
+    dtype: str = Form("float64"),
+    output: str = Form("csv"),
+    output_dtype: str = Form("float64"),
+    model_id: Optional[str] = Form(None),
+    model_source: str = Form("trained"),
+    session_data: Session = Depends(get_session)
+) -> StreamingResponse:
+    """
+    Score an uploaded file and stream the predictions back.
+    
+    input_format is "csv" (feature columns from `columns`, default the model's
+    feature names), "npy" (1-D or n×d array) or "raw" (row-major little-endian
+    `dtype` values). The output is a one-column CSV or a raw little-endian
+    `output_dtype` column, produced block by block while the input is read.
+    """
+    if input_format not in bulk_predict.INPUT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported input format: {input_format}")
+    if output not in bulk_predict.OUTPUT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported output format: {output}")
+    if output_dtype not in columnar_transport.DTYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported dtype: {output_dtype}")
+    
+    predictor = await resolve_predictor(session_data, model_id, model_source)
+    feature_columns = [c.strip() for c in columns.split(',') if c.strip()] or predictor.feature_names
+    
+    upload = await spool_upload(file, spool_dir=UPLOAD_SPOOL_DIR)
+    try:
+        await training_pool.run_local(
+            bulk_predict.validate_input, upload.path, input_format, predictor.n_features,
+            feature_columns, upload.compression, dtype
+        )
+    except ValueError as e:
+        upload.remove()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        upload.remove()
+        print(f"❌ Bulk prediction error: {e}")
+        raise HTTPException(status_code=500, detail=f"Bulk prediction failed: {str(e)}")
+    
+    print(f"📦 Bulk prediction: {upload.size} bytes of {input_format} input, {predictor.n_features} feature(s)")
+    
+    def prediction_stream():
+        # Runs in Starlette's thread pool one block at a time; the upload is removed when done
+        try:
+            blocks = bulk_predict.iter_input_blocks(
+                upload.path, input_format, predictor.n_features, feature_columns, upload.compression, dtype
+            )
+            predictions = bulk_predict.predict_blocks(predictor, blocks)
+            if output == "csv":
+                chunks = bulk_predict.encode_csv(predictions)
+            else:
+                chunks = bulk_predict.encode_binary(predictions, output_dtype)
+            for chunk in chunks:
+                STREAM_BYTES_TOTAL.inc(len(chunk), channel="bulk_predict")
+                yield chunk
+        finally:
+            upload.remove()
+    
+    if output == "csv":
+        return StreamingResponse(prediction_stream(), media_type=bulk_predict.CSV_MEDIA_TYPE,
+                                 headers={"Content-Disposition": 'attachment; filename="predictions.csv"'})
+    return StreamingResponse(prediction_stream(), media_type=columnar_transport.RAW_MEDIA_TYPE,
+                             headers={"X-Columns": "prediction", "X-Dtype": output_dtype, "X-Byte-Order": "little"})
+
+
+async def get_plot_pyramid(session_data: Session) -> PlotPyramid:
+    """The session's plot pyramid for its current dataset, built on first use."""
+    if 'x_clean' not in session_data:
+        raise HTTPException(status_code=400, detail="No processed data available")
+
+    dataset_key = session_data.get('dataset_key')
+    pyramid = session_data.get('plot_pyramid')
+    if pyramid is None or session_data.get('plot_pyramid_key') != dataset_key:
+        pyramid = await training_pool.run_local(PlotPyramid, session_data['x_clean'], session_data['y_clean'])
+        session_data['plot_pyramid'] = pyramid
+        session_data['plot_pyramid_key'] = dataset_key
+        await training_pool.run_local(session_registry.enforce_budget, keep=session_data.session_id)
+    return pyramid
+
+@app.get("/api/plot-data")
+async def get_plot_data(
+    response: Response,
+    mode: str = "lttb",
+    x_min: Optional[float] = None,
+    x_max: Optional[float] = None,
+    y_min: Optional[float] = None,
+    y_max: Optional[float] = None,
+    width: int = 800,
+    height: int = 400,
+    cell_pixels: int = 4,
+    session_data: Session = Depends(get_session)
+) -> FastJSONResponse:
+    """
+    Aggregated cleaned data for a plot viewport.
+
+    mode="lttb" returns at most `width` points chosen by LTTB; mode="density"
+    returns a grid of (width / cell_pixels) x (height / cell_pixels) counts.
+    Both are answered from the session's precomputed plot pyramid.
+    """
+    try:
+        if mode not in ("lttb", "density"):
+            raise HTTPException(status_code=400, detail=f"Unknown plot mode: {mode}")
+        if width <= 0 or height <= 0 or cell_pixels <= 0:
+            raise HTTPException(status_code=400, detail="width, height and cell_pixels must be positive")
+
+        pyramid = await get_plot_pyramid(session_data)
+        x_range = (x_min if x_min is not None else pyramid.x_bounds[0],
+                   x_max if x_max is not None else pyramid.x_bounds[1])
+        y_range = (y_min if y_min is not None else pyramid.y_bounds[0],
+                   y_max if y_max is not None else pyramid.y_bounds[1])
+
+        if mode == "lttb":
+            plot_data = pyramid.lttb(x_range, y_range, n_out=width)
+        else:
+            plot_data = pyramid.density(x_range, y_range,
+                                        width=max(1, width // cell_pixels),
+                                        height=max(1, height // cell_pixels))
+        return json_response(plot_data, response)
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"❌ Plot data error: {e}")
+        raise HTTPException(status_code=500, detail=f"Plot data failed: {str(e)}")
+
 @app.get("/api/debug-session")
-async def debug_session() -> dict:
+async def debug_session(response: Response, session_data: Session = Depends(get_session)) -> FastJSONResponse:
     """Debug endpoint to check what's in session_data."""
     try:
-        return {
+        job = get_session_job(session_data)
+        return json_response({
+            "session_id": session_data.session_id,
             "session_keys": list(session_data.keys()),
             "has_trained_model": 'trained_model' in session_data,
-            "has_cleaned_data": 'cleaned_data' in session_data,
+            "has_cleaned_data": 'x_clean' in session_data,
             "has_training_model": 'training_model' in session_data,
             "training_active": session_data.get('training_active', False),
-            "training_paused": session_data.get('training_paused', False),
-            "session_size": len(str(session_data))
-        }
+            "training_paused": job.is_paused if job else False,
+            "training_job_id": session_data.get('training_job_id'),
+            "session_size": len(str(session_data)),
+            "session_bytes": session_data.nbytes,
+            "registry": session_registry.stats()
+        }, response)
     except Exception as e:
-        return {"error": str(e)}
+        return json_response({"error": str(e)}, response)
 
 if __name__ == "__main__":
     import uvicorn
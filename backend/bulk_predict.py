@@ -0,0 +1,191 @@
+"""
+Bulk Prediction.
+Scores large CSV, NPY or raw binary inputs block by block with constant memory.
+"""
+
+import os
+from typing import Any, Dict, Generator, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .columnar_transport import DTYPES
+from .csv_ingest import read_csv_header
+
+# Rows scored per block (bounds memory regardless of the input size)
+PREDICT_BLOCK_ROWS = 262144
+
+INPUT_FORMATS = ("csv", "npy", "raw")
+OUTPUT_FORMATS = ("csv", "binary")
+
+CSV_MEDIA_TYPE = "text/csv"
+
+
+class LinearPredictor:
+    """Original-scale linear model y = intercept + Σ coefficientᵢ · xᵢ."""
+
+    def __init__(self, intercept: float, coefficients: List[float], feature_names: Optional[List[str]] = None):
+        self.intercept = float(intercept)
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+        self.n_features = len(self.coefficients)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+
+    def predict(self, block: np.ndarray) -> np.ndarray:
+        """Predict a block of shape (rows,) for one feature or (rows, n_features)."""
+        if block.ndim == 1:
+            return block * self.coefficients[0] + self.intercept
+        return block @ self.coefficients + self.intercept
+
+
+def as_feature_block(values: Any, n_features: int) -> np.ndarray:
+    """
+    Convert request values to a feature block for a model with n_features inputs.
+
+    Single-feature models take a scalar or a flat list; multi-feature models take
+    one row or a list of rows.
+
+    Raises:
+        ValueError: If the values are not numeric or have the wrong width
+    """
+    block = np.asarray(values, dtype=np.float64)
+    if n_features == 1:
+        if block.ndim == 2 and block.shape[1] == 1:
+            block = block[:, 0]
+        if block.ndim > 1:
+            raise ValueError("Model expects one feature per row")
+        return np.atleast_1d(block)
+    if block.ndim == 1:
+        block = block.reshape(1, -1)
+    if block.ndim != 2 or block.shape[1] != n_features:
+        raise ValueError(f"Model expects {n_features} features per row, got shape {list(block.shape)}")
+    return block
+
+
+def predict_by_model(model_ids: Sequence[str], x_values: Sequence[Any],
+                     predictors: Dict[str, LinearPredictor]) -> np.ndarray:
+    """
+    Score (model_id, x) pairs, one vectorized prediction per distinct model.
+
+    Rows are grouped by model with a single stable sort, so the cost is one
+    predict call per model rather than per row.
+
+    Returns:
+        Predictions in the order of the input pairs
+    """
+    if len(model_ids) != len(x_values):
+        raise ValueError("model_ids and x must have the same length")
+    unique_ids, inverse = np.unique(np.asarray(model_ids, dtype=object).astype(str), return_inverse=True)
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(inverse, minlength=len(unique_ids)))])
+
+    # Uniform inputs (e.g. all single-feature models) are gathered as one array
+    try:
+        x_array = np.asarray(x_values, dtype=np.float64)
+    except ValueError:
+        x_array = None
+
+    predictions = np.empty(len(model_ids))
+    for k, model_id in enumerate(unique_ids):
+        rows = order[bounds[k]:bounds[k + 1]]
+        predictor = predictors[model_id]
+        values = x_array[rows] if x_array is not None else [x_values[i] for i in rows]
+        block = as_feature_block(values, predictor.n_features)
+        if len(block) != len(rows):
+            raise ValueError(f"Model {model_id} expects {predictor.n_features} features per row")
+        predictions[rows] = predictor.predict(block)
+    return predictions
+
+
+def validate_input(path: str, input_format: str, n_features: int, columns: List[str],
+                   compression: Optional[str] = None, dtype: str = "float64"):
+    """
+    Check that an input file can be scored before streaming starts.
+
+    Raises:
+        ValueError: If the format, columns or layout do not match the model
+    """
+    if input_format not in INPUT_FORMATS:
+        raise ValueError(f"Unsupported input format: {input_format}")
+    if input_format != "csv" and compression is not None:
+        raise ValueError(f"Compressed {input_format} input is not supported")
+
+    if input_format == "csv":
+        available = read_csv_header(path, compression)
+        missing = [c for c in columns if c not in available]
+        if missing:
+            raise ValueError(f"Columns not found: {missing}")
+        if len(columns) != n_features:
+            raise ValueError(f"Model expects {n_features} feature columns, got {len(columns)}")
+    elif input_format == "npy":
+        try:
+            array = np.load(path, mmap_mode='r')
+        except (OSError, EOFError) as e:
+            raise ValueError(f"Invalid NPY file: {e}")
+        width = 1 if array.ndim == 1 else array.shape[1]
+        if array.ndim > 2 or width != n_features:
+            raise ValueError(f"Model expects {n_features} features, NPY array has shape {list(array.shape)}")
+        if array.ndim == 0 or array.shape[0] == 0:
+            raise ValueError("NPY input has no rows")
+    else:
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported dtype: {dtype}")
+        row_bytes = DTYPES[dtype].itemsize * n_features
+        size = os.path.getsize(path)
+        # An empty file cannot be memory-mapped, and streaming would fail after the headers
+        if size == 0:
+            raise ValueError("Raw input is empty")
+        if size % row_bytes:
+            raise ValueError(f"Raw input size is not a multiple of {row_bytes} bytes per row")
+
+
+def iter_input_blocks(path: str, input_format: str, n_features: int, columns: List[str],
+                      compression: Optional[str] = None, dtype: str = "float64",
+                      block_rows: int = PREDICT_BLOCK_ROWS) -> Generator[np.ndarray, None, None]:
+    """
+    Read an input file as float64 feature blocks of at most block_rows rows.
+
+    CSV files are parsed in chunks (non-numeric values become NaN); NPY and raw
+    files are memory-mapped, so only the current block is ever resident.
+    """
+    if input_format == "csv":
+        reader = pd.read_csv(path, usecols=columns, compression=compression, chunksize=block_rows)
+        for chunk in reader:
+            chunk = chunk[columns]
+            if not all(pd.api.types.is_numeric_dtype(t) for t in chunk.dtypes):
+                chunk = chunk.apply(pd.to_numeric, errors='coerce')
+            block = chunk.to_numpy(dtype=np.float64)
+            yield block[:, 0] if n_features == 1 else block
+        return
+
+    if input_format == "npy":
+        data = np.load(path, mmap_mode='r')
+    else:
+        data = np.memmap(path, dtype=DTYPES[dtype], mode='r')
+        if n_features > 1:
+            data = data.reshape(-1, n_features)
+    if data.ndim == 2 and n_features == 1:
+        data = data[:, 0]
+    for start in range(0, len(data), block_rows):
+        yield np.asarray(data[start:start + block_rows], dtype=np.float64)
+
+
+def predict_blocks(predictor: LinearPredictor,
+                   blocks: Iterable[np.ndarray]) -> Generator[np.ndarray, None, None]:
+    """Apply the predictor to each feature block."""
+    for block in blocks:
+        yield predictor.predict(block)
+
+
+def encode_csv(predictions: Iterable[np.ndarray], header: str = "prediction") -> Generator[bytes, None, None]:
+    """Encode prediction blocks as a one-column CSV of shortest round-trip floats."""
+    yield (header + "\n").encode('utf-8')
+    for block in predictions:
+        # An empty field would be a blank line that CSV readers skip, so NaN stays "nan"
+        yield ("\n".join(map(repr, block.tolist())) + "\n").encode('utf-8')
+
+
+def encode_binary(predictions: Iterable[np.ndarray], dtype: str = "float64") -> Generator[bytes, None, None]:
+    """Encode prediction blocks as one raw little-endian column."""
+    wire_dtype = DTYPES[dtype]
+    for block in predictions:
+        yield block.astype(wire_dtype, copy=False).tobytes()
@@ -0,0 +1,77 @@
+"""
+Binary Columnar Transport.
+Encodes float columns as raw little-endian buffers or Arrow IPC streams.
+"""
+
+import io
+from typing import Dict, Generator, List
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+# Supported wire dtypes (always little-endian)
+DTYPES = {
+    "float32": np.dtype('<f4'),
+    "float64": np.dtype('<f8'),
+}
+
+# Elements converted per chunk when streaming raw buffers
+RAW_CHUNK_ELEMENTS = 1 << 20
+
+RAW_MEDIA_TYPE = "application/octet-stream"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def raw_column_chunks(columns: Dict[str, np.ndarray], dtype: str = "float64",
+                      chunk_elements: int = RAW_CHUNK_ELEMENTS) -> Generator[bytes, None, None]:
+    """
+    Stream columns as consecutive raw little-endian buffers.
+
+    The columns are written one after another (all of the first column, then the
+    second, ...), so a client can slice the body at n * itemsize boundaries.
+    """
+    wire_dtype = DTYPES[dtype]
+    for values in columns.values():
+        for start in range(0, len(values), chunk_elements):
+            block = np.asarray(values[start:start + chunk_elements]).astype(wire_dtype, copy=False)
+            yield block.tobytes()
+
+
+def raw_headers(columns: Dict[str, np.ndarray], dtype: str = "float64") -> Dict[str, str]:
+    """Headers describing the layout of a raw columnar body."""
+    n_rows = len(next(iter(columns.values()))) if columns else 0
+    return {
+        "X-Columns": ",".join(columns.keys()),
+        "X-Rows": str(n_rows),
+        "X-Dtype": dtype,
+        "X-Byte-Order": "little"
+    }
+
+
+def arrow_ipc_bytes(columns: Dict[str, np.ndarray], dtype: str = "float64") -> bytes:
+    """Encode columns as a single-batch Arrow IPC stream."""
+    if not ARROW_AVAILABLE:
+        raise RuntimeError("Arrow transport requires the pyarrow package")
+    wire_dtype = DTYPES[dtype]
+    table = pa.table({name: np.asarray(values).astype(wire_dtype, copy=False)
+                      for name, values in columns.items()})
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def parse_column_names(requested: str, available: List[str]) -> List[str]:
+    """Parse a comma-separated column selection, defaulting to all available columns."""
+    if not requested:
+        return list(available)
+    names = [name.strip() for name in requested.split(",") if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise KeyError(f"Unknown columns: {unknown}")
+    return names
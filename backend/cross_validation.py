@@ -0,0 +1,241 @@
+"""
+K-Fold Cross-Validation.
+Evaluates linear regression on k folds from per-fold moments, without copying the data per fold.
+"""
+
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from . import gd_kernels
+
+class KFold:
+    """
+    Fold assignment of n rows into k folds of (almost) equal size.
+
+    Assignments are drawn once from a seeded np.random.Generator and kept as a
+    single array of fold ids, so folds are index views of the data rather than
+    copies of it.
+    """
+
+    def __init__(self, n: int, k: int = 5, seed: int | None = 42):
+        if k < 2:
+            raise ValueError("k must be at least 2")
+        if k > n:
+            raise ValueError(f"k ({k}) cannot exceed the number of rows ({n})")
+        self.n = n
+        self.k = k
+        self.seed = seed
+
+        rng = np.random.default_rng(seed)
+        self.fold_ids = np.empty(n, dtype=np.int64)
+        self.fold_ids[rng.permutation(n)] = np.arange(n) % k
+        self.sizes = np.bincount(self.fold_ids, minlength=k)
+
+    def test_indices(self, fold: int) -> np.ndarray:
+        """Row indices held out in the given fold."""
+        return np.flatnonzero(self.fold_ids == fold)
+
+    def train_indices(self, fold: int) -> np.ndarray:
+        """Row indices used for training in the given fold."""
+        return np.flatnonzero(self.fold_ids != fold)
+
+
+class CrossValidator:
+    """
+    K-fold cross-validation of the single-feature linear regression model.
+
+    The data is summarized once into per-fold moments with np.bincount. Each
+    fold's training moments are the totals minus the held-out fold, so fitting
+    all k folds costs one pass over the data instead of k retrains. Folds are
+    fitted like LinearRegressionModel: on data normalized with the training
+    fold's mean and standard deviation, either in closed form or with gradient
+    descent for all folds at once.
+    """
+
+    SOLVERS = ("normal_equation", "gd")
+
+    def __init__(self, x_data: np.ndarray, y_data: np.ndarray, k: int = 5, seed: int | None = 42):
+        x = np.ravel(x_data)
+        y = np.ravel(y_data)
+        if len(x) != len(y):
+            raise ValueError("x_data and y_data must have the same length")
+
+        self.folds = KFold(len(x), k, seed)
+
+        # Center on the global means so the raw moments do not lose precision
+        self._x_shift = float(np.mean(x))
+        self._y_shift = float(np.mean(y))
+        self._x = x - self._x_shift
+        self._y = y - self._y_shift
+        self.fold_moments = self._compute_fold_moments()
+
+    def _compute_fold_moments(self) -> np.ndarray:
+        """Moments [n, Σx, Σy, Σx², Σxy, Σy²] of each fold's rows, shape (k, 6)."""
+        ids, k, x, y = self.folds.fold_ids, self.folds.k, self._x, self._y
+        return np.column_stack([
+            self.folds.sizes.astype(np.float64),
+            np.bincount(ids, weights=x, minlength=k),
+            np.bincount(ids, weights=y, minlength=k),
+            np.bincount(ids, weights=x * x, minlength=k),
+            np.bincount(ids, weights=x * y, minlength=k),
+            np.bincount(ids, weights=y * y, minlength=k)
+        ])
+
+    def run(self, solver: str = "normal_equation", learning_rate: float = 0.01,
+            max_epochs: int = 1000, tolerance: float = 1e-6,
+            early_stopping: bool = True) -> Dict[str, Any]:
+        """
+        Fit and evaluate every fold.
+
+        Args:
+            solver: "normal_equation" or "gd"
+            learning_rate: Learning rate (α) for gradient descent
+            max_epochs: Maximum number of gradient-descent epochs per fold
+            tolerance: Convergence tolerance for gradient descent
+            early_stopping: Whether gradient descent stops once the cost is stable
+
+        Returns:
+            Dictionary with per-fold results and aggregate metrics
+        """
+        if solver not in self.SOLVERS:
+            raise ValueError(f"Unknown solver: {solver}")
+
+        start_time = time.perf_counter()
+        k = self.folds.k
+        print(f"🔁 Starting {k}-fold cross-validation on {self.folds.n} rows (solver: {solver})")
+
+        # Training moments of fold i: everything except fold i
+        train = self.fold_moments.sum(axis=0) - self.fold_moments
+        n, sum_x, sum_y, sum_xx, sum_xy, sum_yy = train.T
+        x_mean, y_mean = sum_x / n, sum_y / n
+        x_ss = np.maximum(sum_xx - n * x_mean ** 2, 0.0)
+        y_ss = np.maximum(sum_yy - n * y_mean ** 2, 0.0)
+        xy_ss = sum_xy - n * x_mean * y_mean
+        x_std = np.sqrt(x_ss / n)
+        y_std = np.sqrt(y_ss / n)
+        x_std[x_std == 0] = 1.0
+        y_std[y_std == 0] = 1.0
+
+        # Moments of the normalized training data (normalized means are zero)
+        normalized = np.column_stack([
+            n, np.zeros(k), np.zeros(k), x_ss / x_std ** 2, xy_ss / (x_std * y_std), y_ss / y_std ** 2
+        ])
+
+        theta = np.zeros((k, 2))
+        gd_result = None
+        exploded = np.zeros(k, dtype=bool)
+        if solver == "gd":
+            gd_result = gd_kernels.run_batched_moments_gd(
+                normalized, theta,
+                np.full(k, float(learning_rate)), np.full(k, float(tolerance)),
+                np.full(k, int(max_epochs)), early_stopping
+            )
+            # Same rule as LinearRegressionModel.sweep: a fold whose cost overflows exploded too
+            status = gd_result[0]
+            with np.errstate(over='ignore', invalid='ignore'):
+                status[~np.isfinite(gd_kernels.moments_cost(normalized, theta))] = gd_kernels.STATUS_EXPLODED
+            exploded = status == gd_kernels.STATUS_EXPLODED
+        else:
+            nonzero = normalized[:, 3] > 0
+            theta[nonzero, 1] = normalized[nonzero, 4] / normalized[nonzero, 3]
+
+        # Back to the original (centered) scale: y = intercept + slope * x
+        slope = theta[:, 1] * (y_std / x_std)
+        intercept = theta[:, 0] * y_std + y_mean - slope * x_mean
+        params = np.column_stack([intercept, slope])
+
+        folds = self._evaluate(params, exploded)
+        if gd_result is not None:
+            status, epochs_run, converged_epoch = gd_result
+            for i, fold in enumerate(folds):
+                fold["status"] = gd_kernels.STATUS_NAMES[int(status[i])]
+                fold["epochs_run"] = int(epochs_run[i])
+                fold["converged_epoch"] = int(converged_epoch[i]) if converged_epoch[i] else None
+
+        result = {
+            "k": k,
+            "seed": self.folds.seed,
+            "solver": solver,
+            "n_samples": self.folds.n,
+            "folds": folds,
+            "aggregate": self._aggregate(folds),
+            "elapsed_seconds": time.perf_counter() - start_time
+        }
+        aggregate = result["aggregate"]
+        if aggregate["folds_evaluated"]:
+            print(f"✅ Cross-validation completed: mean RMSE = {aggregate['rmse_mean']:.6f}, "
+                  f"mean R² = {aggregate['r2_mean']:.4f}")
+        else:
+            print("❌ Cross-validation completed: every fold exploded, try reducing the learning rate")
+        return result
+
+    def _evaluate(self, params: np.ndarray, exploded: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Held-out metrics of each fold for its (centered-scale) intercept and slope.
+
+        Folds whose gradient descent exploded get None for their parameters and
+        metrics: their last finite parameters are not a fit worth scoring.
+        """
+        test = self.fold_moments
+        n = test[:, 0]
+        params = np.where(exploded[:, None], 0.0, params)
+        sse = 2.0 * n * gd_kernels.moments_cost(test, params)
+        ss_tot = np.maximum(test[:, 5] - test[:, 2] ** 2 / n, 0.0)
+
+        # MAE needs the residuals themselves: one pass with each row's fold parameters
+        ids = self.folds.fold_ids
+        residuals = np.abs(self._y - (params[ids, 0] + params[ids, 1] * self._x))
+        abs_error = np.bincount(ids, weights=residuals, minlength=self.folds.k)
+
+        folds = []
+        for i in range(self.folds.k):
+            fold = {
+                "fold": i,
+                "train_size": int(self.folds.n - n[i]),
+                "test_size": int(n[i])
+            }
+            if exploded[i]:
+                fold.update(dict.fromkeys(("theta0", "theta1", "sse", "mse", "rmse", "mae", "r2")))
+            else:
+                slope = float(params[i, 1])
+                mse = float(sse[i] / n[i])
+                fold.update({
+                    "theta0": float(params[i, 0] + self._y_shift - slope * self._x_shift),
+                    "theta1": slope,
+                    "sse": float(sse[i]),
+                    "mse": mse,
+                    "rmse": float(np.sqrt(mse)),
+                    "mae": float(abs_error[i] / n[i]),
+                    "r2": 0.0 if ss_tot[i] == 0 else float(1 - sse[i] / ss_tot[i])
+                })
+            folds.append(fold)
+        return folds
+
+    def _aggregate(self, folds: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Mean and standard deviation of the fold metrics, plus pooled out-of-fold metrics.
+
+        Exploded folds are left out of the means; the pooled metrics need every
+        row's prediction, so they are None once any fold exploded.
+        """
+        evaluated = [fold for fold in folds if fold["mse"] is not None]
+        aggregate = {"folds_evaluated": len(evaluated), "folds_exploded": len(folds) - len(evaluated)}
+        for name in ("mse", "rmse", "mae", "r2"):
+            values = np.array([fold[name] for fold in evaluated])
+            aggregate[f"{name}_mean"] = float(np.mean(values)) if evaluated else None
+            aggregate[f"{name}_std"] = float(np.std(values)) if evaluated else None
+
+        if len(evaluated) < len(folds):
+            aggregate.update(pooled_rmse=None, pooled_mae=None, pooled_r2=None)
+            return aggregate
+
+        # Pooled over all out-of-fold predictions (every row is predicted exactly once)
+        n = self.folds.n
+        sse = sum(fold["sse"] for fold in folds)
+        ss_tot = float(np.sum(self.fold_moments[:, 5]))  # data is centered on its global mean
+        aggregate["pooled_rmse"] = float(np.sqrt(sse / n))
+        aggregate["pooled_mae"] = sum(fold["mae"] * fold["test_size"] for fold in folds) / n
+        aggregate["pooled_r2"] = 0.0 if ss_tot == 0 else float(1 - sse / ss_tot)
+        return aggregate
@@ -0,0 +1,168 @@
+"""
+Streaming CSV Ingestion for Uploads.
+Copies uploads to disk in chunks and parses only the needed columns.
+"""
+
+import os
+import tempfile
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import zstandard  # noqa: F401 (pandas uses it to read zstd files)
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Bytes read from the upload per chunk while spooling
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Rows parsed per chunk
+CSV_CHUNK_ROWS = 500_000
+
+# Magic numbers of supported compressed formats
+_MAGIC_NUMBERS = {
+    b"\x1f\x8b": "gzip",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+
+
+class SpooledUpload:
+    """An upload written to a temporary file on disk."""
+
+    def __init__(self, path: str, size: int, compression: Optional[str]):
+        self.path = path
+        self.size = size
+        self.compression = compression
+
+    def remove(self):
+        """Delete the spooled file."""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def check_compression(compression: Optional[str]):
+    """Raise ValueError if files with this compression cannot be read here."""
+    if compression == "zstd" and not ZSTD_AVAILABLE:
+        raise ValueError("zstd-compressed uploads need the zstandard package, which is not installed")
+
+
+def detect_compression(header: bytes) -> Optional[str]:
+    """Detect gzip/zstd compression from the first bytes of a file."""
+    for magic, compression in _MAGIC_NUMBERS.items():
+        if header.startswith(magic):
+            return compression
+    return None
+
+
+async def spool_upload(upload, spool_dir: Optional[str] = None,
+                       chunk_size: int = UPLOAD_CHUNK_SIZE, on_chunk=None) -> SpooledUpload:
+    """
+    Copy an uploaded file to a temporary file in fixed-size chunks.
+
+    With a FastAPI UploadFile the request body has already been received (and
+    spooled by Starlette) when this runs; the copy only bounds the memory used
+    per read and feeds on_chunk.
+
+    Args:
+        upload: Object with an async read(size) method (e.g. FastAPI UploadFile)
+        spool_dir: Directory for the temporary file (default: system temp dir)
+        chunk_size: Bytes to read per chunk
+        on_chunk: Optional callback invoked with every chunk (e.g. for hashing)
+
+    Returns:
+        SpooledUpload describing the file on disk
+    """
+    fd, path = tempfile.mkstemp(suffix=".upload", dir=spool_dir)
+    size = 0
+    header = b""
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                if len(header) < 4:
+                    header += chunk[:4 - len(header)]
+                if on_chunk is not None:
+                    on_chunk(chunk)
+                f.write(chunk)
+                size += len(chunk)
+    except Exception:
+        os.remove(path)
+        raise
+
+    return SpooledUpload(path, size, detect_compression(header))
+
+
+def read_csv_header(path: str, compression: Optional[str] = None) -> List[str]:
+    """Read only the column names of a (possibly compressed) CSV file."""
+    check_compression(compression)
+    return pd.read_csv(path, nrows=0, compression=compression).columns.tolist()
+
+
+def _grow(buffer: np.ndarray, size: int) -> np.ndarray:
+    """Resize a column buffer we own to `size` rows (in place where realloc allows)."""
+    buffer.resize(size, refcheck=False)
+    return buffer
+
+
+def read_csv_columns(path: str, columns: List[str], compression: Optional[str] = None,
+                     chunk_rows: int = CSV_CHUNK_ROWS) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Parse only the given columns of a CSV file in one chunked pass.
+
+    Each chunk is copied straight into one buffer per column, grown by doubling
+    and trimmed at the end, so the file is read (and decompressed) once and peak
+    memory stays near one copy of the columns. Columns are kept as float64; a
+    column switches to objects from the first chunk holding a non-numeric value,
+    so cleaning can handle those rows, while the other columns stay numeric.
+
+    Args:
+        path: Path to the CSV file
+        columns: Columns to keep
+        compression: "gzip", "zstd" or None; decompression is streamed
+        chunk_rows: Number of rows parsed per chunk
+
+    Returns:
+        Tuple of (DataFrame with only the requested columns, all column names)
+
+    Raises:
+        KeyError: If a column is not in the file
+        ValueError: If the compression is not supported here
+    """
+    all_columns = read_csv_header(path, compression)
+    missing = [c for c in columns if c not in all_columns]
+    if missing:
+        raise KeyError(f"Columns not found: {missing}")
+
+    usecols = list(dict.fromkeys(columns))
+    buffers = {c: np.empty(0, dtype=np.float64) for c in usecols}
+    capacity = 0
+    rows = 0
+    reader = pd.read_csv(path, usecols=usecols, compression=compression, chunksize=chunk_rows)
+    for chunk in reader:
+        end = rows + len(chunk)
+        if end > capacity:
+            capacity = max(end, 2 * capacity)
+            for c in usecols:
+                buffers[c] = _grow(buffers[c], capacity)
+        for c in usecols:
+            series = chunk[c]
+            if buffers[c].dtype != object and not pd.api.types.is_numeric_dtype(series.dtype):
+                print(f"⚠️ Non-numeric values found in column '{c}', keeping it as objects")
+                buffers[c] = buffers[c].astype(object)
+            if buffers[c].dtype == object:
+                buffers[c][rows:end] = series.to_numpy(dtype=object)
+            else:
+                buffers[c][rows:end] = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        rows = end
+
+    for c in usecols:
+        buffers[c] = _grow(buffers[c], rows)
+    # copy=False keeps the column buffers as they are (no consolidation copy)
+    return pd.DataFrame(buffers, copy=False), all_columns
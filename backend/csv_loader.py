@@ -1,103 +1,290 @@
-"""
-CSV Loader for Backend Data Processing.
-Simple and clean.
-"""
-
-import pandas as pd
-import numpy as np
-from typing import Dict, Any
-
-
-class CSVLoader:
-    """Handles CSV data cleaning operations."""
-    
-    def __init__(self, x_column: str, y_column: str):
-        self._x_column = x_column
-        self._y_column = y_column
-    
-    @property
-    def x_column(self) -> str:
-        return self._x_column
-    
-    @property
-    def y_column(self) -> str:
-        return self._y_column
-    
-    def clean_data(self, df: pd.DataFrame, remove_duplicates: bool = True, 
-                   remove_outliers: bool = False, handle_missing: str = "remove",
-                   remove_strings: bool = True) -> pd.DataFrame:
-        """Clean data based on user preferences."""
-        df_clean = df.copy()
-        original_count = len(df_clean)
-        
-        print(f"🧹 Cleaning data: {original_count} rows")
-        
-        # Remove strings first
-        if remove_strings:
-            df_clean = self._remove_string_rows(df_clean)
-        
-        # Handle missing values
-        if handle_missing == "mean":
-            df_clean[self._x_column].fillna(df_clean[self._x_column].mean(), inplace=True)
-            df_clean[self._y_column].fillna(df_clean[self._y_column].mean(), inplace=True)
-        else:
-            df_clean = df_clean.dropna(subset=[self._x_column, self._y_column])
-        
-        # Remove duplicates
-        if remove_duplicates:
-            df_clean = df_clean.drop_duplicates()
-        
-        # Remove outliers
-        if remove_outliers:
-            df_clean = self._remove_outliers(df_clean)
-        
-        # Convert to numeric
-        df_clean[self._x_column] = pd.to_numeric(df_clean[self._x_column], errors='coerce')
-        df_clean[self._y_column] = pd.to_numeric(df_clean[self._y_column], errors='coerce')
-        
-        final_count = len(df_clean)
-        print(f"✅ Cleaning complete: {original_count} → {final_count} rows")
-        
-        return df_clean
-    
-    def _remove_string_rows(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Remove rows with string values."""
-        x_numeric = pd.to_numeric(df[self._x_column], errors='coerce')
-        y_numeric = pd.to_numeric(df[self._y_column], errors='coerce')
-        return df[x_numeric.notna() & y_numeric.notna()]
-    
-    def _remove_outliers(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Remove outliers using IQR method."""
-        Q1 = df[self._x_column].quantile(0.25)
-        Q3 = df[self._x_column].quantile(0.75)
-        IQR = Q3 - Q1
-        lower = Q1 - 1.5 * IQR
-        upper = Q3 + 1.5 * IQR
-        return df[(df[self._x_column] >= lower) & (df[self._x_column] <= upper)]
-    
-    def get_statistics(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Get basic statistics for X and Y columns."""
-        return {
-            'x_stats': {
-                'mean': float(df[self._x_column].mean()),
-                'std': float(df[self._x_column].std()),
-                'min': float(df[self._x_column].min()),
-                'max': float(df[self._x_column].max())
-            },
-            'y_stats': {
-                'mean': float(df[self._y_column].mean()),
-                'std': float(df[self._y_column].std()),
-                'min': float(df[self._y_column].min()),
-                'max': float(df[self._y_column].max())
-            }
-        }
-    
-    def get_cleaning_summary(self, original_df: pd.DataFrame, cleaned_df: pd.DataFrame) -> Dict[str, Any]:
-        """Get summary of cleaning operations."""
-        return {
-            "original_rows": len(original_df),
-            "cleaned_rows": len(cleaned_df),
-            "rows_removed": len(original_df) - len(cleaned_df),
-            "x_column": self._x_column,
-            "y_column": self._y_column
-        }
+"""
+CSV Loader for Backend Data Processing.
+Cleans the X/Y columns as float blocks through a pipeline of cached stages.
+"""
+
+import threading
+
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, List, Tuple
+
+
+class CSVLoader:
+    """Handles CSV data cleaning operations."""
+    
+    def __init__(self, x_column: str | List[str], y_column: str):
+        # One feature column or a list of them; x_column is the first feature
+        self._x_columns = [x_column] if isinstance(x_column, str) else list(x_column)
+        if not self._x_columns:
+            raise ValueError("At least one X column is required")
+        self._x_column = self._x_columns[0]
+        self._y_column = y_column
+        self._columns = list(dict.fromkeys(self._x_columns + [y_column]))
+    
+    @property
+    def x_column(self) -> str:
+        return self._x_column
+    
+    @property
+    def x_columns(self) -> List[str]:
+        return list(self._x_columns)
+    
+    @property
+    def y_column(self) -> str:
+        return self._y_column
+    
+    def clean_data(self, df: pd.DataFrame, remove_duplicates: bool = True, 
+                   remove_outliers: bool = False, handle_missing: str = "remove",
+                   remove_strings: bool = True) -> pd.DataFrame:
+        """
+        Clean data based on user preferences.
+        
+        The X/Y columns are converted to one float block once; each option then
+        only narrows a single boolean keep-mask over the original rows, and the
+        result is materialized with one take. Other columns of df are not copied.
+        To re-clean the same data with other options, keep the pipeline from
+        pipeline(df) instead, so the conversion and unchanged stages are reused.
+        
+        Args:
+            df: Raw data (X/Y columns may hold strings)
+            remove_duplicates: Drop repeated (X, Y) rows, keeping the first
+            remove_outliers: Drop rows with an X value outside 1.5 IQR
+            handle_missing: "mean" to fill missing values with the column mean,
+                anything else to drop rows with missing values
+            remove_strings: Drop rows where any X/Y value is not a number
+                (or is missing); otherwise such values count as missing
+            
+        Returns:
+            DataFrame of the X/Y columns as float64, keeping the original index
+        """
+        return self.pipeline(df).clean(remove_duplicates, remove_outliers, handle_missing, remove_strings)
+    
+    def pipeline(self, df: pd.DataFrame) -> "CleaningPipeline":
+        """Convert the X/Y columns of df once and return a stage-cached cleaning pipeline for them."""
+        return CleaningPipeline(self, df)
+    
+    def _to_float_block(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Convert the X/Y columns to one n×c float64 block.
+        
+        Returns:
+            Tuple of (values, missing, strings): the block (NaN where a value is
+            missing or not a number) and per-row masks of rows with a missing value
+            and rows with a non-numeric string
+        """
+        n = len(df)
+        values = np.empty((n, len(self._columns)), dtype=np.float64)
+        missing = np.zeros(n, dtype=bool)
+        strings = np.zeros(n, dtype=bool)
+        for j, column in enumerate(self._columns):
+            series = df[column]
+            if pd.api.types.is_numeric_dtype(series.dtype):
+                values[:, j] = series.to_numpy(dtype=np.float64, na_value=np.nan)
+                missing |= np.isnan(values[:, j])
+            else:
+                values[:, j] = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+                present = series.notna().to_numpy()
+                missing |= ~present
+                strings |= present & np.isnan(values[:, j])
+        return values, missing, strings
+    
+    def _fill_missing(self, values: np.ndarray, keep: np.ndarray):
+        """Fill NaN in place with each column's mean over the kept rows."""
+        for j in range(values.shape[1]):
+            column = values[:, j]
+            nan = np.isnan(column)
+            if nan.any():
+                column[nan] = np.nanmean(column[keep]) if keep.any() else np.nan
+    
+    def _duplicate_mask(self, values: np.ndarray) -> np.ndarray:
+        """
+        Rows of the block that repeat an earlier row.
+        
+        A single feature plus target (the common case) is packed into one complex
+        column so each row is hashed once, exactly, instead of factorizing per column.
+        """
+        if values.shape[1] == 1:
+            return pd.Series(values[:, 0]).duplicated().to_numpy()
+        if values.shape[1] == 2:
+            rows = np.empty(len(values), dtype=np.complex128)
+            rows.real = values[:, 0]
+            rows.imag = values[:, 1]
+            return pd.Series(rows).duplicated().to_numpy()
+        return pd.DataFrame(values).duplicated().to_numpy()
+    
+    def _inlier_mask(self, values: np.ndarray) -> np.ndarray:
+        """Rows whose X values are all within the IQR fences (Q1 - 1.5 IQR, Q3 + 1.5 IQR)."""
+        inliers = np.ones(len(values), dtype=bool)
+        for name in self._x_columns:
+            column = values[:, self._columns.index(name)]
+            finite = column[~np.isnan(column)]
+            if len(finite) == 0:
+                return np.zeros(len(values), dtype=bool)
+            q1, q3 = np.quantile(finite, [0.25, 0.75])
+            iqr = q3 - q1
+            inliers &= (column >= q1 - 1.5 * iqr) & (column <= q3 + 1.5 * iqr)
+        return inliers
+    
+    def get_statistics(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Get basic statistics for X and Y columns."""
+        return {
+            'x_stats': {
+                'mean': float(df[self._x_column].mean()),
+                'std': float(df[self._x_column].std()),
+                'min': float(df[self._x_column].min()),
+                'max': float(df[self._x_column].max())
+            },
+            'y_stats': {
+                'mean': float(df[self._y_column].mean()),
+                'std': float(df[self._y_column].std()),
+                'min': float(df[self._y_column].min()),
+                'max': float(df[self._y_column].max())
+            }
+        }
+    
+    def get_cleaning_summary(self, original_df: pd.DataFrame, cleaned_df: pd.DataFrame) -> Dict[str, Any]:
+        """Get summary of cleaning operations."""
+        return self._summary(len(original_df), len(cleaned_df))
+    
+    def _summary(self, original_rows: int, cleaned_rows: int) -> Dict[str, Any]:
+        return {
+            "original_rows": original_rows,
+            "cleaned_rows": cleaned_rows,
+            "rows_removed": original_rows - cleaned_rows,
+            "x_column": self._x_column,
+            "x_columns": self.x_columns,
+            "y_column": self._y_column
+        }
+
+
+class CleaningPipeline:
+    """
+    Cleaning of one parsed dataset as a chain of cached stages.
+    
+    The stages run in a fixed order (strings, missing, duplicates, outliers).
+    Each produces a keep-mask over the original rows, and the values it leaves
+    (a mean-filled copy only after mean imputation), and depends only on its own
+    option and those of the stages before it. Results are cached under that
+    option prefix, so changing one option recomputes only the stages from it
+    onwards; flipping back to earlier options is served from the cache.
+    """
+    
+    STAGES = ("strings", "missing", "duplicates", "outliers")
+    
+    def __init__(self, loader: CSVLoader, df: pd.DataFrame):
+        self._loader = loader
+        self._index = df.index
+        self._values, self._missing, self._strings = loader._to_float_block(df)
+        self._cache: Dict[Tuple, Tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self.last_recomputed: List[str] = []
+    
+    @property
+    def loader(self) -> CSVLoader:
+        return self._loader
+    
+    @property
+    def original_rows(self) -> int:
+        return len(self._index)
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the converted block, its masks and the cached stage results."""
+        held = {id(a): a.nbytes for a in (self._values, self._missing, self._strings)}
+        for keep, values in self._cache.values():
+            held[id(keep)] = keep.nbytes
+            held[id(values)] = values.nbytes
+        return int(sum(held.values()))
+    
+    def __getstate__(self):
+        # Sessions holding a pipeline are pickled when spilled; the lock is not picklable
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def stage_options(remove_duplicates: bool = True, remove_outliers: bool = False,
+                      handle_missing: str = "remove", remove_strings: bool = True) -> Tuple:
+        """Options in stage order, normalized so equivalent settings share cache entries."""
+        return (bool(remove_strings), "mean" if handle_missing == "mean" else "remove",
+                bool(remove_duplicates), bool(remove_outliers))
+    
+    def clean(self, remove_duplicates: bool = True, remove_outliers: bool = False,
+              handle_missing: str = "remove", remove_strings: bool = True) -> pd.DataFrame:
+        """
+        Clean the dataset with the given options (see CSVLoader.clean_data).
+        
+        Returns:
+            DataFrame of the X/Y columns as float64, keeping the original index
+        """
+        rows, values = self.select(remove_duplicates, remove_outliers, handle_missing, remove_strings)
+        return pd.DataFrame(values, index=self._index[rows], columns=self._loader._columns)
+    
+    def select(self, remove_duplicates: bool = True, remove_outliers: bool = False,
+               handle_missing: str = "remove", remove_strings: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Kept rows for the given options, taken once from the cached stage results.
+        
+        Returns:
+            Tuple of (rows, values): positions of the kept rows in the original
+            data and their X/Y values as a float64 block
+        """
+        options = self.stage_options(remove_duplicates, remove_outliers, handle_missing, remove_strings)
+        with self._lock:
+            keep, values = self._run(options)
+        rows = np.flatnonzero(keep)
+        return rows, values[rows]
+    
+    def get_cleaning_summary(self, cleaned_df: pd.DataFrame) -> Dict[str, Any]:
+        """Get summary of cleaning operations (see CSVLoader.get_cleaning_summary)."""
+        return self._loader._summary(self.original_rows, len(cleaned_df))
+    
+    def _run(self, options: Tuple) -> Tuple[np.ndarray, np.ndarray]:
+        """Final (keep, values) for the options, computing only the stages missing from the cache."""
+        keep = np.ones(self.original_rows, dtype=bool)
+        values = self._values
+        recomputed = []
+        for i, stage in enumerate(self.STAGES):
+            key = options[:i + 1]
+            result = self._cache.get(key)
+            if result is None:
+                result = getattr(self, f"_stage_{stage}")(keep, values, options[i])
+                self._cache[key] = result
+                recomputed.append(stage)
+            keep, values = result
+        self.last_recomputed = recomputed
+        return keep, values
+    
+    # Stages never modify their inputs: those are cached results of earlier stages
+    
+    def _stage_strings(self, keep: np.ndarray, values: np.ndarray, remove_strings: bool):
+        # Rows with missing values go too, as to_numeric marks both
+        if remove_strings:
+            keep = keep & ~(self._strings | self._missing)
+        return keep, values
+    
+    def _stage_missing(self, keep: np.ndarray, values: np.ndarray, handle_missing: str):
+        # Unparsable strings that were kept are missing now
+        if handle_missing == "mean":
+            values = values.copy()
+            self._loader._fill_missing(values, keep)
+        else:
+            keep = keep & ~(self._strings | self._missing)
+        return keep, values
+    
+    def _stage_duplicates(self, keep: np.ndarray, values: np.ndarray, remove_duplicates: bool):
+        if remove_duplicates:
+            keep = keep.copy()
+            keep[keep] = ~self._loader._duplicate_mask(values[keep])
+        return keep, values
+    
+    def _stage_outliers(self, keep: np.ndarray, values: np.ndarray, remove_outliers: bool):
+        if remove_outliers:
+            keep = keep.copy()
+            keep[keep] = self._loader._inlier_mask(values[keep])
+        return keep, values
@@ -3,6 +3,8 @@ import numpy as np
 import pandas as pd
 from typing import Tuple
 
+from .csv_loader import CSVLoader, CleaningPipeline
+
 class DataProcessor:
     """
     Encapsulation:
@@ -23,6 +25,10 @@ class DataProcessor:
         self.__y_mean: float | None = None
         self.__y_std: float | None = None
 
+        # Cleaning stages of the last frame passed to clean(), reused while it is the same frame
+        self.__pipeline: CleaningPipeline | None = None
+        self.__pipeline_source: pd.DataFrame | None = None
+
     # ---------- Properties (read-only view of private state) ----------
     @property
     def x_mean(self) -> float: return self.__x_mean
@@ -36,10 +42,14 @@ class DataProcessor:
     # ---------- Cleaning ----------
     def clean(self, df: pd.DataFrame) -> pd.DataFrame:
         try:
-            df = df.drop_duplicates()
-            df = df.copy()
-            df[self.x_col] = pd.to_numeric(df[self.x_col], errors='coerce')
-            df[self.y_col] = pd.to_numeric(df[self.y_col], errors='coerce')
+            if self.__pipeline is None or self.__pipeline_source is not df:
+                self.__pipeline = CSVLoader(self.x_col, self.y_col).pipeline(df)
+                self.__pipeline_source = df
+            # Strings, missing values and duplicate (X, Y) rows go through the cached stages
+            rows, values = self.__pipeline.select(remove_duplicates=True)
+            df = df.iloc[rows].copy()
+            df[self.x_col] = values[:, 0]
+            df[self.y_col] = values[:, -1]
             df = df.dropna()
             if df.empty:
                 raise ValueError("Data is empty after cleaning.")
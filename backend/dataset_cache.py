@@ -0,0 +1,134 @@
+"""
+Content-Addressed Dataset Cache.
+Persists cleaned X/Y arrays as memory-mappable .npy files keyed by upload content.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+class DatasetCache:
+    """
+    Cache of cleaned datasets on disk.
+
+    Entries are keyed by (content hash, columns, cleaning options) and stored as
+    one directory holding x.npy, y.npy and meta.json. Hits are memory-mapped, so
+    repeat processing skips parsing and cleaning entirely. The total size is kept
+    under max_bytes by evicting the least recently used entries.
+    """
+
+    META_FILE = "meta.json"
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def new_hasher():
+        """Hasher used for upload content (fed chunk by chunk while receiving)."""
+        return hashlib.sha256()
+
+    @staticmethod
+    def make_key(content_hash: str, x_column: str, y_column: str, options: Dict[str, Any]) -> str:
+        """Build the cache key for a cleaned dataset."""
+        key_data = json.dumps({
+            "content": content_hash,
+            "x_column": x_column,
+            "y_column": y_column,
+            "options": options
+        }, sort_keys=True)
+        return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cleaned dataset.
+
+        Returns:
+            Dictionary with memory-mapped 'x' and 'y' arrays and 'meta', or None on a miss
+        """
+        entry = self._entry_dir(key)
+        meta_path = os.path.join(entry, self.META_FILE)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            x = np.load(os.path.join(entry, "x.npy"), mmap_mode='r')
+            y = np.load(os.path.join(entry, "y.npy"), mmap_mode='r')
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # Record the access for LRU eviction
+        os.utime(meta_path)
+        self.hits += 1
+        return {"x": x, "y": y, "meta": meta}
+
+    def put(self, key: str, x: np.ndarray, y: np.ndarray, meta: Dict[str, Any]):
+        """Store a cleaned dataset, then evict old entries if over the size limit."""
+        entry = self._entry_dir(key)
+        if os.path.isdir(entry):
+            return
+
+        # Write to a private directory first so readers never see partial entries
+        tmp_entry = os.path.join(self.cache_dir, f".{key}.{uuid.uuid4().hex}.tmp")
+        os.makedirs(tmp_entry)
+        try:
+            np.save(os.path.join(tmp_entry, "x.npy"), np.ascontiguousarray(x, dtype=np.float64))
+            np.save(os.path.join(tmp_entry, "y.npy"), np.ascontiguousarray(y, dtype=np.float64))
+            with open(os.path.join(tmp_entry, self.META_FILE), 'w') as f:
+                json.dump(meta, f)
+            os.rename(tmp_entry, entry)
+        except OSError:
+            # Another request stored the same entry first
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            return
+
+        self.evict()
+
+    def _entries(self):
+        """(last access time, size, path) for every complete entry."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            meta_path = os.path.join(path, self.META_FILE)
+            if name.startswith('.') or not os.path.isfile(meta_path):
+                continue
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            entries.append((os.path.getmtime(meta_path), size, path))
+        return entries
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+                print(f"🗑️ Dataset cache entry evicted: {os.path.basename(path)[:12]}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Summary of cache usage."""
+        entries = self._entries()
+        return {
+            "entries": len(entries),
+            "total_bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
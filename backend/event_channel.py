@@ -0,0 +1,66 @@
+"""
+Coalescing Event Channel.
+Buffers outgoing training events per client without letting slow clients grow memory.
+"""
+
+import asyncio
+from collections import deque
+from typing import Deque, Tuple
+
+# Pending epoch updates above which they are collapsed to the latest one
+DEFAULT_MAX_PENDING = 32
+
+
+class CoalescingEventBuffer:
+    """
+    Outgoing message buffer for one client.
+
+    put() never blocks, so the producer (the training loop) runs at its own pace.
+    Messages are delivered in order. Coalescable messages (epoch updates) describe
+    the latest state, so once more than max_pending of them are waiting the older
+    ones are dropped and only the newest is kept. Other messages (control replies,
+    final results, errors) are always delivered.
+    """
+
+    def __init__(self, max_pending: int = DEFAULT_MAX_PENDING):
+        self.max_pending = max_pending
+        self.coalesced = 0
+        self._queue: Deque[Tuple[bool, str]] = deque()
+        self._pending_coalescable = 0
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def put(self, message: str, coalescable: bool = False):
+        """Queue a message; collapses pending coalescable messages when over the threshold."""
+        self._queue.append((coalescable, message))
+        if coalescable:
+            self._pending_coalescable += 1
+            if self._pending_coalescable > self.max_pending:
+                self._coalesce()
+        self._ready.set()
+
+    def _coalesce(self):
+        """Drop every pending coalescable message except the newest."""
+        latest = None
+        kept = deque()
+        for coalescable, message in self._queue:
+            if coalescable:
+                latest = message
+            else:
+                kept.append((False, message))
+        kept.append((True, latest))
+        self.coalesced += self._pending_coalescable - 1
+        self._pending_coalescable = 1
+        self._queue = kept
+
+    async def get(self) -> str:
+        """Wait for and return the next message."""
+        while not self._queue:
+            self._ready.clear()
+            await self._ready.wait()
+        coalescable, message = self._queue.popleft()
+        if coalescable:
+            self._pending_coalescable -= 1
+        return message
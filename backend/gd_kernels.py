@@ -0,0 +1,252 @@
+"""
+Compiled Gradient Descent Kernels.
+Runs the whole training loop in native code when Numba is installed.
+"""
+
+import math
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback decorator: keep the kernel as a plain scalar Python loop."""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# Columns of a snapshot row returned by the kernel
+SNAPSHOT_COLUMNS = ("epoch", "theta0", "theta1", "cost")
+
+# Kernel state vector layout
+STATE_EPOCH = 0          # next epoch to run
+STATE_THETA0 = 1
+STATE_THETA1 = 2
+STATE_PREV_COST = 3
+STATE_NO_IMPROVEMENT = 4
+STATE_LAST_COST = 5
+STATE_SIZE = 6
+
+# Kernel status codes
+STATUS_RUNNING = 0
+STATUS_MAX_EPOCHS = 1
+STATUS_EARLY_STOPPED = 2
+STATUS_EXPLODED = 3
+
+# Names of the final statuses, as reported by the API
+STATUS_NAMES = {
+    STATUS_MAX_EPOCHS: "max_epochs",
+    STATUS_EARLY_STOPPED: "early_stopped",
+    STATUS_EXPLODED: "exploded"
+}
+
+# Same patience as LinearRegressionModel.train_epoch_by_epoch
+EARLY_STOPPING_PATIENCE = 15
+
+
+def new_state(theta0: float, theta1: float) -> np.ndarray:
+    """Create a kernel state vector starting at epoch 1."""
+    state = np.zeros(STATE_SIZE, dtype=np.float64)
+    state[STATE_EPOCH] = 1
+    state[STATE_THETA0] = theta0
+    state[STATE_THETA1] = theta1
+    state[STATE_PREV_COST] = np.inf
+    state[STATE_LAST_COST] = np.inf
+    return state
+
+
+@njit(cache=True)
+def run_moments_gd_block(moments, state, learning_rate, tolerance, early_stopping,
+                         max_epochs, block_epochs, snapshot_every, snapshots):
+    """
+    Run up to block_epochs gradient-descent epochs from the cached moments.
+
+    Mirrors train_epoch_by_epoch: cost is taken before the update, the run counts
+    as exploded (and the update is discarded) once the cost or the new parameters
+    are NaN/Inf, and training stops after EARLY_STOPPING_PATIENCE epochs
+    with a cost change below tolerance.
+
+    Args:
+        moments: [n, Σx, Σy, Σx², Σxy, Σy²] of the normalized training data
+        state: Kernel state vector, updated in place
+        learning_rate: Learning rate (α)
+        tolerance: Convergence tolerance
+        early_stopping: Whether to stop early if cost doesn't improve
+        max_epochs: Maximum number of training epochs
+        block_epochs: Maximum number of epochs to run in this call
+        snapshot_every: Record a snapshot row every N epochs
+        snapshots: Output array of shape (rows, 4), filled from row 0
+
+    Returns:
+        Tuple of (status, number of snapshot rows written)
+    """
+    n = float(moments[0])
+    sum_x = float(moments[1])
+    sum_y = float(moments[2])
+    sum_xx = float(moments[3])
+    sum_xy = float(moments[4])
+    sum_yy = float(moments[5])
+
+    epoch = int(state[0])
+    theta0 = float(state[1])
+    theta1 = float(state[2])
+    prev_cost = float(state[3])
+    no_improvement = int(state[4])
+    cost = float(state[5])
+
+    status = 0
+    rows = 0
+    last_recorded = 0
+    end_epoch = min(max_epochs, epoch + block_epochs - 1)
+
+    while epoch <= end_epoch:
+        sse = (n * theta0 * theta0 + theta1 * theta1 * sum_xx + sum_yy
+               + 2.0 * theta0 * theta1 * sum_x
+               - 2.0 * theta0 * sum_y - 2.0 * theta1 * sum_xy)
+        cost = max(sse, 0.0) / (2.0 * n)
+        grad0 = (n * theta0 + theta1 * sum_x - sum_y) / n
+        grad1 = (theta0 * sum_x + theta1 * sum_xx - sum_xy) / n
+
+        new_theta0 = theta0 - learning_rate * grad0
+        new_theta1 = theta1 - learning_rate * grad1
+        if not (math.isfinite(cost) and math.isfinite(new_theta0) and math.isfinite(new_theta1)):
+            status = 3
+            break
+        theta0 = new_theta0
+        theta1 = new_theta1
+
+        cost_change = abs(prev_cost - cost)
+        if early_stopping and cost_change < tolerance:
+            no_improvement += 1
+            if no_improvement >= 15:
+                status = 2
+                break
+        else:
+            no_improvement = 0
+
+        if epoch % snapshot_every == 0 or epoch == max_epochs:
+            snapshots[rows, 0] = epoch
+            snapshots[rows, 1] = theta0
+            snapshots[rows, 2] = theta1
+            snapshots[rows, 3] = cost
+            rows += 1
+            last_recorded = epoch
+
+        prev_cost = cost
+        epoch += 1
+
+    if status == 0 and epoch > max_epochs:
+        status = 1
+
+    # Always hand back the last completed epoch when training ends
+    if status == 2 and last_recorded != epoch:
+        snapshots[rows, 0] = epoch
+        snapshots[rows, 1] = theta0
+        snapshots[rows, 2] = theta1
+        snapshots[rows, 3] = cost
+        rows += 1
+    elif status == 3 and epoch > 1 and last_recorded != epoch - 1:
+        snapshots[rows, 0] = epoch - 1
+        snapshots[rows, 1] = theta0
+        snapshots[rows, 2] = theta1
+        snapshots[rows, 3] = prev_cost
+        rows += 1
+
+    state[0] = epoch
+    state[1] = theta0
+    state[2] = theta1
+    state[3] = prev_cost
+    state[4] = no_improvement
+    state[5] = cost
+
+    return status, rows
+
+
+def run_batched_moments_gd(moments, theta, learning_rates, tolerances, max_epochs, early_stopping):
+    """
+    Run K independent gradient-descent problems at once from their moments.
+
+    Every epoch updates the K×2 theta matrix with one batched matrix product.
+    Problems stop with the same rules as run_moments_gd_block (explosion, early
+    stopping after EARLY_STOPPING_PATIENCE stable epochs, epoch cap) and are
+    dropped from the active set, so later epochs only touch the problems that
+    are still running.
+
+    Args:
+        moments: Array of shape (K, 6) with [n, Σx, Σy, Σx², Σxy, Σy²] per problem
+        theta: Array of shape (K, 2) with the starting parameters, updated in place
+        learning_rates: Learning rate per problem (length K)
+        tolerances: Convergence tolerance per problem (length K)
+        max_epochs: Epoch cap per problem (length K)
+        early_stopping: Whether problems stop once their cost is stable
+
+    Returns:
+        Tuple of (status, epochs_run, converged_epoch) arrays of length K;
+        converged_epoch is 0 for problems whose cost change never fell below tolerance
+    """
+    k = len(theta)
+    n = moments[:, 0]
+    gram = np.stack([moments[:, [0, 1]], moments[:, [1, 3]]], axis=1)
+    rhs = moments[:, [2, 4]]
+    sum_yy = moments[:, 5]
+
+    prev_cost = np.full(k, np.inf)
+    no_improvement = np.zeros(k, dtype=np.int64)
+    epochs_run = np.zeros(k, dtype=np.int64)
+    converged_epoch = np.zeros(k, dtype=np.int64)
+    status = np.full(k, STATUS_RUNNING)
+
+    active = np.flatnonzero(max_epochs > 0)
+    status[max_epochs <= 0] = STATUS_MAX_EPOCHS
+    epoch = 0
+    # Exploding problems overflow before they are masked out
+    with np.errstate(over='ignore', invalid='ignore'):
+        while active.size:
+            epoch += 1
+            t = theta[active]
+            n_active = n[active]
+            rhs_active = rhs[active]
+
+            # Batched cost and gradients: X^T X θ and θ^T X^T X θ from the moments
+            t_gram = np.einsum('kij,kj->ki', gram[active], t)
+            cost = np.maximum(np.einsum('ki,ki->k', t_gram, t) - 2.0 * np.einsum('ki,ki->k', t, rhs_active)
+                              + sum_yy[active], 0.0) / (2.0 * n_active)
+            new_t = t - (learning_rates[active] / n_active)[:, None] * (t_gram - rhs_active)
+
+            finite = np.isfinite(new_t).all(axis=1) & np.isfinite(cost)
+            theta[active[finite]] = new_t[finite]
+            epochs_run[active[finite]] = epoch
+            status[active[~finite]] = STATUS_EXPLODED
+
+            stable = np.abs(prev_cost[active] - cost) < tolerances[active]
+            first = stable & (converged_epoch[active] == 0)
+            converged_epoch[active[first]] = epoch
+            prev_cost[active] = cost
+
+            running = finite.copy()
+            if early_stopping:
+                no_improvement[active] = np.where(stable, no_improvement[active] + 1, 0)
+                stopped = running & (no_improvement[active] >= EARLY_STOPPING_PATIENCE)
+                status[active[stopped]] = STATUS_EARLY_STOPPED
+                running &= ~stopped
+            capped = running & (epoch >= max_epochs[active])
+            status[active[capped]] = STATUS_MAX_EPOCHS
+            running &= ~capped
+
+            if not running.all():
+                active = active[running]
+
+    return status, epochs_run, converged_epoch
+
+
+def moments_cost(moments, theta):
+    """Cost (MSE / 2) of each row of a K×2 theta matrix against its (K, 6) moments."""
+    n, sum_x, sum_y, sum_xx, sum_xy, sum_yy = moments.T
+    t0, t1 = theta[:, 0], theta[:, 1]
+    sse = (sum_yy - 2.0 * (t0 * sum_y + t1 * sum_xy)
+           + n * t0 ** 2 + 2.0 * t0 * t1 * sum_x + t1 ** 2 * sum_xx)
+    return np.maximum(sse, 0.0) / (2.0 * n)
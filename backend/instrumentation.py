@@ -0,0 +1,329 @@
+"""
+Instrumentation.
+Counters, gauges and latency histograms for the hot paths, rendered in the Prometheus text format.
+"""
+
+import bisect
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Latency buckets in seconds, from sub-millisecond epochs to multi-second uploads
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Exposition format 0.0.4 (Starlette appends "; charset=utf-8" to text responses)
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def size_bucket(rows: Optional[int]) -> str:
+    """
+    Order-of-magnitude label for a dataset size ("1e3" covers 101–1000 rows).
+
+    Keeps the label set small while still separating small and large datasets.
+    """
+    if rows is None:
+        return "unknown"
+    if rows <= 1:
+        return "1e0"
+    return f"1e{math.ceil(math.log10(rows))}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    """Base of the labelled metric families."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, **labels):
+        """The child series for one set of label values (create it on first use)."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {list(self.labelnames)}, got {sorted(labels)}")
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} needs labels {list(self.labelnames)}")
+        return self.labels()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key, child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.get())}"]
+
+
+class _Value:
+    """A single float guarded by a lock."""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = float(value)
+
+    def get(self) -> float:
+        return self._value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count (e.g. epochs trained, bytes streamed)."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        (self.labels(**labels) if labels else self._default()).inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that goes up and down (e.g. open streams)."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value: float, **labels):
+        (self.labels(**labels) if labels else self._default()).set(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        (self.labels(**labels) if labels else self._default()).inc(amount)
+
+    def dec(self, amount: float = 1.0, **labels):
+        (self.labels(**labels) if labels else self._default()).dec(amount)
+
+
+class _HistogramChild:
+    """Bucket counts, sum and count of one histogram series."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, count: int = 1):
+        """Record `count` observations of `value` (e.g. one block of equally long epochs)."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += count
+            self.sum += value * count
+            self.count += count
+
+    def observe_many(self, values: List[float]):
+        """Record a batch of observations (e.g. buffered epoch times) under one lock acquisition."""
+        indices = [bisect.bisect_left(self.buckets, value) for value in values]
+        total = sum(values)
+        with self._lock:
+            for index in indices:
+                self.counts[index] += 1
+            self.sum += total
+            self.count += len(indices)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (latencies) over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float, count: int = 1, **labels):
+        (self.labels(**labels) if labels else self._default()).observe(value, count)
+
+    def _render_child(self, key, child) -> List[str]:
+        counts, total, count = child.snapshot()
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+            cumulative += bucket_count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class _CallbackMetric:
+    """Metric whose value is read from a function at scrape time (e.g. registry sizes)."""
+
+    def __init__(self, name: str, documentation: str, kind: str, function: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.function = function
+
+    def render(self) -> List[str]:
+        try:
+            value = float(self.function())
+        except Exception as e:
+            print(f"⚠️ Metric {self.name} failed: {e}")
+            return []
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}",
+                f"{self.name} {_format_value(value)}"]
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together by /api/metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, function: Callable[[], float], kind: str = "gauge"):
+        """Register a gauge (or counter) read from function() on every scrape."""
+        if kind not in ("gauge", "counter"):
+            raise ValueError(f"Unsupported callback metric type: {kind}")
+        return self._register(_CallbackMetric(name, documentation, kind, function))
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry and the metrics shared by the backend modules
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "lr_stage_duration_seconds",
+    "Time spent in each processing stage, by dataset size (order of magnitude of rows).",
+    ("stage", "rows")
+)
+EPOCHS_TOTAL = registry.counter(
+    "lr_training_epochs_total", "Gradient-descent epochs computed.", ("engine",)
+)
+STREAM_BYTES_TOTAL = registry.counter(
+    "lr_stream_bytes_total", "Bytes streamed to clients (training events, bulk predictions).", ("channel",)
+)
+STREAM_EVENTS_TOTAL = registry.counter(
+    "lr_stream_events_total", "Training events sent to clients.", ("channel",)
+)
+
+
+class timed:
+    """
+    Time a block as one observation of a stage.
+
+    The row count may be set (or corrected) inside the block once it is known:
+
+        with timed("csv_parse") as timer:
+            df = parse()
+            timer.rows = len(df)
+    """
+
+    __slots__ = ("stage", "rows", "start", "elapsed")
+
+    def __init__(self, stage: str, rows: Optional[int] = None):
+        self.stage = stage
+        self.rows = rows
+        self.start = 0.0
+        self.elapsed = 0.0
+
+    def __enter__(self) -> "timed":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self.start
+        observe_stage(self.stage, self.elapsed, self.rows)
+        return False
+
+
+def observe_stage(stage: str, seconds: float, rows: Optional[int] = None, count: int = 1):
+    """Record a stage duration measured elsewhere (count > 1 for a block of equal steps)."""
+    STAGE_SECONDS.labels(stage=stage, rows=size_bucket(rows)).observe(seconds, count)
+
+
+def stage_timer(stage: str, rows: Optional[int] = None) -> _HistogramChild:
+    """Histogram series of a stage, bound once for use in a hot loop."""
+    return STAGE_SECONDS.labels(stage=stage, rows=size_bucket(rows))
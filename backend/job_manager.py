@@ -0,0 +1,150 @@
+"""
+Training Job Manager.
+Tracks training jobs by ID with event-driven pause/resume/stop control.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+class TrainingJob:
+    """
+    A single training run.
+
+    Control is backed by asyncio Events, so a paused stream wakes up the moment
+    it is resumed or stopped instead of polling.
+    """
+
+    ACTIVE_STATUSES = ("running", "paused", "stopping")
+
+    def __init__(self, job_id: str, session_id: str, params: Dict[str, Any]):
+        self.job_id = job_id
+        self.session_id = session_id
+        self.params = params
+        self.status = "running"
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.epoch = 0
+        self.max_epochs = params.get('epochs')
+        self.error: Optional[str] = None
+
+        self._resume_event = asyncio.Event()
+        self._resume_event.set()
+        self._stop_event = asyncio.Event()
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in self.ACTIVE_STATUSES
+
+    @property
+    def is_paused(self) -> bool:
+        return not self._resume_event.is_set()
+
+    @property
+    def stop_requested(self) -> bool:
+        return self._stop_event.is_set()
+
+    def _set_status(self, status: str):
+        self.status = status
+        self.updated_at = time.time()
+
+    def pause(self) -> bool:
+        """Pause the job. Returns False if it is not running."""
+        if self.status != "running":
+            return False
+        self._resume_event.clear()
+        self._set_status("paused")
+        return True
+
+    def resume(self) -> bool:
+        """Resume the job. Returns False if it is not paused."""
+        if self.status != "paused":
+            return False
+        self._resume_event.set()
+        self._set_status("running")
+        return True
+
+    def stop(self) -> bool:
+        """Request the job to stop. Returns False if it is not active."""
+        if not self.is_active:
+            return False
+        self._stop_event.set()
+        # Wake a paused stream so it can observe the stop
+        self._resume_event.set()
+        self._set_status("stopping")
+        return True
+
+    async def wait_if_paused(self):
+        """Return immediately when running, or as soon as the job is resumed or stopped."""
+        await self._resume_event.wait()
+
+    async def sleep(self, delay: float):
+        """Sleep between epochs, waking early if the job is stopped."""
+        if delay <= 0:
+            return
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+    def record_epoch(self, epoch: int):
+        self.epoch = epoch
+        self.updated_at = time.time()
+
+    def finish(self, error: Optional[str] = None):
+        """Mark the job as finished (completed, stopped or failed)."""
+        if error is not None:
+            self.error = error
+            self._set_status("failed")
+        elif self.stop_requested:
+            self._set_status("stopped")
+        else:
+            self._set_status("completed")
+        self._resume_event.set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "epoch": self.epoch,
+            "max_epochs": self.max_epochs,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "params": self.params,
+            "error": self.error
+        }
+
+
+class JobManager:
+    """Registry of training jobs; finished jobs are kept up to a retention limit."""
+
+    def __init__(self, max_finished_jobs: int = 100):
+        self.max_finished_jobs = max_finished_jobs
+        self._jobs: "OrderedDict[str, TrainingJob]" = OrderedDict()
+
+    def create(self, session_id: str, params: Dict[str, Any]) -> TrainingJob:
+        """Create and register a new running job."""
+        self._prune()
+        job = TrainingJob(uuid.uuid4().hex, session_id, params)
+        self._jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        return self._jobs.get(job_id)
+
+    def list(self, session_id: Optional[str] = None) -> List[TrainingJob]:
+        """List jobs, optionally only those of one session."""
+        return [job for job in self._jobs.values()
+                if session_id is None or job.session_id == session_id]
+
+    @property
+    def active_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.is_active)
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.is_active]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
@@ -4,20 +4,38 @@ Handles gradient descent with real-time updates.
 """
 
 import numpy as np
-import pandas as pd
-from typing import Dict, Any, Tuple, Generator
+from typing import Dict, Any, List, Tuple, Generator
 import time
 from .metrics_calculator import MetricsCalculator
+from . import gd_kernels
+from .instrumentation import EPOCHS_TOTAL, stage_timer, timed
 
 
 class LinearRegressionModel:
     """Linear Regression model with gradient descent training."""
     
-    def __init__(self, x_data: np.ndarray, y_data: np.ndarray):
+    # Size of the sample used to estimate MAE in "fast" metrics mode
+    DEFAULT_METRICS_SAMPLE_SIZE = 10000
+    
+    # train_decimated: block time budget in every-Nth-epoch mode (bounds pause/stop latency)
+    DECIMATED_BLOCK_SECONDS = 0.05
+    
+    # train_decimated: upper bound on snapshot rows per run in event-rate mode
+    DECIMATED_MAX_SNAPSHOTS = 1000
+    
+    # train_epoch_by_epoch: flush buffered epoch times to the metrics after this
+    # many epochs or seconds, whichever comes first
+    EPOCH_METRICS_FLUSH_EPOCHS = 100
+    EPOCH_METRICS_FLUSH_SECONDS = 1.0
+    
+    def __init__(self, x_data: np.ndarray, y_data: np.ndarray,
+                 metrics_sample_size: int = DEFAULT_METRICS_SAMPLE_SIZE):
         """Initialize the linear regression model with normalized data for training."""
-        # Store original data
-        self.x_original = x_data.flatten()
-        self.y_original = y_data.flatten()
+        self.metrics_sample_size = metrics_sample_size
+        
+        # Store original data (ravel avoids copying contiguous or memory-mapped input)
+        self.x_original = np.ravel(x_data)
+        self.y_original = np.ravel(y_data)
         
         # Compute normalization parameters
         self.x_mean = np.mean(self.x_original)
@@ -40,10 +58,15 @@ class LinearRegressionModel:
         # Initialize parameters
         self.theta0 = 0.0  # intercept
         self.theta1 = 0.0  # slope
+        self.compiled_status = gd_kernels.STATUS_RUNNING  # final kernel status of train_compiled
         self.m = len(self.x_data)  # number of training examples
         
-        # Create design matrix with bias term
-        self.X = np.column_stack([np.ones(self.m), self.x_data])
+        # Work buffer for the fused cost/gradient kernel (no design matrix needed)
+        self._residual_buffer = np.empty(self.m, dtype=np.float64)
+        
+        # Cache sufficient statistics so each epoch is O(1)
+        self._compute_moments()
+        self._build_metrics_sample()
         
         # Initialize metrics calculator
         self.metrics_calculator = MetricsCalculator()
@@ -96,9 +119,9 @@ class LinearRegressionModel:
             x_train: Training feature values (original scale)
             y_train: Training target values (original scale)
         """
-        # Store original training data
-        self.x_original = x_train.flatten()
-        self.y_original = y_train.flatten()
+        # Store original training data (ravel avoids copying contiguous input)
+        self.x_original = np.ravel(np.asarray(x_train, dtype=np.float64))
+        self.y_original = np.ravel(np.asarray(y_train, dtype=np.float64))
         
         # Update normalization parameters based on training data only
         self.x_mean = np.mean(self.x_original)
@@ -118,40 +141,164 @@ class LinearRegressionModel:
         
         self.m = len(self.x_data)
         
-        # Recreate design matrix with normalized data
-        self.X = np.column_stack([np.ones(self.m), self.x_data])
+        # Reallocate the work buffer for the new training size
+        self._residual_buffer = np.empty(self.m, dtype=np.float64)
+        
+        # Refresh sufficient statistics for the new training data
+        self._compute_moments()
+        self._build_metrics_sample()
         
         print(f"✅ Training data set: {self.m} examples (normalized for training)")
     
-    def hypothesis(self, X: np.ndarray, theta: np.ndarray) -> np.ndarray:
+    def _compute_moments(self):
+        """
+        Compute the sufficient statistics of the normalized training data.
+        
+        For a univariate model the cost and both gradients depend on the data
+        only through n, Σx, Σy, Σx², Σxy and Σy², so these are computed once
+        here and every epoch afterwards is constant-time arithmetic.
+        """
+        self.moments = {
+            'n': float(self.m),
+            'sum_x': float(np.sum(self.x_data)),
+            'sum_y': float(np.sum(self.y_data)),
+            'sum_xx': float(np.dot(self.x_data, self.x_data)),
+            'sum_xy': float(np.dot(self.x_data, self.y_data)),
+            'sum_yy': float(np.dot(self.y_data, self.y_data))
+        }
+    
+    def _build_metrics_sample(self, seed: int = 42):
+        """
+        Draw a fixed-size uniform sample of the training data.
+        
+        The rows are chosen once, without replacement and with a fixed seed (a
+        plain rng.choice over the stored data, not a streaming reservoir). The
+        sample is used to estimate MAE during training in "fast" metrics mode,
+        where a full prediction pass every epoch would dominate the cost.
+        """
+        if self.m <= self.metrics_sample_size:
+            indices = np.arange(self.m)
+        else:
+            rng = np.random.default_rng(seed)
+            indices = np.sort(rng.choice(self.m, size=self.metrics_sample_size, replace=False))
+        
+        self._sample_x = self.x_original[indices]
+        self._sample_y = self.y_original[indices]
+    
+    def compute_cost_from_moments(self, theta: np.ndarray) -> float:
+        """Compute J(θ) = (1/2m) * Σ(θ₀ + θ₁x - y)² from the cached moments."""
+        t0, t1 = float(theta[0]), float(theta[1])
+        mo = self.moments
+        sse = (
+            mo['n'] * t0 * t0
+            + t1 * t1 * mo['sum_xx']
+            + mo['sum_yy']
+            + 2 * t0 * t1 * mo['sum_x']
+            - 2 * t0 * mo['sum_y']
+            - 2 * t1 * mo['sum_xy']
+        )
+        # Guard against tiny negative values from floating-point cancellation
+        return max(sse, 0.0) / (2 * mo['n'])
+    
+    def compute_gradients_from_moments(self, theta: np.ndarray) -> Tuple[float, float]:
+        """Compute gradients for θ₀ and θ₁ from the cached moments."""
+        t0, t1 = float(theta[0]), float(theta[1])
+        mo = self.moments
+        grad_theta0 = (mo['n'] * t0 + t1 * mo['sum_x'] - mo['sum_y']) / mo['n']
+        grad_theta1 = (t0 * mo['sum_x'] + t1 * mo['sum_xx'] - mo['sum_xy']) / mo['n']
+        return grad_theta0, grad_theta1
+    
+    def compute_original_scale_mse(self, theta0: float | None = None,
+                                   theta1: float | None = None) -> float:
+        """Mean squared error in the original scale, from the cached moments (default: current parameters)."""
+        theta0 = self.theta0 if theta0 is None else theta0
+        theta1 = self.theta1 if theta1 is None else theta1
+        cost = self.compute_cost_from_moments(np.array([theta0, theta1]))
+        return 2 * cost * self.y_std ** 2
+    
+    def _calculate_epoch_metrics(self, epoch: int, exact: bool, store: bool = True,
+                                 theta0: float | None = None, theta1: float | None = None) -> Dict[str, float]:
+        """
+        Calculate performance metrics for the current (or the given normalized) parameters.
+        
+        Exact metrics run a full prediction pass over the training data. Otherwise
+        RMSE and R² still come exactly from the cached moments and MAE is estimated
+        from the metrics sample.
+        """
+        if theta0 is None and theta1 is None:
+            predict = self.predict_original_scale
+        else:
+            params = self.get_original_scale_parameters(theta0, theta1)
+            predict = lambda x: params['theta0'] + params['theta1'] * np.asarray(x)
+        
+        with timed("metrics" if exact else "metrics_fast", self.m):
+            if exact:
+                predictions = predict(self.x_original)
+                return self.metrics_calculator.calculate_metrics(
+                    y_true=self.y_original,
+                    y_pred=predictions,
+                    epoch=epoch,
+                    store=store
+                )
+            
+            # Residuals in original scale are the normalized residuals times y_std
+            mo = self.moments
+            sse = self.compute_original_scale_mse(theta0, theta1) * mo['n']
+            ss_tot = (mo['sum_yy'] - mo['sum_y'] ** 2 / mo['n']) * self.y_std ** 2
+            return self.metrics_calculator.calculate_metrics_from_moments(
+                sse=sse,
+                ss_tot=ss_tot,
+                n=mo['n'],
+                y_sample=self._sample_y,
+                y_pred_sample=predict(self._sample_x),
+                epoch=epoch
+            )
+    
+    def hypothesis(self, x: np.ndarray, theta: np.ndarray) -> np.ndarray:
         """Compute hypothesis: h(x) = θ₀ + θ₁x"""
-        return X @ theta
+        return theta[0] + theta[1] * x
+    
+    def compute_cost_and_gradients(self, theta: np.ndarray) -> Tuple[float, float, float]:
+        """
+        Compute cost and gradients for θ₀ and θ₁ from a single prediction pass.
+        
+        The residuals are written into a work buffer allocated once per model using
+        in-place ufuncs, so a full pass allocates no n-sized temporaries.
+        """
+        residual = self._residual_buffer
+        np.multiply(self.x_data, theta[1], out=residual)
+        np.add(residual, theta[0], out=residual)
+        np.subtract(residual, self.y_data, out=residual)  # h(x) - y
+        
+        cost = np.dot(residual, residual) / (2 * self.m)
+        grad_theta0 = np.sum(residual) / self.m
+        grad_theta1 = np.dot(residual, self.x_data) / self.m
+        
+        return float(cost), float(grad_theta0), float(grad_theta1)
+    
+    def compute_cost_and_gradients_from_moments(self, theta: np.ndarray) -> Tuple[float, float, float]:
+        """Compute cost and gradients for θ₀ and θ₁ from the cached moments."""
+        grad_theta0, grad_theta1 = self.compute_gradients_from_moments(theta)
+        return self.compute_cost_from_moments(theta), grad_theta0, grad_theta1
     
     def compute_cost(self, theta: np.ndarray) -> float:
         """Compute cost function: J(θ) = (1/2m) * Σ(h(x) - y)²"""
-        predictions = self.hypothesis(self.X, theta)
-        cost = (1 / (2 * self.m)) * np.sum((predictions - self.y_data) ** 2)
-        return float(cost)
+        return self.compute_cost_and_gradients(theta)[0]
     
     def compute_gradients(self, theta: np.ndarray) -> Tuple[float, float]:
         """Compute gradients for θ₀ and θ₁"""
-        predictions = self.hypothesis(self.X, theta)
-        error = predictions - self.y_data  # Keep as 1D array
-        
-        # Gradient for θ₀ (intercept)
-        grad_theta0 = (1 / self.m) * np.sum(error)
-        
-        # Gradient for θ₁ (slope)
-        grad_theta1 = (1 / self.m) * np.sum(error * self.x_data)
-        
-        return float(grad_theta0), float(grad_theta1)
+        _, grad_theta0, grad_theta1 = self.compute_cost_and_gradients(theta)
+        return grad_theta0, grad_theta1
     
     def train_epoch_by_epoch(
         self, 
         learning_rate: float, 
         max_epochs: int, 
         tolerance: float = 1e-6,
-        early_stopping: bool = True
+        early_stopping: bool = True,
+        engine: str = "moments",
+        metrics_mode: str = "exact",
+        metrics_checkpoint_every: int = 0
     ) -> Generator[Dict[str, Any], None, None]:
         """
         Train the model epoch by epoch with real-time updates.
@@ -161,87 +308,137 @@ class LinearRegressionModel:
             max_epochs: Maximum number of training epochs
             tolerance: Convergence tolerance
             early_stopping: Whether to stop early if cost doesn't improve
+            engine: "moments" for O(1) epochs from cached sufficient statistics,
+                "full" for a pass over every training row each epoch
+            metrics_mode: "exact" to compute metrics on the full data every epoch,
+                "fast" to derive RMSE/R² from the moments and sample MAE
+            metrics_checkpoint_every: In "fast" mode, compute exact metrics every
+                N epochs (0 disables checkpoints; the final epoch is always exact)
         
         Yields:
             Dictionary with epoch info, theta values, and cost
         """
-        print(f"🚀 Starting training: α={learning_rate}, epochs={max_epochs}, tolerance={tolerance}")
+        if engine == "moments":
+            step_fn = self.compute_cost_and_gradients_from_moments
+        elif engine == "full":
+            step_fn = self.compute_cost_and_gradients
+        else:
+            raise ValueError(f"Unknown training engine: {engine}")
+        
+        if metrics_mode not in ("exact", "fast"):
+            raise ValueError(f"Unknown metrics mode: {metrics_mode}")
+        
+        print(f"🚀 Starting training: α={learning_rate}, epochs={max_epochs}, tolerance={tolerance}, engine={engine}")
         
         theta = np.array([self.theta0, self.theta1])
         prev_cost = float('inf')
         no_improvement_count = 0
         
-        for epoch in range(1, max_epochs + 1):
-            # Compute current cost
-            current_cost = self.compute_cost(theta)
+        # Step times are buffered locally and flushed in batches (and once more when
+        # the run ends, also early), so metric locks stay out of the loop while
+        # /api/metrics still follows long or paced runs
+        epoch_timer = stage_timer("epoch_compute", self.m)
+        epoch_counter = EPOCHS_TOTAL.labels(engine=engine)
+        step_seconds: List[float] = []
+        last_flush = time.perf_counter()
+        
+        def flush_epoch_metrics():
+            nonlocal last_flush
+            if step_seconds:
+                epoch_timer.observe_many(step_seconds)
+                epoch_counter.inc(len(step_seconds))
+                step_seconds.clear()
+            last_flush = time.perf_counter()
+        
+        def timed_step(theta: np.ndarray) -> Tuple[float, float, float]:
+            step_start = time.perf_counter()
+            step = step_fn(theta)
+            step_end = time.perf_counter()
+            step_seconds.append(step_end - step_start)
+            if (len(step_seconds) >= self.EPOCH_METRICS_FLUSH_EPOCHS
+                    or step_end - last_flush >= self.EPOCH_METRICS_FLUSH_SECONDS):
+                flush_epoch_metrics()
+            return step
+        
+        # Cost and gradients at theta, computed one epoch ahead (see below)
+        next_step = None
+        try:
+            for epoch in range(1, max_epochs + 1):
+                # Compute current cost and gradients
+                current_cost, grad_theta0, grad_theta1 = next_step or timed_step(theta)
             
-            # Compute gradients
-            grad_theta0, grad_theta1 = self.compute_gradients(theta)
+                # Debug first few epochs
+                if epoch <= 5:
+                    print(f"🔍 Epoch {epoch}: θ₀={theta[0]:.6f}, θ₁={theta[1]:.6f}, Cost={current_cost:.6f}")
+                    print(f"🔍 Gradients: grad_θ₀={grad_theta0:.6f}, grad_θ₁={grad_theta1:.6f}")
+        
+                # Update parameters
+                theta[0] -= learning_rate * grad_theta0  # θ₀
+                theta[1] -= learning_rate * grad_theta1  # θ₁
             
-            # Debug first few epochs
-            if epoch <= 5:
-                print(f"🔍 Epoch {epoch}: θ₀={theta[0]:.6f}, θ₁={theta[1]:.6f}, Cost={current_cost:.6f}")
-                print(f"🔍 Gradients: grad_θ₀={grad_theta0:.6f}, grad_θ₁={grad_theta1:.6f}")
-        
-            # Update parameters
-            theta[0] -= learning_rate * grad_theta0  # θ₀
-            theta[1] -= learning_rate * grad_theta1  # θ₁
+                # Check for numerical explosion (the cost can overflow before theta does)
+                if not (np.isfinite(current_cost) and np.isfinite(theta).all()):
+                    print(f"❌ Numerical explosion detected at epoch {epoch}")
+                    print(f"❌ Try reducing learning rate (current: {learning_rate})")
+                    break
             
-            # Check for numerical explosion
-            if np.isnan(theta).any() or np.isinf(theta).any():
-                print(f"❌ Numerical explosion detected at epoch {epoch}")
-                print(f"❌ Try reducing learning rate (current: {learning_rate})")
-                break
+                # Update instance variables
+                self.theta0 = theta[0]
+                self.theta1 = theta[1]
             
-            # Update instance variables
-            self.theta0 = theta[0]
-            self.theta1 = theta[1]
+                # Check for convergence
+                cost_change = abs(prev_cost - current_cost)  # abs() handles both +ve and -ve changes
+                converged = cost_change < tolerance
             
-            # Check for convergence
-            cost_change = abs(prev_cost - current_cost)  # abs() handles both +ve and -ve changes
-            converged = cost_change < tolerance
+                # Simple early stopping: if cost doesn't change much for 15 epochs, stop
+                if early_stopping and cost_change < tolerance:
+                    no_improvement_count += 1
+                    if no_improvement_count >= 15:  # Wait 15 epochs before stopping
+                        print(f"🛑 Early stopping at epoch {epoch} (cost stable for {no_improvement_count} epochs)")
+                        break
+                else:
+                    no_improvement_count = 0  # Reset counter if we see improvement
             
-            # Simple early stopping: if cost doesn't change much for 15 epochs, stop
-            if early_stopping and cost_change < tolerance:
-                no_improvement_count += 1
-                if no_improvement_count >= 15:  # Wait 15 epochs before stopping
-                    print(f"🛑 Early stopping at epoch {epoch} (cost stable for {no_improvement_count} epochs)")
-                    break
-            else:
-                no_improvement_count = 0  # Reset counter if we see improvement
+                # Look one epoch ahead: if the next update explodes, training ends at
+                # this epoch, so its event is the final one (with exact metrics)
+                explodes_next = False
+                if epoch < max_epochs:
+                    next_step = timed_step(theta)
+                    next_theta = theta - learning_rate * np.array(next_step[1:])
+                    explodes_next = not (np.isfinite(next_step[0]) and np.isfinite(next_theta).all())
+                
+                # Calculate performance metrics for current epoch
+                is_complete = epoch >= max_epochs or converged or explodes_next
+                metrics_exact = (
+                    metrics_mode == "exact"
+                    or is_complete
+                    or (metrics_checkpoint_every > 0 and epoch % metrics_checkpoint_every == 0)
+                )
+                metrics = self._calculate_epoch_metrics(epoch, exact=metrics_exact)
             
-            # Calculate performance metrics for current epoch
-            # Get predictions in original scale for metrics calculation
-            orig_params = self.get_original_scale_parameters()
-            predictions = self.predict_original_scale(self.x_original)
+                # Yield current state with metrics
+                epoch_data = {
+                    "epoch": epoch,
+                    "max_epochs": max_epochs,
+                    "theta0": self.theta0,
+                    "theta1": self.theta1,
+                    "cost": current_cost,
+                    "cost_change": cost_change,
+                    "converged": converged,
+                    "is_complete": is_complete,
+                    # Add performance metrics
+                    "rmse": metrics['rmse'],
+                    "mae": metrics['mae'],
+                    "r2": metrics['r2'],
+                    "metrics_exact": metrics_exact
+                }
             
-            # Calculate metrics using the metrics calculator
-            metrics = self.metrics_calculator.calculate_metrics(
-                y_true=self.y_original,
-                y_pred=predictions,
-                epoch=epoch
-            )
-            
-            # Yield current state with metrics
-            epoch_data = {
-                "epoch": epoch,
-                "max_epochs": max_epochs,
-                "theta0": self.theta0,
-                "theta1": self.theta1,
-                "cost": current_cost,
-                "cost_change": cost_change,
-                "converged": converged,
-                "is_complete": epoch >= max_epochs or converged,
-                # Add performance metrics
-                "rmse": metrics['rmse'],
-                "mae": metrics['mae'],
-                "r2": metrics['r2']
-            }
+                yield epoch_data
             
-            yield epoch_data
-            
-            # Update previous cost
-            prev_cost = current_cost
+                # Update previous cost
+                prev_cost = current_cost
+        finally:
+            flush_epoch_metrics()
         
         print(f"✅ Training completed: Final cost = {current_cost:.6f}")
         print(f"📊 Final parameters (normalized): θ₀ = {self.theta0:.4f}, θ₁ = {self.theta1:.4f}")
@@ -250,6 +447,310 @@ class LinearRegressionModel:
         orig_params = self.get_original_scale_parameters()
         print(f"📊 Final parameters (original): θ₀ = {orig_params['theta0']:.4f}, θ₁ = {orig_params['theta1']:.4f}")
     
+    # Solvers accepted by fit_closed_form
+    CLOSED_FORM_SOLVERS = ("normal_equation", "qr", "lstsq")
+    
+    def fit_closed_form(self, solver: str = "normal_equation") -> Dict[str, Any]:
+        """
+        Fit the model exactly in a single pass instead of running gradient descent.
+        
+        Args:
+            solver: "normal_equation" (from the cached moments), "qr" or "lstsq"
+        
+        Returns:
+            Dictionary with the fitted (normalized) parameters, cost and metrics
+        """
+        if solver == "normal_equation":
+            mo = self.moments
+            denominator = mo['n'] * mo['sum_xx'] - mo['sum_x'] ** 2
+            if denominator == 0:
+                theta1 = 0.0
+            else:
+                theta1 = (mo['n'] * mo['sum_xy'] - mo['sum_x'] * mo['sum_y']) / denominator
+            theta0 = (mo['sum_y'] - theta1 * mo['sum_x']) / mo['n']
+        elif solver in ("qr", "lstsq"):
+            X = np.empty((self.m, 2))
+            X[:, 0] = 1.0
+            X[:, 1] = self.x_data
+            if solver == "qr":
+                Q, R = np.linalg.qr(X)
+                theta0, theta1 = np.linalg.solve(R, Q.T @ self.y_data)
+            else:
+                (theta0, theta1), *_ = np.linalg.lstsq(X, self.y_data, rcond=None)
+        else:
+            raise ValueError(f"Unknown solver: {solver}")
+        
+        self.theta0 = float(theta0)
+        self.theta1 = float(theta1)
+        
+        cost = self.compute_cost_from_moments(np.array([self.theta0, self.theta1]))
+        metrics = self._calculate_epoch_metrics(1, exact=True)
+        
+        print(f"✅ Closed-form fit ({solver}): cost = {cost:.6f}")
+        print(f"📊 Final parameters (normalized): θ₀ = {self.theta0:.4f}, θ₁ = {self.theta1:.4f}")
+        
+        return {
+            "solver": solver,
+            "theta0": self.theta0,
+            "theta1": self.theta1,
+            "cost": cost,
+            "rmse": metrics['rmse'],
+            "mae": metrics['mae'],
+            "r2": metrics['r2']
+        }
+    
+    def train_compiled(
+        self,
+        learning_rate: float,
+        max_epochs: int,
+        tolerance: float = 1e-6,
+        early_stopping: bool = True,
+        snapshot_every: int = 1,
+        block_epochs: int = 100000,
+        block_seconds: float | None = None,
+        record_final_metrics: bool = True
+    ) -> Generator[np.ndarray, None, None]:
+        """
+        Train the model with the whole gradient-descent loop in compiled code.
+        
+        The loop runs from the cached moments in native code (Numba when it is
+        installed, a scalar Python loop otherwise) and only returns to Python every
+        block of epochs instead of building a dict per epoch.
+        
+        Args:
+            learning_rate: Learning rate (α)
+            max_epochs: Maximum number of training epochs
+            tolerance: Convergence tolerance
+            early_stopping: Whether to stop early if cost doesn't improve
+            snapshot_every: Keep one snapshot row every N epochs
+            block_epochs: Maximum number of epochs per return to Python
+            block_seconds: Optional time budget per block; the block length is
+                adapted so each call into the kernel takes roughly this long
+            record_final_metrics: Record exact metrics for the final parameters
+        
+        Yields:
+            Arrays of snapshot rows (epoch, theta0, theta1, cost), one per block.
+            The final epoch is always included in the last block.
+        """
+        if snapshot_every < 1 or block_epochs < 1:
+            raise ValueError("snapshot_every and block_epochs must be positive")
+        
+        engine = "numba" if gd_kernels.NUMBA_AVAILABLE else "python"
+        print(f"🚀 Starting compiled training: α={learning_rate}, epochs={max_epochs}, tolerance={tolerance}, kernel={engine}")
+        
+        mo = self.moments
+        moments = np.array([mo['n'], mo['sum_x'], mo['sum_y'],
+                            mo['sum_xx'], mo['sum_xy'], mo['sum_yy']])
+        state = gd_kernels.new_state(self.theta0, self.theta1)
+        status = gd_kernels.STATUS_RUNNING
+        block_size = block_epochs if block_seconds is None else min(block_epochs, 1000)
+        last_epoch = 0
+        next_epoch = int(state[gd_kernels.STATE_EPOCH])
+        epoch_timer = stage_timer("epoch_compute", self.m)
+        epoch_counter = EPOCHS_TOTAL.labels(engine="compiled")
+        
+        while status == gd_kernels.STATUS_RUNNING:
+            snapshots = np.empty((block_size // snapshot_every + 2, len(gd_kernels.SNAPSHOT_COLUMNS)))
+            
+            block_start = time.perf_counter()
+            status, rows = gd_kernels.run_moments_gd_block(
+                moments, state, learning_rate, tolerance, early_stopping,
+                max_epochs, block_size, snapshot_every, snapshots
+            )
+            block_elapsed = time.perf_counter() - block_start
+            
+            # One observation per epoch of the block, each at the block's average epoch time
+            block_epochs_run = int(state[gd_kernels.STATE_EPOCH]) - next_epoch
+            next_epoch += block_epochs_run
+            if block_epochs_run > 0:
+                epoch_timer.observe(block_elapsed / block_epochs_run, block_epochs_run)
+                epoch_counter.inc(block_epochs_run)
+            
+            self.theta0 = float(state[gd_kernels.STATE_THETA0])
+            self.theta1 = float(state[gd_kernels.STATE_THETA1])
+            
+            if rows:
+                last_epoch = int(snapshots[rows - 1, 0])
+                yield snapshots[:rows]
+            
+            # Resize the next block to fit the time budget
+            if block_seconds is not None and block_elapsed > 0:
+                scale = block_seconds / block_elapsed
+                block_size = int(min(block_epochs, max(1, block_size * min(scale, 10.0))))
+        
+        self.compiled_status = int(status)
+        if status == gd_kernels.STATUS_EARLY_STOPPED:
+            print(f"🛑 Early stopping at epoch {int(state[gd_kernels.STATE_EPOCH])} (cost stable for {gd_kernels.EARLY_STOPPING_PATIENCE} epochs)")
+        elif status == gd_kernels.STATUS_EXPLODED:
+            print(f"❌ Numerical explosion detected at epoch {int(state[gd_kernels.STATE_EPOCH])}")
+            print(f"❌ Try reducing learning rate (current: {learning_rate})")
+        
+        # Record exact metrics for the final parameters
+        if last_epoch and record_final_metrics:
+            self._calculate_epoch_metrics(last_epoch, exact=True)
+        
+        print(f"✅ Compiled training completed: Final cost = {self.compute_cost_from_moments(np.array([self.theta0, self.theta1])):.6f}")
+        print(f"📊 Final parameters (normalized): θ₀ = {self.theta0:.4f}, θ₁ = {self.theta1:.4f}")
+    
+    def train_decimated(
+        self,
+        learning_rate: float,
+        max_epochs: int,
+        tolerance: float = 1e-6,
+        early_stopping: bool = True,
+        every_n_epochs: int = 0,
+        max_events_per_second: float = 20.0
+    ) -> Generator[Dict[str, Any], None, None]:
+        """
+        Train at full speed and yield a decimated trajectory of epoch updates.
+        
+        Uses the compiled loop and yields dicts shaped like train_epoch_by_epoch,
+        but only for every Nth epoch or, when every_n_epochs is 0, for at most
+        max_events_per_second epochs per second. The final epoch is always
+        yielded, with exact metrics; the others carry fast metrics.
+        
+        Args:
+            learning_rate: Learning rate (α)
+            max_epochs: Maximum number of training epochs
+            tolerance: Convergence tolerance
+            early_stopping: Whether to stop early if cost doesn't improve
+            every_n_epochs: Yield every Nth epoch (0 = limit by event rate instead)
+            max_events_per_second: Event rate limit when every_n_epochs is 0
+        
+        Yields:
+            Dictionary containing the decimated epoch's parameters, cost and metrics
+        """
+        if every_n_epochs > 0:
+            snapshot_every, block_seconds = every_n_epochs, self.DECIMATED_BLOCK_SECONDS
+        else:
+            if max_events_per_second <= 0:
+                raise ValueError("max_events_per_second must be positive")
+            # One event per block, with blocks sized to the event interval
+            snapshot_every = max(1, max_epochs // self.DECIMATED_MAX_SNAPSHOTS)
+            block_seconds = 1.0 / max_events_per_second
+        
+        # Events are held back one block so the last one can be marked complete
+        pending = []
+        for rows in self.train_compiled(learning_rate, max_epochs, tolerance, early_stopping,
+                                        snapshot_every=snapshot_every, block_seconds=block_seconds,
+                                        record_final_metrics=False):
+            yield from pending
+            if every_n_epochs <= 0:
+                rows = rows[-1:]
+            pending = []
+            for epoch, theta0, theta1, cost in rows:
+                metrics = self._calculate_epoch_metrics(int(epoch), exact=False, theta0=theta0, theta1=theta1)
+                pending.append({
+                    "epoch": int(epoch),
+                    "max_epochs": max_epochs,
+                    "theta0": float(theta0),
+                    "theta1": float(theta1),
+                    "cost": float(cost),
+                    "converged": False,
+                    "is_complete": False,
+                    "rmse": metrics['rmse'],
+                    "mae": metrics['mae'],
+                    "r2": metrics['r2'],
+                    "metrics_exact": False
+                })
+        
+        if pending:
+            # Final epoch: replace the fast metrics with exact full-data values
+            final = pending[-1]
+            metrics = self._calculate_epoch_metrics(final['epoch'], exact=True, store=False,
+                                                    theta0=final['theta0'], theta1=final['theta1'])
+            self.metrics_calculator.update_latest_metrics(metrics)
+            final.update(metrics)
+            # Only a run the kernel stopped for a stable cost has converged (not one that exploded)
+            final.update(metrics_exact=True, is_complete=True,
+                         converged=self.compiled_status == gd_kernels.STATUS_EARLY_STOPPED)
+            yield from pending
+    
+    def sweep(
+        self,
+        learning_rates,
+        tolerances=1e-6,
+        max_epochs=1000,
+        early_stopping: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Train K gradient-descent configurations at once from the cached moments.
+        
+        All K parameter vectors live in one K×2 theta matrix that is updated with a
+        single batched matrix product per epoch. Configurations that converge,
+        explode or hit their epoch cap drop out of the active set, so the cost per
+        epoch shrinks as the sweep progresses. The model's own parameters are not
+        changed.
+        
+        Args:
+            learning_rates: Learning rate of each configuration (length K)
+            tolerances: Convergence tolerance, scalar or one per configuration
+            max_epochs: Epoch cap, scalar or one per configuration
+            early_stopping: Whether configurations stop once their cost is stable
+        
+        Returns:
+            One dictionary per configuration, ranked by final cost (exploded last)
+        """
+        lrs, tols, caps = np.broadcast_arrays(
+            np.asarray(learning_rates, dtype=np.float64),
+            np.asarray(tolerances, dtype=np.float64),
+            np.asarray(max_epochs, dtype=np.int64)
+        )
+        lrs, tols, caps = np.atleast_1d(lrs), np.atleast_1d(tols), np.atleast_1d(caps)
+        k = len(lrs)
+        
+        mo = self.moments
+        moments = np.tile([mo['n'], mo['sum_x'], mo['sum_y'],
+                           mo['sum_xx'], mo['sum_xy'], mo['sum_yy']], (k, 1))
+        theta = np.tile([self.theta0, self.theta1], (k, 1)).astype(np.float64)
+        
+        print(f"🧪 Starting sweep: {k} configurations, up to {int(caps.max()) if k else 0} epochs")
+        status, epochs_run, converged_epoch = gd_kernels.run_batched_moments_gd(
+            moments, theta, lrs, tols, caps, early_stopping
+        )
+        with np.errstate(over='ignore', invalid='ignore'):
+            final_cost = gd_kernels.moments_cost(moments, theta)
+        # The last update can still overflow the cost of a diverging configuration
+        status[~np.isfinite(final_cost)] = gd_kernels.STATUS_EXPLODED
+        params = self.get_original_scale_parameters(theta[:, 0], theta[:, 1])
+        
+        # Rank by final cost; exploded configurations go last
+        exploded = status == gd_kernels.STATUS_EXPLODED
+        order = np.lexsort((final_cost, exploded))
+        
+        results = []
+        for rank, i in enumerate(order, start=1):
+            results.append({
+                "rank": rank,
+                "learning_rate": float(lrs[i]),
+                "tolerance": float(tols[i]),
+                "max_epochs": int(caps[i]),
+                "status": gd_kernels.STATUS_NAMES[int(status[i])],
+                "epochs_run": int(epochs_run[i]),
+                "converged_epoch": int(converged_epoch[i]) if converged_epoch[i] else None,
+                "final_cost": None if exploded[i] else float(final_cost[i]),
+                "final_mse": None if exploded[i] else float(2 * final_cost[i] * self.y_std ** 2),
+                "theta0": None if exploded[i] else float(params['theta0'][i]),
+                "theta1": None if exploded[i] else float(params['theta1'][i])
+            })
+        
+        print(f"✅ Sweep completed in {int(epochs_run.max()) if k else 0} batched epochs")
+        return results
+    
+    def get_training_state(self) -> Dict[str, Any]:
+        """Get the state produced by training (parameters and metrics history)."""
+        return {
+            'theta0': self.theta0,
+            'theta1': self.theta1,
+            'metrics_history': self.metrics_calculator.get_metrics_history()
+        }
+    
+    def set_training_state(self, state: Dict[str, Any]):
+        """Apply state produced by training on another copy of this model (e.g. in a worker process)."""
+        self.theta0 = state['theta0']
+        self.theta1 = state['theta1']
+        self.metrics_calculator.metrics_history = state['metrics_history']
+    
     def get_model_summary(self) -> Dict[str, Any]:
         """Get summary of the trained model."""
         orig_params = self.get_original_scale_parameters()
@@ -286,18 +787,27 @@ class LinearRegressionModel:
         """Get the most recent metrics from training."""
         return self.metrics_calculator.get_latest_metrics()
 
-    def get_original_scale_parameters(self) -> Dict[str, float]:
-        """Get the parameters in the original data scale."""
+    def get_original_scale_parameters(self, theta0: float | None = None,
+                                      theta1: float | None = None) -> Dict[str, float]:
+        """
+        Get the parameters in the original data scale.
+        
+        Args:
+            theta0, theta1: Normalized parameters to convert (default: the model's current ones)
+        """
+        theta0 = self.theta0 if theta0 is None else theta0
+        theta1 = self.theta1 if theta1 is None else theta1
+        
         # Convert normalized parameters back to original scale
         # For normalized data: y_norm = θ₀_norm + θ₁_norm * x_norm
         # For original data: y = θ₀ + θ₁ * x
         # Where: x_norm = (x - x_mean) / x_std, y_norm = (y - y_mean) / y_std
         
         # θ₁ in original scale
-        original_theta1 = self.theta1 * (self.y_std / self.x_std)
+        original_theta1 = theta1 * (self.y_std / self.x_std)
         
         # θ₀ in original scale
-        original_theta0 = self.theta0 * self.y_std + self.y_mean - original_theta1 * self.x_mean
+        original_theta0 = theta0 * self.y_std + self.y_mean - original_theta1 * self.x_mean
         
         return {
             'theta0': original_theta0,
@@ -306,7 +816,7 @@ class LinearRegressionModel:
 
     def predict(self, x_values: np.ndarray) -> np.ndarray:
         """Make predictions using the trained model on original scale data."""
-        x_values = np.asarray(x_values).flatten()
+        x_values = np.ravel(np.asarray(x_values, dtype=np.float64))
         
         # Normalize input data using training statistics
         x_normalized = (x_values - self.x_mean) / self.x_std
@@ -321,7 +831,7 @@ class LinearRegressionModel:
     
     def predict_original_scale(self, x_values: np.ndarray) -> np.ndarray:
         """Make predictions on original scale data (used internally for metrics)."""
-        x_values = np.asarray(x_values).flatten()
+        x_values = np.ravel(np.asarray(x_values, dtype=np.float64))
         
         # Normalize input data using training statistics
         x_normalized = (x_values - self.x_mean) / self.x_std
@@ -16,7 +16,8 @@ class MetricsCalculator:
             'epochs': []
         }
     
-    def calculate_metrics(self, y_true: np.ndarray, y_pred: np.ndarray, epoch: int) -> Dict[str, float]:
+    def calculate_metrics(self, y_true: np.ndarray, y_pred: np.ndarray, epoch: int,
+                          store: bool = True) -> Dict[str, float]:
         """
         Calculate all performance metrics for given predictions.
         
@@ -24,6 +25,7 @@ class MetricsCalculator:
             y_true: True target values
             y_pred: Predicted values
             epoch: Current training epoch
+            store: Whether to append the metrics to the history
             
         Returns:
             Dictionary containing all calculated metrics
@@ -40,6 +42,38 @@ class MetricsCalculator:
         metrics['r2'] = self._calculate_r2(y_true, y_pred)
         
         # Store metrics in history
+        if store:
+            self._store_metrics(metrics, epoch)
+        
+        return metrics
+    
+    def calculate_metrics_from_moments(self, sse: float, ss_tot: float, n: float,
+                                       y_sample: np.ndarray, y_pred_sample: np.ndarray,
+                                       epoch: int) -> Dict[str, float]:
+        """
+        Calculate metrics from precomputed sums instead of full predictions.
+        
+        RMSE and R² are exact because they only depend on the sum of squared
+        residuals and the total sum of squares. MAE has no such closed form, so
+        it is estimated from a fixed-size sample of the data.
+        
+        Args:
+            sse: Sum of squared residuals over the full data
+            ss_tot: Total sum of squares of the full data
+            n: Number of data points
+            y_sample: True target values of the sample
+            y_pred_sample: Predicted values for the sample
+            epoch: Current training epoch
+            
+        Returns:
+            Dictionary containing all calculated metrics
+        """
+        metrics = {
+            'rmse': float(np.sqrt(max(sse, 0.0) / n)),
+            'mae': float(self._calculate_mae(y_sample, y_pred_sample)),
+            'r2': 0.0 if ss_tot == 0 else float(1 - (sse / ss_tot))
+        }
+        
         self._store_metrics(metrics, epoch)
         
         return metrics
@@ -69,6 +103,15 @@ class MetricsCalculator:
         self.metrics_history['r2'].append(metrics['r2'])
         self.metrics_history['epochs'].append(epoch)
     
+    def update_latest_metrics(self, metrics: Dict[str, float]):
+        """Overwrite the most recently stored metrics (e.g. with exact values)."""
+        if not self.metrics_history['epochs']:
+            return
+        
+        self.metrics_history['rmse'][-1] = metrics['rmse']
+        self.metrics_history['mae'][-1] = metrics['mae']
+        self.metrics_history['r2'][-1] = metrics['r2']
+    
     def get_metrics_history(self) -> Dict[str, List[float]]:
         """Get the complete metrics history."""
         return self.metrics_history.copy()
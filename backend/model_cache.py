@@ -0,0 +1,100 @@
+"""
+Hot Model Cache.
+Keeps recently used model parameters in process so repeat predictions skip the database.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class ModelCache:
+    """
+    LRU cache of loaded models with a time-to-live.
+
+    Entries are loaded through `loader(model_id)` on a miss and kept for
+    ttl_seconds; at most max_entries are held, evicting the least recently
+    used. Unknown models (loader returns None) are not cached. The loader runs
+    outside the lock, so a slow database read never blocks hits on other models.
+    """
+
+    def __init__(self, loader: Callable[[str], Optional[Any]], max_entries: int = 1024,
+                 ttl_seconds: float = 300.0):
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+        self.loader = loader
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, model_id: str) -> Optional[Any]:
+        """The cached model if present and fresh (counted as a hit); never calls the loader."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(model_id)
+            if entry is None:
+                return None
+            loaded_at, model = entry
+            if now - loaded_at >= self.ttl_seconds:
+                del self._entries[model_id]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(model_id)
+            self.hits += 1
+            return model
+
+    def get(self, model_id: str) -> Optional[Any]:
+        """The model for model_id, from the cache or the loader (None if it does not exist)."""
+        model = self.lookup(model_id)
+        if model is not None:
+            return model
+        with self._lock:
+            self.misses += 1
+
+        model = self.loader(model_id)
+        if model is not None:
+            self.put(model_id, model)
+        return model
+
+    def put(self, model_id: str, model: Any):
+        """Insert or refresh a model, evicting the least recently used ones over max_entries."""
+        with self._lock:
+            self._entries[model_id] = (time.monotonic(), model)
+            self._entries.move_to_end(model_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, model_id: str):
+        """Drop a model (e.g. after it was changed or deleted)."""
+        with self._lock:
+            self._entries.pop(model_id, None)
+
+    def clear(self):
+        """Drop every cached model."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions
+            }
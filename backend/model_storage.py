@@ -1,24 +1,97 @@
+import json
 import os
+import queue
 import sqlite3
+import threading
 import uuid
+from concurrent.futures import Future
 from datetime import datetime
+from typing import Iterator
 
 DB_FILE = "model/models1.db"
 
+# Columns in INSERT/SELECT order
+COLUMNS = ("model_id", "user_id", "file_path", "x_col", "y_col", "theta0", "theta1",
+           "created_at", "epochs", "tolerance", "coefficients")
+
+# Columns returned by list_models
+LIST_COLUMNS = ("model_id", "x_col", "y_col", "created_at")
+
+DEFAULT_PAGE_SIZE = 100
+
+# Writer thread: maximum rows per transaction and how long to wait for more rows
+WRITE_BATCH_SIZE = 256
+WRITE_BATCH_WAIT = 0.05
+
+# How long a connection waits for a lock before failing (ms)
+BUSY_TIMEOUT_MS = 5000
+
+_STOP = object()
+
+
 class ModelStorage:
     """
     SQLite storage for trained models.
     Stores θ0, θ1, metadata, and user_id for ownership.
+    Multivariate models keep all feature columns and coefficients as JSON;
+    θ0/θ1 then hold the intercept and the first coefficient.
+
+    The database runs in WAL mode so reads never wait for writes. Every thread
+    reads through its own connection, and all writes go through one background
+    writer thread that groups queued inserts into batched transactions, so
+    add_model returns immediately and concurrent saves never contend for the
+    write lock. Models are visible to get_model as soon as add_model returns;
+    listings include them once the writer has committed (call flush() to wait).
+    Pass wait=True to add_model to block until the row is committed and get an
+    error if the write failed. close() writes everything still queued.
     """
 
-    def __init__(self, db_file: str = DB_FILE):
+    def __init__(self, db_file: str = DB_FILE, batch_size: int = WRITE_BATCH_SIZE,
+                 batch_wait: float = WRITE_BATCH_WAIT):
         self.db_file = db_file
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
         # Ensure directory exists if a path is provided
         os.makedirs(os.path.dirname(db_file), exist_ok=True) if os.path.dirname(db_file) else None
-        self.conn = sqlite3.connect(db_file, check_same_thread=False)
-        self._create_table()
 
-    def _create_table(self):
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._closed = False
+
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._create_table(conn)
+        finally:
+            conn.close()
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="model-storage-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        # check_same_thread=False only so close() can close connections of other threads;
+        # each connection is used by a single thread
+        conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Connection of the calling thread (created on first use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _create_table(self, conn: sqlite3.Connection):
         query = """
         CREATE TABLE IF NOT EXISTS models (
             model_id    TEXT PRIMARY KEY,
@@ -30,11 +103,77 @@ class ModelStorage:
             theta1      REAL,
             created_at  TEXT,
             epochs      INTEGER,
-            tolerance   REAL
+            tolerance   REAL,
+            coefficients TEXT
         );
         """
-        self.conn.execute(query)
-        self.conn.commit()
+        conn.execute(query)
+        self._migrate(conn)
+        # Keyset pagination walks (created_at, model_id), optionally per user
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_models_user_created ON models (user_id, created_at, model_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_models_created ON models (created_at, model_id)")
+        conn.commit()
+
+    def _migrate(self, conn: sqlite3.Connection):
+        """Add columns introduced after the original schema to existing databases."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(models)")}
+        if "coefficients" not in columns:
+            conn.execute("ALTER TABLE models ADD COLUMN coefficients TEXT")
+            print("🗄️ Migrated models table: added coefficients column")
+
+    # ---------- Writes (background writer thread) ----------
+    def _write_loop(self):
+        """Insert queued rows in batched transactions until stopped."""
+        conn = self._connect()
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                break
+            batch = [item]
+            # Gather whatever else arrives shortly, up to one batch
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=self.batch_wait)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stop = True
+                    break
+                batch.append(item)
+            self._insert_batch(conn, batch)
+            for _ in batch:
+                self._queue.task_done()
+        conn.close()
+
+    def _insert_batch(self, conn: sqlite3.Connection, batch: list):
+        query = f"INSERT INTO models ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        errors = {}
+        try:
+            with conn:
+                conn.executemany(query, batch)
+        except sqlite3.Error as e:
+            # Retry one by one so a bad row does not lose the rest of the batch
+            print(f"⚠️ Batched model insert failed ({e}), retrying rows individually")
+            for row in batch:
+                try:
+                    with conn:
+                        conn.execute(query, row)
+                except sqlite3.Error as row_error:
+                    print(f"❌ Failed to store model {row[0]}: {row_error}")
+                    errors[row[0]] = row_error
+        with self._pending_lock:
+            written = [self._pending.pop(row[0], (None, None))[1] for row in batch]
+        # Report each row's outcome to whoever waits on it
+        for row, future in zip(batch, written):
+            if future is None:
+                continue
+            if row[0] in errors:
+                future.set_exception(RuntimeError(f"Failed to store model {row[0]}: {errors[row[0]]}"))
+            else:
+                future.set_result(row[0])
 
     def add_model(
         self,
@@ -45,29 +184,68 @@ class ModelStorage:
         theta0: float,
         theta1: float,
         epochs: int,
-        tolerance: float
+        tolerance: float,
+        coefficients: dict | None = None,
+        wait: bool = False
     ) -> str:
+        """
+        Queue a model for the writer thread and return its model_id.
+
+        With wait=True, block until the row is committed; a failed write raises
+        RuntimeError instead of leaving an id that later returns nothing.
+        """
         model_id = str(uuid.uuid4())
         created_at = datetime.now().isoformat()
+        row = (model_id, user_id, file_path, x_col, y_col,
+               float(theta0), float(theta1), created_at, int(epochs), float(tolerance),
+               json.dumps(coefficients) if coefficients is not None else None)
 
-        query = """
-        INSERT INTO models (model_id, user_id, file_path, x_col, y_col,
-                            theta0, theta1, created_at, epochs, tolerance)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        self.conn.execute(
-            query,
-            (model_id, user_id, file_path, x_col, y_col,
-             float(theta0), float(theta1), created_at, int(epochs), float(tolerance))
-        )
-        self.conn.commit()
+        # Visible to get_model right away; the writer thread persists it
+        written = Future()
+        with self._pending_lock:
+            if self._closed:
+                raise RuntimeError("ModelStorage is closed")
+            self._pending[model_id] = (row, written)
+            self._queue.put(row)
+        if wait:
+            written.result()
         return model_id
 
+    def add_multivariate_model(
+        self,
+        user_id: str,
+        file_path: str,
+        x_columns: list,
+        y_col: str,
+        intercept: float,
+        coefficients: list,
+        epochs: int,
+        tolerance: float,
+        wait: bool = False
+    ) -> str:
+        if len(x_columns) != len(coefficients) or not coefficients:
+            raise ValueError("x_columns and coefficients must be non-empty and of equal length")
+        return self.add_model(
+            user_id, file_path, x_columns[0], y_col, intercept, coefficients[0], epochs, tolerance,
+            coefficients={"x_columns": list(x_columns), "coefficients": [float(c) for c in coefficients]},
+            wait=wait
+        )
+
+    def flush(self):
+        """Block until every queued model has been written."""
+        self._queue.join()
+
+    # ---------- Reads (per-thread connections) ----------
     def get_model(self, model_id: str) -> dict | None:
-        query = "SELECT * FROM models WHERE model_id=?"
-        cursor = self.conn.execute(query, (model_id,))
-        row = cursor.fetchone()
+        with self._pending_lock:
+            row, _ = self._pending.get(model_id, (None, None))
+        if row is None:
+            query = f"SELECT {', '.join(COLUMNS)} FROM models WHERE model_id=?"
+            cursor = self.conn.execute(query, (model_id,))
+            row = cursor.fetchone()
         if row:
+            # Single-feature rows have no JSON: their only coefficient is θ1
+            extra = json.loads(row[10]) if row[10] else {"x_columns": [row[3]], "coefficients": [row[6]]}
             return {
                 "model_id":  row[0],
                 "user_id":   row[1],
@@ -79,20 +257,58 @@ class ModelStorage:
                 "created_at":row[7],
                 "epochs":    row[8],
                 "tolerance": row[9],
+                "x_columns": extra["x_columns"],
+                "coefficients": extra["coefficients"],
             }
         return None
 
-    def list_models(self, user_id: str | None = None):
+    def list_models(self, user_id: str | None = None, limit: int | None = None,
+                    after: tuple | None = None) -> list:
+        """
+        One page of (model_id, x_col, y_col, created_at) rows, oldest first.
+
+        Pages are keyset-paginated: pass the (created_at, model_id) of the last
+        row as `after` to get the next page. By default (limit=None) every row is returned.
+        """
+        conditions, params = [], []
         if user_id:
-            query = "SELECT model_id, x_col, y_col, created_at FROM models WHERE user_id=?"
-            cursor = self.conn.execute(query, (user_id,))
-        else:
-            query = "SELECT model_id, x_col, y_col, created_at FROM models"
-            cursor = self.conn.execute(query)
+            conditions.append("user_id = ?")
+            params.append(user_id)
+        if after is not None:
+            conditions.append("(created_at, model_id) > (?, ?)")
+            params.extend(after)
+        query = f"SELECT {', '.join(LIST_COLUMNS)} FROM models"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY created_at, model_id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        cursor = self.conn.execute(query, params)
         return cursor.fetchall()
 
+    def iter_models(self, user_id: str | None = None, page_size: int = 1000) -> Iterator[tuple]:
+        """Stream every (model_id, x_col, y_col, created_at) row, one keyset page at a time."""
+        after = None
+        while True:
+            page = self.list_models(user_id, limit=page_size, after=after)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = (page[-1][3], page[-1][0])
+
     def close(self):
-        try:
-            self.conn.close()
-        except:
-            pass
+        """Write every queued model, stop the writer thread and close all connections."""
+        with self._pending_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._writer.join()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except:
+                pass
@@ -0,0 +1,216 @@
+"""
+Multivariate Linear Regression.
+Fits y = θ₀ + θ·x on an n×d feature matrix from a cached Gram matrix.
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from . import gd_kernels
+
+# Rows per block when accumulating the Gram matrix (bounds the centered copy)
+GRAM_CHUNK_ROWS = 65536
+
+
+class MultivariateRegressionModel:
+    """
+    Linear regression with d features.
+
+    The features are held as one C-contiguous n×d matrix of a single dtype. XᵀX
+    and Xᵀy of the centered data are computed once with BLAS matrix products;
+    after that gradient descent costs O(d²) per epoch regardless of n, and the
+    Cholesky solver works on the d×d Gram matrix directly. Like
+    LinearRegressionModel, training happens on standardized features and target.
+    Centered data makes the intercept exactly zero in that space, so only the d
+    weights are trained and the intercept is recovered when converting back.
+    """
+
+    SOLVERS = ("cholesky", "qr", "gd")
+
+    def __init__(self, X: np.ndarray, y: np.ndarray, feature_names: Optional[List[str]] = None,
+                 dtype=np.float64):
+        """Initialize the model and cache the Gram matrix of the standardized data."""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(-1, 1)
+        if X.ndim != 2:
+            raise ValueError("X must be a 2-D array of shape (n_samples, n_features)")
+        self.X = np.ascontiguousarray(X, dtype=dtype)
+        self.y = np.ascontiguousarray(np.ravel(y), dtype=dtype)
+        self.n, self.d = self.X.shape
+        if len(self.y) != self.n:
+            raise ValueError("X and y must have the same number of rows")
+        if self.n == 0:
+            raise ValueError("No training data")
+
+        self.feature_names = list(feature_names) if feature_names is not None else [f"x{i}" for i in range(self.d)]
+        if len(self.feature_names) != self.d:
+            raise ValueError("feature_names must have one name per column of X")
+
+        self.x_mean = self.X.mean(axis=0, dtype=np.float64)
+        self.y_mean = float(self.y.mean(dtype=np.float64))
+        self._compute_gram()
+
+        # Trained weights of the standardized features
+        self.weights = np.zeros(self.d)
+
+        print(f"✅ Multivariate model initialized: {self.n} rows × {self.d} features ({self.X.dtype})")
+
+    def _compute_gram(self):
+        """Accumulate XᵀX, Xᵀy and yᵀy of the centered data block by block, then standardize them."""
+        gram = np.zeros((self.d, self.d))
+        xty = np.zeros(self.d)
+        yty = 0.0
+        for start in range(0, self.n, GRAM_CHUNK_ROWS):
+            xc = self.X[start:start + GRAM_CHUNK_ROWS] - self.x_mean
+            yc = self.y[start:start + GRAM_CHUNK_ROWS] - self.y_mean
+            gram += xc.T @ xc
+            xty += xc.T @ yc
+            yty += float(yc @ yc)
+
+        # Population standard deviations, as in LinearRegressionModel
+        self.x_std = np.sqrt(np.diag(gram) / self.n)
+        self.y_std = float(np.sqrt(yty / self.n))
+        zero_variance = self.x_std == 0
+        if zero_variance.any():
+            names = [self.feature_names[i] for i in np.flatnonzero(zero_variance)]
+            print(f"⚠️ Warning: features with zero variance: {names}, setting std to 1.0")
+            self.x_std[zero_variance] = 1.0
+        if self.y_std == 0:
+            print("⚠️ Warning: Y data has zero variance, setting std to 1.0")
+            self.y_std = 1.0
+
+        self.gram = gram / np.outer(self.x_std, self.x_std)
+        self.xty = xty / (self.x_std * self.y_std)
+        self.yty = yty / self.y_std ** 2
+
+    def compute_cost(self, weights: Optional[np.ndarray] = None) -> float:
+        """Cost (MSE / 2) of the standardized model from the Gram matrix."""
+        w = self.weights if weights is None else weights
+        sse = w @ self.gram @ w - 2.0 * (w @ self.xty) + self.yty
+        return float(max(sse, 0.0) / (2.0 * self.n))
+
+    def fit(self, solver: str = "cholesky", learning_rate: float = 0.01, max_epochs: int = 1000,
+            tolerance: float = 1e-6, early_stopping: bool = True) -> Dict[str, Any]:
+        """
+        Fit the model.
+
+        Args:
+            solver: "cholesky" (normal equations), "qr" (on the data) or "gd"
+            learning_rate: Learning rate (α) for gradient descent
+            max_epochs: Maximum number of gradient-descent epochs
+            tolerance: Convergence tolerance for gradient descent
+            early_stopping: Whether gradient descent stops once the cost is stable
+
+        Returns:
+            Dictionary with the solver, original-scale parameters and training cost
+        """
+        if solver not in self.SOLVERS:
+            raise ValueError(f"Unknown solver: {solver}")
+
+        start_time = time.perf_counter()
+        result: Dict[str, Any] = {"solver": solver}
+        if solver == "cholesky":
+            try:
+                lower = np.linalg.cholesky(self.gram)
+            except np.linalg.LinAlgError:
+                raise ValueError("Gram matrix is not positive definite (collinear features); use the qr solver")
+            self.weights = np.linalg.solve(lower.T, np.linalg.solve(lower, self.xty))
+        elif solver == "qr":
+            self.weights = self._fit_qr()
+        else:
+            result.update(self._fit_gd(learning_rate, max_epochs, tolerance, early_stopping))
+
+        cost = self.compute_cost()
+        params = self.get_original_scale_parameters()
+        result.update({
+            "intercept": params["intercept"],
+            "coefficients": params["coefficients"],
+            "feature_names": self.feature_names,
+            "cost": cost,
+            "train_mse": 2.0 * cost * self.y_std ** 2,
+            "elapsed_seconds": time.perf_counter() - start_time
+        })
+        print(f"✅ Multivariate fit ({solver}): cost = {cost:.6f}")
+        return result
+
+    def _fit_qr(self) -> np.ndarray:
+        """Least squares via a QR factorization of the standardized feature matrix."""
+        Z = (self.X - self.x_mean) / self.x_std
+        Q, R = np.linalg.qr(Z)
+        if np.any(np.abs(np.diag(R)) < 1e-12 * max(1.0, np.abs(R).max())):
+            raise ValueError("Feature matrix is rank deficient (collinear features)")
+        return np.linalg.solve(R, Q.T @ ((self.y - self.y_mean) / self.y_std))
+
+    def _fit_gd(self, learning_rate: float, max_epochs: int, tolerance: float,
+                early_stopping: bool) -> Dict[str, Any]:
+        """Gradient descent over the cached Gram matrix (O(d²) per epoch)."""
+        print(f"🚀 Starting multivariate gradient descent: α={learning_rate}, epochs={max_epochs}, tolerance={tolerance}")
+        w = np.zeros(self.d)
+        prev_cost = np.inf
+        no_improvement = 0
+        status = gd_kernels.STATUS_MAX_EPOCHS
+        epoch = 0
+        converged_epoch = None
+        step = learning_rate / self.n
+
+        # Diverging runs overflow before the finiteness check stops them
+        with np.errstate(over='ignore', invalid='ignore'):
+            for epoch in range(1, max_epochs + 1):
+                gram_w = self.gram @ w
+                cost = max(w @ gram_w - 2.0 * (w @ self.xty) + self.yty, 0.0) / (2.0 * self.n)
+                new_w = w - step * (gram_w - self.xty)
+                if not np.all(np.isfinite(new_w)):
+                    print(f"⚠️ Parameters exploded at epoch {epoch}, stopping")
+                    status = gd_kernels.STATUS_EXPLODED
+                    epoch -= 1
+                    break
+                w = new_w
+
+                if abs(prev_cost - cost) < tolerance:
+                    if converged_epoch is None:
+                        converged_epoch = epoch
+                    no_improvement += 1
+                else:
+                    no_improvement = 0
+                prev_cost = cost
+
+                if early_stopping and no_improvement >= gd_kernels.EARLY_STOPPING_PATIENCE:
+                    print(f"🛑 Early stopping at epoch {epoch} (cost stable for {gd_kernels.EARLY_STOPPING_PATIENCE} epochs)")
+                    status = gd_kernels.STATUS_EARLY_STOPPED
+                    break
+
+        self.weights = w
+        return {
+            "status": gd_kernels.STATUS_NAMES[status],
+            "epochs_run": epoch,
+            "converged_epoch": converged_epoch
+        }
+
+    def get_original_scale_parameters(self) -> Dict[str, Any]:
+        """Intercept and per-feature coefficients in the original data scale."""
+        coefficients = self.weights * (self.y_std / self.x_std)
+        intercept = self.y_mean - float(coefficients @ self.x_mean)
+        return {"intercept": float(intercept), "coefficients": coefficients.tolist()}
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict targets (original scale) for an n×d feature matrix."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(-1, self.d)
+        params = self.get_original_scale_parameters()
+        return X @ np.asarray(params["coefficients"]) + params["intercept"]
+
+    def evaluate(self, X: np.ndarray, y: np.ndarray) -> Dict[str, float]:
+        """RMSE, MAE and R² of the model on a dataset."""
+        y = np.ravel(y).astype(np.float64, copy=False)
+        residuals = y - self.predict(X)
+        ss_res = float(residuals @ residuals)
+        ss_tot = float(np.sum((y - y.mean()) ** 2)) if len(y) else 0.0
+        return {
+            "rmse": float(np.sqrt(ss_res / len(y))) if len(y) else 0.0,
+            "mae": float(np.mean(np.abs(residuals))) if len(y) else 0.0,
+            "r2": 0.0 if ss_tot == 0 else 1.0 - ss_res / ss_tot
+        }
@@ -0,0 +1,249 @@
+"""
+Server-Side Plot Aggregation.
+Downsamples scatter data with LTTB and bins it into density grids for a viewport.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Size of the coarsest precomputed LTTB level; each finer level is 4x larger
+LTTB_BASE_POINTS = 1024
+
+# Largest precomputed LTTB level (finer zooms use the raw sorted points)
+LTTB_MAX_LEVEL_POINTS = 262144
+
+# Candidate points per output point when choosing a pyramid level
+POINTS_PER_PIXEL = 4
+
+# Maximum bins per axis of the finest density grid (power of two, halved per level)
+DENSITY_BASE_BINS = 1024
+
+# Bins per axis of the coarsest density grid
+DENSITY_MIN_BINS = 16
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, for every bucket in between, the point
+    forming the largest triangle with the previously selected point and the
+    average of the next bucket.
+
+    Args:
+        x: X values sorted in ascending order
+        y: Y values
+        n_out: Number of points to keep
+
+    Returns:
+        Indices of the selected points
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets over the inner points; every bucket holds at least one point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+
+    # Third vertex of each bucket: the next bucket's average (the last point for the last bucket)
+    next_x = np.append(avg_x[1:], x[n - 1])
+    next_y = np.append(avg_y[1:], y[n - 1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - next_x[b]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[b] - ay))
+        a = lo + int(np.argmax(area))
+        selected[b + 1] = a
+
+    return selected
+
+
+def _bounds(values: np.ndarray) -> Tuple[float, float]:
+    """Min/max of the values, widened when all values are equal."""
+    if len(values) == 0:
+        return 0.0, 1.0
+    low, high = float(np.min(values)), float(np.max(values))
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return low, high
+
+
+class PlotPyramid:
+    """
+    Multi-resolution aggregates of a cleaned dataset for plotting.
+
+    Built once per dataset: the points sorted by X, LTTB levels of increasing
+    size, and density grids halved per level. Viewport queries pick the level
+    whose resolution matches the requested pixels, so their cost depends on the
+    screen size rather than the number of rows.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        order = np.argsort(x, kind='stable')
+        self.x = x[order]
+        self.y = y[order]
+        self.n = len(self.x)
+        self.x_bounds = _bounds(self.x)
+        self.y_bounds = _bounds(self.y)
+
+        self.lttb_levels = self._build_lttb_levels()
+        self.density_levels = self._build_density_levels()
+        print(f"🗺️ Plot pyramid built: {self.n} points, "
+              f"{len(self.lttb_levels)} LTTB levels, {len(self.density_levels)} density levels")
+
+    def _build_lttb_levels(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """LTTB levels from coarsest to finest; the last level is the raw sorted data."""
+        levels = []
+        size = LTTB_BASE_POINTS
+        while size < self.n and size <= LTTB_MAX_LEVEL_POINTS:
+            idx = lttb_indices(self.x, self.y, size)
+            levels.append((self.x[idx], self.y[idx]))
+            size *= 4
+        levels.append((self.x, self.y))
+        return levels
+
+    def _build_density_levels(self) -> List[np.ndarray]:
+        """Density grids (indexed [x_bin, y_bin]) from finest to coarsest."""
+        # No finer than ~4 bins per sqrt(n) per axis, so small datasets get small grids
+        bins = DENSITY_MIN_BINS
+        while bins < DENSITY_BASE_BINS and bins < 4 * math.sqrt(self.n):
+            bins *= 2
+        counts, _, _ = np.histogram2d(self.x, self.y, bins=bins,
+                                      range=[self.x_bounds, self.y_bounds])
+        grid = counts.astype(np.uint32)
+        levels = [grid]
+        while grid.shape[0] > DENSITY_MIN_BINS:
+            half = grid.shape[0] // 2
+            grid = grid.reshape(half, 2, half, 2).sum(axis=(1, 3), dtype=np.uint32)
+            levels.append(grid)
+        return levels
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the pyramid."""
+        total = self.x.nbytes + self.y.nbytes
+        total += sum(lx.nbytes + ly.nbytes for lx, ly in self.lttb_levels[:-1])
+        total += sum(grid.nbytes for grid in self.density_levels)
+        return int(total)
+
+    def _viewport(self, x_range: Optional[Tuple[float, float]],
+                  y_range: Optional[Tuple[float, float]]) -> Tuple[float, float, float, float]:
+        x0, x1 = x_range if x_range is not None else self.x_bounds
+        y0, y1 = y_range if y_range is not None else self.y_bounds
+        if x1 <= x0 or y1 <= y0:
+            raise ValueError("Viewport ranges must have max > min")
+        return x0, x1, y0, y1
+
+    def lttb(self, x_range: Optional[Tuple[float, float]] = None,
+             y_range: Optional[Tuple[float, float]] = None, n_out: int = 800) -> Dict[str, Any]:
+        """
+        Downsample the points inside a viewport.
+
+        Args:
+            x_range: (min, max) of the viewport X axis (default: data bounds)
+            y_range: (min, max) of the viewport Y axis (default: data bounds)
+            n_out: Maximum number of points to return (typically the pixel width)
+
+        Returns:
+            Dictionary with the selected x/y values and the pyramid level used
+        """
+        x0, x1, y0, y1 = self._viewport(x_range, y_range)
+        budget = max(n_out, 3) * POINTS_PER_PIXEL
+
+        # Finest level whose points inside the X range fit the budget
+        level = 0
+        for k in range(len(self.lttb_levels) - 1, -1, -1):
+            lx, _ = self.lttb_levels[k]
+            lo, hi = np.searchsorted(lx, x0, side='left'), np.searchsorted(lx, x1, side='right')
+            if hi - lo <= budget:
+                level = k
+                break
+
+        lx, ly = self.lttb_levels[level]
+        lo, hi = np.searchsorted(lx, x0, side='left'), np.searchsorted(lx, x1, side='right')
+        vx, vy = lx[lo:hi], ly[lo:hi]
+        in_view = (vy >= y0) & (vy <= y1)
+        vx, vy = vx[in_view], vy[in_view]
+
+        idx = lttb_indices(vx, vy, n_out)
+        return {
+            "mode": "lttb",
+            "x": vx[idx].tolist(),
+            "y": vy[idx].tolist(),
+            "level": level,
+            "level_points": len(lx),
+            "points_in_view": len(vx),
+            "total_points": self.n,
+            "x_range": [x0, x1],
+            "y_range": [y0, y1]
+        }
+
+    def density(self, x_range: Optional[Tuple[float, float]] = None,
+                y_range: Optional[Tuple[float, float]] = None,
+                width: int = 200, height: int = 100) -> Dict[str, Any]:
+        """
+        Bin the points inside a viewport into a width x height grid.
+
+        Uses the coarsest precomputed grid whose cells are no larger than an
+        output cell, and sums its cells into the output grid.
+
+        Args:
+            x_range: (min, max) of the viewport X axis (default: data bounds)
+            y_range: (min, max) of the viewport Y axis (default: data bounds)
+            width: Output cells along X
+            height: Output cells along Y
+
+        Returns:
+            Dictionary with counts (rows from y_min upwards), bin edges and the level used
+        """
+        x0, x1, y0, y1 = self._viewport(x_range, y_range)
+        out_dx, out_dy = (x1 - x0) / width, (y1 - y0) / height
+        bx0, bx1 = self.x_bounds
+        by0, by1 = self.y_bounds
+
+        level = 0
+        for k in range(len(self.density_levels) - 1, -1, -1):
+            bins = self.density_levels[k].shape[0]
+            if (bx1 - bx0) / bins <= out_dx and (by1 - by0) / bins <= out_dy:
+                level = k
+                break
+
+        grid = self.density_levels[level]
+        bins = grid.shape[0]
+        cw, ch = (bx1 - bx0) / bins, (by1 - by0) / bins
+        i0 = min(max(int(math.floor((x0 - bx0) / cw)), 0), bins)
+        i1 = min(max(int(math.ceil((x1 - bx0) / cw)), 0), bins)
+        j0 = min(max(int(math.floor((y0 - by0) / ch)), 0), bins)
+        j1 = min(max(int(math.ceil((y1 - by0) / ch)), 0), bins)
+
+        # Map each grid cell center inside the viewport to its output cell
+        ix = np.floor((bx0 + (np.arange(i0, i1) + 0.5) * cw - x0) / out_dx).astype(np.int64)
+        iy = np.floor((by0 + (np.arange(j0, j1) + 0.5) * ch - y0) / out_dy).astype(np.int64)
+        valid = ((ix >= 0) & (ix < width))[:, None] & ((iy >= 0) & (iy < height))[None, :]
+        flat = (ix[:, None] * height + iy[None, :])[valid]
+        counts = np.bincount(flat, weights=grid[i0:i1, j0:j1][valid],
+                             minlength=width * height).reshape(width, height)
+        counts = counts.T.astype(np.int64)
+
+        return {
+            "mode": "density",
+            "counts": counts.tolist(),
+            "max_count": int(counts.max()) if counts.size else 0,
+            "x_edges": np.linspace(x0, x1, width + 1).tolist(),
+            "y_edges": np.linspace(y0, y1, height + 1).tolist(),
+            "level": level,
+            "level_bins": bins,
+            "total_points": self.n
+        }
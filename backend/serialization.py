@@ -0,0 +1,219 @@
+"""
+Fast JSON Serialization.
+Encodes NumPy values natively, formats epoch events from a template and
+compresses large JSON responses.
+"""
+
+import gzip
+import json
+import math
+from typing import Any, Dict, Optional
+
+import numpy as np
+from starlette.responses import Response
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = 1024
+
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def _default(obj: Any) -> Any:
+    """Encode values the JSON encoder does not support natively."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _finite_or_none(obj: Any) -> Any:
+    """Copy of obj with NaN/inf replaced by None (orjson writes them as null)."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite_or_none(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite_or_none(value) for value in obj]
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return _finite_or_none(_default(obj))
+    return obj
+
+
+class _NumpyJSONEncoder(json.JSONEncoder):
+    """Stdlib fallback encoder with NumPy support."""
+
+    def default(self, obj):
+        return _default(obj)
+
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize to JSON bytes (NumPy scalars and arrays are encoded natively)."""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    def loads(data: bytes | str) -> Any:
+        """Parse JSON (raises ValueError on invalid input)."""
+        return orjson.loads(data)
+else:
+    def dumps(obj: Any) -> bytes:
+        """Serialize to JSON bytes (NumPy scalars and arrays are converted, NaN/inf become null)."""
+        try:
+            text = json.dumps(obj, cls=_NumpyJSONEncoder, separators=(',', ':'), allow_nan=False)
+        except ValueError:
+            # Non-finite values present: only then pay for a sanitizing pass
+            text = json.dumps(_finite_or_none(obj), cls=_NumpyJSONEncoder, separators=(',', ':'))
+        return text.encode('utf-8')
+
+    def loads(data: bytes | str) -> Any:
+        """Parse JSON (raises ValueError on invalid input)."""
+        return json.loads(data)
+
+
+def dumps_text(obj: Any) -> str:
+    """Serialize to a JSON string."""
+    return dumps(obj).decode('utf-8')
+
+
+def sse_event(payload_json: str) -> str:
+    """Format a JSON payload as a server-sent event data line."""
+    return f"data: {payload_json}\n\n"
+
+
+def websocket_message(kind: str, payload_json: str) -> str:
+    """Wrap a JSON payload in a typed WebSocket message."""
+    return f'{{"type":"{kind}","data":{payload_json}}}'
+
+
+def _number(value: float) -> str:
+    """Shortest round-trip representation of a float; non-finite values become null."""
+    value = float(value)
+    return repr(value) if math.isfinite(value) else "null"
+
+
+# Epoch events always have the same fields, so they are formatted from a template
+_EPOCH_TEMPLATE = (
+    '{{"epoch":{epoch},"max_epochs":{max_epochs},"theta0":{theta0},"theta1":{theta1},'
+    '"cost":{cost},"converged":{converged},"is_complete":{is_complete},'
+    '"rmse":{rmse},"mae":{mae},"r2":{r2},"metrics_exact":{metrics_exact}}}'
+)
+
+
+def epoch_json(epoch: int, max_epochs: int, theta0: float, theta1: float, cost: float,
+                converged: bool, is_complete: bool, rmse: float = 0.0, mae: float = 0.0,
+                r2: float = 0.0, metrics_exact: bool = True) -> str:
+    """Format a training epoch update as JSON."""
+    return _EPOCH_TEMPLATE.format(
+        epoch=int(epoch),
+        max_epochs=int(max_epochs),
+        theta0=_number(theta0),
+        theta1=_number(theta1),
+        cost=_number(cost),
+        converged="true" if converged else "false",
+        is_complete="true" if is_complete else "false",
+        rmse=_number(rmse),
+        mae=_number(mae),
+        r2=_number(r2),
+        metrics_exact="true" if metrics_exact else "false"
+    )
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with dumps(), bypassing FastAPI's jsonable_encoder."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Preferred supported content coding from an Accept-Encoding header."""
+    accepted = {part.split(';')[0].strip().lower() for part in accept_encoding.split(',')}
+    if BROTLI_AVAILABLE and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with the given content coding ("br" or "gzip")."""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class JSONCompressionMiddleware:
+    """
+    ASGI middleware that gzip/brotli-compresses large JSON responses.
+
+    Only complete (single-message) application/json bodies are compressed;
+    streamed responses pass through untouched so events are never held back.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = _choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Dict[str, Any] = {}
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Hold the start message until the body shows whether to compress
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or not start_message:
+                await send(message)
+                return
+
+            start, start_message = start_message, {}
+            response_headers = dict(start.get("headers") or [])
+            content_type = response_headers.get(b"content-type", b"")
+            body = message.get("body", b"")
+            if (message.get("more_body", False) or not content_type.startswith(b"application/json")
+                    or b"content-encoding" in response_headers or len(body) < self.minimum_size):
+                await send(start)
+                await send(message)
+                return
+
+            body = compress(body, encoding)
+            vary = response_headers.get(b"vary")
+            raw_headers = [(k, v) for k, v in start.get("headers") or []
+                           if k not in (b"content-length", b"vary")]
+            raw_headers += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding")
+            ]
+            await send({**start, "headers": raw_headers})
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,283 @@
+"""
+Session Registry for Multi-User State.
+Keeps per-session datasets, models and training flags within a memory budget.
+"""
+
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def estimate_nbytes(value: Any) -> int:
+    """Estimate the memory held by a session value (DataFrames, arrays and model objects)."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return _array_nbytes(value)
+    if isinstance(getattr(value, 'nbytes', None), int):
+        # Objects that report their own size (e.g. plot pyramids)
+        return value.nbytes
+    if hasattr(value, '__dict__'):
+        # Models and loaders: count the arrays they hold
+        return sum(_array_nbytes(v) for v in vars(value).values() if isinstance(v, np.ndarray))
+    return 0
+
+
+def _array_nbytes(array: np.ndarray) -> int:
+    """
+    Bytes of an array.
+
+    Memory-mapped arrays count in full too: they live in the page cache while the
+    session is in memory, but spilling pickles (and so reads) all of their data.
+    """
+    return int(array.nbytes)
+
+
+class Session(dict):
+    """
+    State for one user session.
+
+    Behaves like the old module-level session_data dict, and tracks its own
+    byte usage so the registry can enforce a memory budget.
+    """
+
+    def __init__(self, session_id: str):
+        super().__init__()
+        self.session_id = session_id
+        self.last_access = time.time()
+        self.spill_path: Optional[str] = None
+        self._nbytes = 0
+        self._dirty = False
+        # Requests currently using this session (changed under the registry lock)
+        self.in_flight = 0
+        # Chosen for spilling by the registry, file not written yet (changed under its lock)
+        self.spilling = False
+        # Serializes spill/restore, which run outside the registry lock
+        self._io_lock = threading.Lock()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._dirty = True
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._dirty = True
+
+    def pop(self, *args):
+        self._dirty = True
+        return super().pop(*args)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._dirty = True
+
+    def clear(self):
+        super().clear()
+        self._dirty = True
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated bytes held by this session (recomputed only after changes)."""
+        if self._dirty:
+            self._nbytes = sum(estimate_nbytes(v) for v in self.values())
+            self._dirty = False
+        return self._nbytes
+
+    @property
+    def is_busy(self) -> bool:
+        """Whether the session has a training run or a request in progress."""
+        return self.in_flight > 0 or bool(self.get('training_active', False))
+
+    @property
+    def is_spilled(self) -> bool:
+        return self.spill_path is not None
+
+    def spill(self, spill_dir: str) -> bool:
+        """
+        Write the session state to disk and release it from memory.
+
+        Returns False (and keeps the state) if the session is busy or already spilled.
+        """
+        with self._io_lock:
+            if self.is_busy or self.is_spilled:
+                return False
+            os.makedirs(spill_dir, exist_ok=True)
+            path = os.path.join(spill_dir, f"{self.session_id}.pkl")
+            with open(path, 'wb') as f:
+                pickle.dump(dict(self), f, protocol=pickle.HIGHEST_PROTOCOL)
+            self.clear()
+            self.spill_path = path
+            return True
+
+    def restore(self) -> bool:
+        """Load spilled session state back into memory (returns whether it was spilled)."""
+        with self._io_lock:
+            if self.spill_path is None:
+                return False
+            with open(self.spill_path, 'rb') as f:
+                self.update(pickle.load(f))
+            os.remove(self.spill_path)
+            self.spill_path = None
+            return True
+
+    def discard_spill(self):
+        """Delete the spill file, if any."""
+        if self.spill_path is not None:
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass
+            self.spill_path = None
+
+
+class SessionRegistry:
+    """
+    Registry of sessions keyed by session ID with LRU eviction.
+
+    When the total estimated memory of in-memory sessions exceeds the budget, the
+    least recently used idle sessions are spilled to disk (if a spill directory is
+    configured) or evicted. Sessions with training or a request in progress
+    (see acquire/release) are never touched.
+    """
+
+    def __init__(self, memory_budget_bytes: int, spill_dir: Optional[str] = None,
+                 max_sessions: Optional[int] = None):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.spill_dir = spill_dir
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.evictions = 0
+        self.spills = 0
+
+    def get(self, session_id: str) -> Session:
+        """Get (or create) a session, mark it most recently used and enforce the budget."""
+        session = self._lookup(session_id)
+        self._load(session)
+        self.enforce_budget(keep=session_id)
+        return session
+
+    def acquire(self, session_id: str) -> Session:
+        """
+        Get a session for a request; it stays busy (never spilled or evicted) until released.
+
+        Restoring a spilled session and enforcing the budget read and write files,
+        so call this off the event loop.
+        """
+        with self._lock:
+            session = self._lookup(session_id)
+            session.in_flight += 1
+        try:
+            self._load(session)
+            self.enforce_budget(keep=session_id)
+        except BaseException:
+            self.release(session)
+            raise
+        return session
+
+    def release(self, session: Session):
+        """Mark a request that acquired the session as finished."""
+        with self._lock:
+            session.in_flight -= 1
+
+    def _lookup(self, session_id: str) -> Session:
+        """Get (or create) a session and mark it most recently used."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = Session(session_id)
+                self._sessions[session_id] = session
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_access = time.time()
+            return session
+
+    def _load(self, session: Session):
+        # File I/O happens outside the registry lock (the session's own lock orders it)
+        if session.is_spilled and session.restore():
+            print(f"📂 Session {session.session_id[:8]} restored from disk")
+
+    def remove(self, session_id: str):
+        """Drop a session and any spilled state."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                session.discard_spill()
+
+    @property
+    def total_bytes(self) -> int:
+        """Estimated bytes held in memory by all sessions."""
+        with self._lock:
+            return sum(s.nbytes for s in self._sessions.values())
+
+    def enforce_budget(self, keep: Optional[str] = None):
+        """
+        Spill or evict least recently used idle sessions until within budget.
+
+        Victims are chosen under the registry lock, but spills write their files
+        after it is released, so other requests are not blocked meanwhile.
+        Call this off the event loop.
+        """
+        to_spill = []
+        with self._lock:
+            if self.max_sessions is not None:
+                for session_id in list(self._sessions):
+                    if len(self._sessions) <= self.max_sessions:
+                        break
+                    session = self._sessions[session_id]
+                    if session_id != keep and not session.is_busy and not session.spilling:
+                        self._evict(session_id)
+
+            # Sessions another call is spilling already count as freed
+            total = sum(s.nbytes for s in self._sessions.values() if not s.spilling)
+            for session_id in list(self._sessions):
+                if total <= self.memory_budget_bytes:
+                    break
+                session = self._sessions[session_id]
+                if session_id == keep or session.is_busy or session.is_spilled or session.spilling:
+                    continue
+                total -= session.nbytes
+                if self.spill_dir:
+                    session.spilling = True
+                    to_spill.append(session)
+                else:
+                    self._evict(session_id)
+
+        for session in to_spill:
+            freed = session.nbytes
+            spilled = False
+            try:
+                # Skipped if a request acquired the session in the meantime
+                spilled = session.spill(self.spill_dir)
+            finally:
+                with self._lock:
+                    session.spilling = False
+                    self.spills += int(spilled)
+            if spilled:
+                print(f"💾 Session {session.session_id[:8]} spilled to disk ({freed} bytes)")
+
+    def _evict(self, session_id: str):
+        session = self._sessions.pop(session_id)
+        session.discard_spill()
+        self.evictions += 1
+        print(f"🗑️ Session {session_id[:8]} evicted")
+
+    def stats(self) -> Dict[str, Any]:
+        """Summary of registry usage."""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "spilled_sessions": sum(1 for s in self._sessions.values() if s.is_spilled),
+                "total_bytes": self.total_bytes,
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "evictions": self.evictions,
+                "spills": self.spills
+            }
@@ -0,0 +1,221 @@
+"""
+Training Worker Pool.
+Runs blocking training generators off the asyncio event loop.
+"""
+
+import asyncio
+import contextlib
+import functools
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, AsyncGenerator, Callable, Dict, Optional
+
+# How often a blocked worker or reader re-checks for cancellation (seconds)
+_POLL_INTERVAL = 0.1
+
+
+def _run_in_process(model, method: str, kwargs: Dict[str, Any], results, stop_event) -> Dict[str, Any]:
+    """
+    Iterate a training generator inside a worker process.
+
+    Items are posted to a managed queue; the trained state of the worker's copy of
+    the model is returned so the parent can apply it, even when stopped early.
+    """
+    def put(message) -> bool:
+        while not stop_event.is_set():
+            try:
+                results.put(message, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    generator = getattr(model, method)(**kwargs)
+    try:
+        for item in generator:
+            if not put(("item", item)):
+                break
+    finally:
+        generator.close()
+    put(("done", None))
+    return model.get_training_state()
+
+
+class TrainingWorkerPool:
+    """
+    Runs synchronous training generators in a thread or process pool.
+
+    Items produced by the generator are handed to the event loop through a bounded
+    queue, so the loop only does I/O. The bound also provides backpressure: a
+    consumer that stops reading (e.g. while training is paused) stalls the worker
+    instead of letting it run ahead.
+    """
+
+    MODES = ("thread", "process")
+
+    def __init__(self, mode: str = "thread", max_workers: Optional[int] = None, queue_size: int = 8):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown training executor mode: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self._executor = None
+        self._manager = None
+        self._local_executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        """Lazily created executor for the configured mode."""
+        with self._lock:
+            if self._executor is None:
+                if self.mode == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                    self._manager = multiprocessing.Manager()
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="training"
+                    )
+            return self._executor
+
+    @property
+    def local_executor(self):
+        """
+        Threads for helpers that work on objects of this process.
+
+        In thread mode this is the pool itself; in process mode a thread pool of
+        the same size, so max_workers bounds those helpers too.
+        """
+        if self.mode == "thread":
+            return self.executor
+        with self._lock:
+            if self._local_executor is None:
+                self._local_executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="training-local"
+                )
+            return self._local_executor
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking helper in the pool so it does not stall the event loop.
+
+        In process mode func, its arguments and its result are pickled to and from
+        a worker process, so use run_local for closures, bound methods and helpers
+        that change state of this process.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def run_local(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking helper on a thread of this process (see local_executor)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.local_executor, functools.partial(func, *args, **kwargs))
+
+    async def stream(self, model, method: str, **kwargs) -> AsyncGenerator[Any, None]:
+        """
+        Iterate model.<method>(**kwargs) in the pool and yield its items asynchronously.
+
+        Closing the async generator stops the worker at its next item.
+
+        Args:
+            model: Model whose generator method drives training
+            method: Name of the generator method (e.g. "train_epoch_by_epoch")
+            **kwargs: Arguments for the generator method
+
+        Yields:
+            Items produced by the generator, in order
+        """
+        if self.mode == "process":
+            stream = self._stream_process(model, method, kwargs)
+        else:
+            stream = self._stream_thread(model, method, kwargs)
+
+        async with contextlib.aclosing(stream):
+            async for item in stream:
+                yield item
+
+    async def _stream_thread(self, model, method: str, kwargs: Dict[str, Any]) -> AsyncGenerator[Any, None]:
+        loop = asyncio.get_running_loop()
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        stop_event = threading.Event()
+
+        def put(message) -> bool:
+            future = asyncio.run_coroutine_threadsafe(results.put(message), loop)
+            while not stop_event.is_set():
+                try:
+                    future.result(timeout=_POLL_INTERVAL)
+                    return True
+                except FutureTimeoutError:
+                    continue
+            future.cancel()
+            return False
+
+        def worker():
+            try:
+                generator = getattr(model, method)(**kwargs)
+                try:
+                    for item in generator:
+                        if not put(("item", item)):
+                            break
+                finally:
+                    generator.close()
+                put(("done", None))
+            except Exception as e:
+                put(("error", f"{type(e).__name__}: {e}"))
+
+        task = loop.run_in_executor(self.executor, worker)
+        try:
+            while True:
+                kind, payload = await results.get()
+                if kind == "item":
+                    yield payload
+                elif kind == "error":
+                    raise RuntimeError(payload)
+                else:
+                    break
+        finally:
+            stop_event.set()
+            await asyncio.shield(task)
+
+    async def _stream_process(self, model, method: str, kwargs: Dict[str, Any]) -> AsyncGenerator[Any, None]:
+        executor = self.executor
+        results = self._manager.Queue(maxsize=self.queue_size)
+        stop_event = self._manager.Event()
+
+        def get():
+            while True:
+                try:
+                    return results.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    if stop_event.is_set() or future.done():
+                        return ("done", None)
+
+        future = executor.submit(_run_in_process, model, method, kwargs, results, stop_event)
+        task = asyncio.wrap_future(future)
+        try:
+            while True:
+                kind, payload = await asyncio.to_thread(get)
+                if kind == "item":
+                    yield payload
+                else:
+                    break
+        finally:
+            stop_event.set()
+            # Apply the trained parameters from the worker's copy of the model;
+            # errors raised in the worker propagate from here
+            model.set_training_state(await asyncio.shield(task))
+
+    def shutdown(self):
+        """Shut down the executors and any process-pool manager."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            if self._local_executor is not None:
+                self._local_executor.shutdown(wait=False, cancel_futures=True)
+                self._local_executor = None
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
@@ -0,0 +1,63 @@
+"""
+Synthetic Benchmark Datasets.
+Seeded single-feature datasets, optionally with the defects the cleaning step removes.
+"""
+
+import numpy as np
+import pandas as pd
+
+X_COLUMN = "x"
+Y_COLUMN = "y"
+
+# Fractions of rows given each defect in dirty datasets
+MISSING_FRACTION = 0.01
+STRING_FRACTION = 0.005
+DUPLICATE_FRACTION = 0.01
+OUTLIER_FRACTION = 0.005
+
+
+def make_xy(n: int, seed: int = 0):
+    """Clean arrays x, y = 3x + 2 + noise of n rows."""
+    rng = np.random.default_rng(seed)
+    x = rng.normal(50.0, 15.0, n)
+    y = 3.0 * x + 2.0 + rng.normal(0.0, 5.0, n)
+    return x, y
+
+
+def make_frame(n: int, seed: int = 0, dirty: bool = True) -> pd.DataFrame:
+    """
+    DataFrame of n rows with columns x and y.
+
+    Dirty frames look like a messy upload: some missing values, non-numeric
+    strings in x (so the column has object dtype, as pd.read_csv would give),
+    duplicated rows and extreme y values. The defect positions depend only on
+    the seed, so every run cleans exactly the same rows.
+    """
+    x, y = make_xy(n, seed)
+    df = pd.DataFrame({X_COLUMN: x, Y_COLUMN: y})
+    if not dirty or n < 10:
+        return df
+
+    rng = np.random.default_rng(seed + 1)
+    rows = rng.permutation(n)
+    counts = [max(1, int(n * f)) for f in (MISSING_FRACTION, STRING_FRACTION, DUPLICATE_FRACTION, OUTLIER_FRACTION)]
+    bounds = np.cumsum([0] + counts)
+    missing, strings, duplicates, outliers = (rows[bounds[i]:bounds[i + 1]] for i in range(4))
+
+    # Duplicates copy other rows in place, so the frame keeps n rows
+    sources = rng.integers(0, n, len(duplicates))
+    df.iloc[duplicates] = df.iloc[sources].to_numpy()
+
+    df.loc[outliers, Y_COLUMN] += 50.0 * df[Y_COLUMN].std()
+    df.loc[missing[::2], X_COLUMN] = np.nan
+    df.loc[missing[1::2], Y_COLUMN] = np.nan
+
+    x_values = df[X_COLUMN].to_numpy(dtype=object)
+    x_values[strings] = "n/a"
+    df[X_COLUMN] = x_values
+    return df
+
+
+def make_csv_bytes(n: int, seed: int = 0, dirty: bool = True) -> bytes:
+    """The dataset of make_frame encoded as CSV."""
+    return make_frame(n, seed, dirty).to_csv(index=False).encode('utf-8')
@@ -0,0 +1,568 @@
+"""
+Benchmark Suite.
+Times the ingest, cleaning, training and serving hot paths on seeded synthetic
+data, saves the results as JSON and flags regressions against a stored baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py                        # everything, 1e3 … 1e7 rows
+    python benchmarks/run_benchmarks.py --quick                # 1e3 … 1e5 rows, one repetition
+    python benchmarks/run_benchmarks.py --only predict,train_epoch --sizes 1e4,1e6
+    python benchmarks/run_benchmarks.py --save-baseline        # record benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --compare results.json --baseline benchmarks/baseline.json
+
+With --baseline the exit status is 1 if any benchmark regressed, so the suite
+can gate a CI job.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, REPO_ROOT)
+
+import datasets  # noqa: E402  (benchmarks/datasets.py)
+from backend.csv_loader import CSVLoader  # noqa: E402
+from backend.linear_regression import LinearRegressionModel  # noqa: E402
+from backend.metrics_calculator import MetricsCalculator  # noqa: E402
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+QUICK_SIZES = [10 ** 3, 10 ** 4, 10 ** 5]
+DEFAULT_REPEAT = 3
+DEFAULT_EPOCHS = 50
+DEFAULT_SEED = 0
+
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+# A benchmark regresses when its median is this fraction slower than the baseline
+DEFAULT_THRESHOLD = 0.15
+
+# Medians below this many seconds are timer noise and never flagged
+MIN_COMPARE_SECONDS = 0.001
+
+
+class Case:
+    """
+    One timed operation.
+
+    setup() builds a fresh state outside the timer before every repetition and
+    run(state) is what gets timed. ops is the number of units of work per run
+    (e.g. epochs), used for per-op time and throughput.
+    """
+
+    def __init__(self, variant: str, run: Callable[[Any], Any],
+                 setup: Optional[Callable[[], Any]] = None, ops: int = 1):
+        self.variant = variant
+        self.run = run
+        self.setup = setup
+        self.ops = ops
+
+
+class BenchmarkContext:
+    """Run options plus the data of the current size, built once and shared by all benchmarks."""
+
+    def __init__(self, seed: int, epochs: int, verbose: bool):
+        self.seed = seed
+        self.epochs = epochs
+        self.verbose = verbose
+        self._data: Dict[str, Any] = {}
+        self._data_rows: Optional[int] = None
+        self._api: Optional["ApiClient"] = None
+        self._devnull = open(os.devnull, "w")
+
+    def data(self, n: int, name: str, build: Callable[[], Any]) -> Any:
+        """Cached per-size data; switching size drops the previous size's data."""
+        if self._data_rows != n:
+            self._data.clear()
+            self._data_rows = n
+        if name not in self._data:
+            with self.quiet():
+                self._data[name] = build()
+        return self._data[name]
+
+    def frame(self, n: int) -> pd.DataFrame:
+        return self.data(n, "frame", lambda: datasets.make_frame(n, self.seed, dirty=True))
+
+    def xy(self, n: int):
+        return self.data(n, "xy", lambda: datasets.make_xy(n, self.seed))
+
+    def csv_bytes(self, n: int) -> bytes:
+        return self.data(n, "csv", lambda: datasets.make_csv_bytes(n, self.seed, dirty=True))
+
+    def api(self) -> "ApiClient":
+        if self._api is None:
+            self._api = ApiClient()
+        return self._api
+
+    def quiet(self):
+        """Silence the emoji progress prints of the code under test."""
+        if self.verbose:
+            return contextlib.nullcontext()
+        return contextlib.redirect_stdout(self._devnull)
+
+    def close(self):
+        self._devnull.close()
+        if self._api is not None:
+            self._api.close()
+
+
+class ApiClient:
+    """
+    In-process ASGI client for api_server (no uvicorn, no sockets).
+
+    The dataset cache and model database point at a temporary directory so the
+    benchmarks neither read nor pollute the real ones.
+    """
+
+    def __init__(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix="lr_bench_")
+        os.environ["DATASET_CACHE_DIR"] = os.path.join(self.tmp_dir, "dataset_cache")
+        os.environ["MODEL_DB_FILE"] = os.path.join(self.tmp_dir, "models.db")
+        os.chdir(REPO_ROOT)  # api_server mounts static/ relative to the working directory
+
+        import api_server
+        self.server = api_server
+        self.loop = asyncio.new_event_loop()
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=api_server.app), base_url="http://benchmark", timeout=None
+        )
+        self.session_id: Optional[str] = None
+
+    def post(self, path: str, **kwargs) -> "httpx.Response":
+        """POST within the benchmark session, reading the whole (possibly streamed) body."""
+        headers = {self.server.SESSION_HEADER: self.session_id} if self.session_id else {}
+        response = self.loop.run_until_complete(self.client.post(path, headers=headers, **kwargs))
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}: {response.text[:200]}")
+        self.session_id = response.headers.get(self.server.SESSION_HEADER, self.session_id)
+        return response
+
+    def clear_dataset_cache(self):
+        cache_dir = self.server.dataset_cache.cache_dir
+        for name in os.listdir(cache_dir):
+            shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+
+    def close(self):
+        self.loop.run_until_complete(self.client.aclose())
+        self.loop.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks: each yields the cases to time for n rows
+# ---------------------------------------------------------------------------
+
+def bench_clean_data(n: int, ctx: BenchmarkContext) -> Iterable[Case]:
+    """CSVLoader.clean_data on a dirty frame under every option combination, and a cached re-clean."""
+    df = ctx.frame(n)
+    loader = CSVLoader(datasets.X_COLUMN, datasets.Y_COLUMN)
+    for duplicates, outliers, missing, strings in itertools.product(
+            (True, False), (False, True), ("remove", "mean"), (True, False)):
+        options = dict(remove_duplicates=duplicates, remove_outliers=outliers,
+                       handle_missing=missing, remove_strings=strings)
+        variant = f"dup={int(duplicates)},out={int(outliers)},missing={missing},strings={int(strings)}"
+        yield Case(variant, lambda _, options=options: loader.clean_data(df, **options))
+
+    # Re-cleaning through a kept pipeline whose stages are all cached (an option flipped back)
+    pipeline = loader.pipeline(df)
+    pipeline.clean()
+    yield Case("pipeline=cached", lambda _: pipeline.clean())
+
+
+def bench_model_init(n: int, ctx: BenchmarkContext) -> Iterable[Case]:
+    """LinearRegressionModel construction (normalization, moments, metrics sample)."""
+    x, y = ctx.xy(n)
+    yield Case("default", lambda _: LinearRegressionModel(x, y))
+
+
+def bench_set_training_data(n: int, ctx: BenchmarkContext) -> Iterable[Case]:
+    """LinearRegressionModel.set_training_data on an 80% training split."""
+    x, y = ctx.xy(n)
+    split = max(1, int(n * 0.8))
+    model = ctx.data(n, "model:set_training_data", lambda: LinearRegressionModel(x, y))
+    yield Case("train_split=0.8", lambda _: model.set_training_data(x[:split], y[:split]))
+
+
+def bench_train_epoch(n: int, ctx: BenchmarkContext) -> Iterable[Case]:
+    """train_epoch_by_epoch for a fixed number of epochs (no early stop), per engine and metrics mode."""
+    x, y = ctx.xy(n)
+    # A model of its own: set_training_data leaves its model on a split
+    model = ctx.data(n, "model:train_epoch", lambda: LinearRegressionModel(x, y))
+
+    def reset():
+        model.theta0 = model.theta1 = 0.0
+        model.metrics_calculator.reset_history()
+        return model
+
+    for engine, metrics_mode in itertools.product(("moments", "full"), ("exact", "fast")):
+        def run(m, engine=engine, metrics_mode=metrics_mode):
+            for _ in m.train_epoch_by_epoch(0.01, ctx.epochs, tolerance=0.0, early_stopping=False,
+                                            engine=engine, metrics_mode=metrics_mode):
+                pass
+        yield Case(f"engine={engine},metrics={metrics_mode}", run, setup=reset, ops=ctx.epochs)
+
+
+def bench_predict(n: int, ctx: BenchmarkContext) -> Iterable[Case]:
+    """LinearRegressionModel.predict over all rows."""
+    x, y = ctx.xy(n)
+    model = ctx.data(n, "model:predict", lambda: LinearRegressionModel(x, y))
+    model.theta0, model.theta1 = 0.01, 0.99
+    yield Case("default", lambda _: model.predict(x))
+
+
+def bench_calculate_metrics(n: int, ctx: BenchmarkContext) -> Iterable[Case]:
+    """MetricsCalculator.calculate_metrics (RMSE, MAE, R²) over all rows."""
+    x, y = ctx.xy(n)
+    y_pred = 3.0 * x + 2.0
+    calculator = MetricsCalculator()
+    yield Case("default", lambda _: calculator.calculate_metrics(y, y_pred, epoch=1, store=False))
+
+
+def bench_api_process_data(n: int, ctx: BenchmarkContext) -> Iterable[Case]:
+    """POST /api/process-data end to end, with a cold and a warm dataset cache."""
+    api = ctx.api()
+    files = {"file": ("bench.csv", ctx.csv_bytes(n), "text/csv")}
+    form = {"x_column": datasets.X_COLUMN, "y_column": datasets.Y_COLUMN}
+
+    def upload(_):
+        api.post("/api/process-data", files=files, data=form)
+
+    yield Case("cache=cold", upload, setup=api.clear_dataset_cache)
+    yield Case("cache=warm", upload)
+
+
+def bench_api_start_training(n: int, ctx: BenchmarkContext) -> Iterable[Case]:
+    """POST /api/start-training end to end at full speed, reading the whole event stream."""
+    api = ctx.api()
+    ctx.data(n, "api_dataset", lambda: api.post(
+        "/api/process-data",
+        files={"file": ("bench.csv", ctx.csv_bytes(n), "text/csv")},
+        data={"x_column": datasets.X_COLUMN, "y_column": datasets.Y_COLUMN}
+    ))
+    base = {"learning_rate": "0.01", "tolerance": "0", "early_stopping": "false", "training_speed": "max"}
+
+    yield Case("solver=gd", lambda _: api.post(
+        "/api/start-training", data={**base, "epochs": str(ctx.epochs), "solver": "gd"}), ops=ctx.epochs)
+    yield Case("solver=normal_equation", lambda _: api.post(
+        "/api/start-training", data={**base, "epochs": "1", "solver": "normal_equation"}))
+
+
+BENCHMARKS: Dict[str, Callable[[int, BenchmarkContext], Iterable[Case]]] = {
+    "clean_data": bench_clean_data,
+    "model_init": bench_model_init,
+    "set_training_data": bench_set_training_data,
+    "train_epoch": bench_train_epoch,
+    "predict": bench_predict,
+    "calculate_metrics": bench_calculate_metrics,
+    "api_process_data": bench_api_process_data,
+    "api_start_training": bench_api_start_training,
+}
+
+API_BENCHMARKS = ("api_process_data", "api_start_training")
+
+
+# ---------------------------------------------------------------------------
+# Running
+# ---------------------------------------------------------------------------
+
+def time_case(case: Case, ctx: BenchmarkContext, repeat: int, warmup: int) -> List[float]:
+    """Wall-clock seconds of each timed repetition (warmup runs are discarded)."""
+    timings = []
+    for i in range(warmup + repeat):
+        with ctx.quiet():
+            state = case.setup() if case.setup is not None else None
+            start = time.perf_counter()
+            case.run(state)
+            elapsed = time.perf_counter() - start
+        if i >= warmup:
+            timings.append(elapsed)
+    return timings
+
+
+def summarize(benchmark: str, case: Case, rows: int, timings: List[float]) -> Dict[str, Any]:
+    """Result record of one case."""
+    median = statistics.median(timings)
+    return {
+        "benchmark": benchmark,
+        "variant": case.variant,
+        "rows": rows,
+        "ops": case.ops,
+        "repeat": len(timings),
+        "min_s": min(timings),
+        "median_s": median,
+        "mean_s": statistics.fmean(timings),
+        "stdev_s": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "per_op_s": median / case.ops,
+        "rows_per_s": rows * case.ops / median if median > 0 else None,
+    }
+
+
+def iter_cases(name: str, n: int, ctx: BenchmarkContext,
+               results: List[Dict[str, Any]]) -> Iterable[Case]:
+    """Cases of one benchmark; a setup error is recorded (variant "setup") and ends the benchmark only."""
+    cases = iter(BENCHMARKS[name](n, ctx))
+    while True:
+        try:
+            case = next(cases)
+        except StopIteration:
+            return
+        except Exception as e:
+            print(f"   ❌ {name}[setup]: {type(e).__name__}: {e}")
+            results.append({"benchmark": name, "variant": "setup", "rows": n,
+                            "error": f"{type(e).__name__}: {e}"})
+            return
+        yield case
+
+
+def run_benchmarks(names: List[str], sizes: List[int], repeat: int, warmup: int,
+                   ctx: BenchmarkContext) -> List[Dict[str, Any]]:
+    """Run the selected benchmarks at every size, smallest size first."""
+    results = []
+    for n in sizes:
+        print(f"📏 {n:,} rows")
+        for name in names:
+            for case in iter_cases(name, n, ctx, results):
+                try:
+                    timings = time_case(case, ctx, repeat, warmup)
+                except Exception as e:
+                    # A failing case is recorded, not fatal: the rest of the suite still runs
+                    print(f"   ❌ {name}[{case.variant}]: {type(e).__name__}: {e}")
+                    results.append({"benchmark": name, "variant": case.variant, "rows": n,
+                                    "error": f"{type(e).__name__}: {e}"})
+                    continue
+                record = summarize(name, case, n, timings)
+                results.append(record)
+                per_op = f" ({record['per_op_s'] * 1e3:.4f} ms/op)" if case.ops > 1 else ""
+                print(f"   ⏱️ {name}[{case.variant}]: {record['median_s'] * 1e3:.3f} ms{per_op}")
+    return results
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_info() -> Dict[str, Any]:
+    """Machine and library versions recorded with every run (timings only compare on like hardware)."""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------------------------
+
+def result_key(record: Dict[str, Any]):
+    return record["benchmark"], record["variant"], record["rows"]
+
+
+def compare_results(current: List[Dict[str, Any]], baseline: List[Dict[str, Any]],
+                    threshold: float = DEFAULT_THRESHOLD,
+                    min_seconds: float = MIN_COMPARE_SECONDS) -> List[Dict[str, Any]]:
+    """
+    Compare median timings with a baseline run.
+
+    Args:
+        current: Results of the run under test
+        baseline: Results of the reference run
+        threshold: Relative slowdown (e.g. 0.15 = 15%) that counts as a regression
+        min_seconds: Cases faster than this in both runs are never flagged
+
+    Returns:
+        One row per case in the current run, with status "regression",
+        "improvement", "ok", "new" or "error" (the case failed in this run)
+    """
+    reference = {result_key(r): r for r in baseline if "median_s" in r}
+    rows = []
+    for record in current:
+        base = reference.get(result_key(record))
+        row = {
+            "benchmark": record["benchmark"],
+            "variant": record["variant"],
+            "rows": record["rows"],
+            "current_s": record.get("median_s"),
+            "baseline_s": base["median_s"] if base else None,
+            "ratio": None,
+            "status": "new",
+        }
+        if "error" in record:
+            row["status"] = "error"
+        elif base is not None and base["median_s"] > 0:
+            ratio = record["median_s"] / base["median_s"]
+            row["ratio"] = ratio
+            if max(record["median_s"], base["median_s"]) < min_seconds:
+                row["status"] = "ok"
+            elif ratio > 1 + threshold:
+                row["status"] = "regression"
+            elif ratio < 1 / (1 + threshold):
+                row["status"] = "improvement"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]], threshold: float):
+    icons = {"regression": "❌", "improvement": "🚀", "ok": "✅", "new": "🆕", "error": "💥"}
+    print(f"\n📊 Comparison with baseline (threshold {threshold:.0%}):")
+    for row in rows:
+        label = f"{row['benchmark']}[{row['variant']}] @ {row['rows']:,}"
+        if row["status"] == "error":
+            print(f"   {icons['error']} {label}: failed")
+        elif row["ratio"] is None:
+            print(f"   {icons[row['status']]} {label}: {row['current_s'] * 1e3:.3f} ms (no baseline)")
+        else:
+            print(f"   {icons[row['status']]} {label}: {row['baseline_s'] * 1e3:.3f} → "
+                  f"{row['current_s'] * 1e3:.3f} ms ({row['ratio']:.2f}×)")
+    regressions = sum(row["status"] == "regression" for row in rows)
+    improvements = sum(row["status"] == "improvement" for row in rows)
+    print(f"\n{'❌' if regressions else '✅'} {regressions} regressions, {improvements} improvements, "
+          f"{len(rows)} cases compared")
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_results(path: str, report: Dict[str, Any]):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Results saved to {path}")
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def parse_sizes(value: str) -> List[int]:
+    try:
+        return [int(float(part)) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid sizes: {value}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the linear regression backend on synthetic data.")
+    parser.add_argument("--sizes", type=parse_sizes, default=None,
+                        help="Comma-separated row counts (default: 1e3,1e4,1e5,1e6,1e7)")
+    parser.add_argument("--only", default=None,
+                        help=f"Comma-separated benchmarks to run ({', '.join(BENCHMARKS)})")
+    parser.add_argument("--repeat", type=int, default=None,
+                        help=f"Timed repetitions per case (default: {DEFAULT_REPEAT})")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs before timing each case")
+    parser.add_argument("--epochs", type=int, default=DEFAULT_EPOCHS, help="Epochs per training run")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed of the synthetic datasets")
+    parser.add_argument("--quick", action="store_true", help="Sizes 1e3..1e5 and one repetition")
+    parser.add_argument("--output", default=None, help="Results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", default=None, help="Baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Also write the results to the baseline file (default: benchmarks/baseline.json)")
+    parser.add_argument("--compare", default=None, metavar="RESULTS",
+                        help="Compare an existing results file with --baseline instead of running")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown that counts as a regression (default: 0.15)")
+    parser.add_argument("--verbose", action="store_true", help="Show the output of the code under test")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    if args.compare:
+        if not args.baseline:
+            print("❌ --compare needs --baseline")
+            return 2
+        rows = compare_results(load_results(args.compare)["results"], load_results(args.baseline)["results"],
+                               args.threshold)
+        print_comparison(rows, args.threshold)
+        return 1 if any(row["status"] == "regression" for row in rows) else 0
+
+    names = list(BENCHMARKS) if args.only is None else [name.strip() for name in args.only.split(",")]
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        print(f"❌ Unknown benchmarks: {unknown}")
+        return 2
+    if not HTTPX_AVAILABLE and any(name in API_BENCHMARKS for name in names):
+        print("⚠️ httpx is not installed, skipping the API benchmarks")
+        names = [name for name in names if name not in API_BENCHMARKS]
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else DEFAULT_SIZES)
+    repeat = args.repeat or (1 if args.quick else DEFAULT_REPEAT)
+
+    # Paths are resolved up front: the API benchmarks change the working directory
+    output = os.path.abspath(args.output or os.path.join(
+        RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json"))
+    baseline_path = os.path.abspath(args.baseline or DEFAULT_BASELINE)
+
+    print(f"🏁 Running {len(names)} benchmarks at {len(sizes)} sizes ({repeat} repetitions, {args.warmup} warmup)")
+    ctx = BenchmarkContext(args.seed, args.epochs, args.verbose)
+    try:
+        results = run_benchmarks(names, sizes, repeat, args.warmup, ctx)
+    finally:
+        ctx.close()
+
+    report = {
+        "meta": {
+            **environment_info(),
+            "sizes": sizes,
+            "repeat": repeat,
+            "warmup": args.warmup,
+            "epochs": args.epochs,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    save_results(output, report)
+
+    status = 0
+    if args.baseline and os.path.exists(baseline_path):
+        rows = compare_results(results, load_results(baseline_path)["results"], args.threshold)
+        print_comparison(rows, args.threshold)
+        status = 1 if any(row["status"] == "regression" for row in rows) else 0
+    elif args.baseline:
+        print(f"⚠️ Baseline {baseline_path} not found, nothing to compare")
+
+    if args.save_baseline:
+        save_results(baseline_path, report)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
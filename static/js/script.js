@@ -625,22 +625,45 @@ async function processDataWithCleaning() {
         const handleMissing = document.querySelector('input[name="missingY"]:checked').value;
         
         // Create FormData and send
-        const formData = new FormData();
-        formData.append('file', file);
-        formData.append('x_column', xColumn);
-        formData.append('y_column', yColumn);
-        formData.append('remove_duplicates', removeDuplicates);
-        formData.append('remove_outliers', removeOutliers);
-        formData.append('handle_missing', handleMissing);
+        const optionsData = new FormData();
+        optionsData.append('remove_duplicates', removeDuplicates);
+        optionsData.append('remove_outliers', removeOutliers);
+        optionsData.append('handle_missing', handleMissing);
+        // Cleaned points are fetched as binary columns by the training page
+        optionsData.append('transport', 'binary');
         
-        // Send to backend
-        const response = await fetch(`${API_BASE_URL}/process-data`, {
-            method: 'POST',
-            body: formData
-        });
+        // Same file and columns as last time: only re-clean on the server, no re-upload
+        const datasetSignature = [file.name, file.size, file.lastModified, xColumn, yColumn].join('|');
+        let response = null;
+        if (sessionStorage.getItem('processedDataset') === datasetSignature) {
+            response = await fetch(`${API_BASE_URL}/reclean`, {
+                method: 'POST',
+                body: optionsData
+            });
+            if (response.status === 400 || response.status === 409) {
+                response = null;
+            }
+        }
+        
+        if (response === null) {
+            const formData = new FormData();
+            formData.append('file', file);
+            formData.append('x_column', xColumn);
+            formData.append('y_column', yColumn);
+            for (const [key, value] of optionsData.entries()) {
+                formData.append(key, value);
+            }
+            
+            // Send to backend
+            response = await fetch(`${API_BASE_URL}/process-data`, {
+                method: 'POST',
+                body: formData
+            });
+        }
         
         if (response.ok) {
             const result = await response.json();
+            sessionStorage.setItem('processedDataset', datasetSignature);
             
             // Store the complete response for training page
             localStorage.setItem('trainingData', JSON.stringify(result));
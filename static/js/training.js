@@ -22,6 +22,13 @@ async function loadTrainingData() {
         }
         
         trainingData = JSON.parse(trainingDataStr);
+        
+        // Binary transport: fetch the cleaned columns instead of reading them from JSON
+        if (trainingData.dataset && !trainingData.statistics.x_data) {
+            const columns = await fetchDatasetColumns(trainingData.dataset);
+            trainingData.statistics.x_data = columns[0];
+            trainingData.statistics.y_data = columns[1];
+        }
         console.log('📊 Training data loaded:', trainingData);
         console.log('📋 Training data keys:', Object.keys(trainingData));
         
@@ -64,6 +71,22 @@ async function loadTrainingData() {
     }
 }
 
+// Fetch dataset columns sent as consecutive little-endian Float64 buffers
+async function fetchDatasetColumns(dataset) {
+    const response = await fetch(`${dataset.columns_url}?dtype=float64&format=raw`);
+    if (!response.ok) {
+        throw new Error(`Failed to fetch dataset columns (${response.status})`);
+    }
+    
+    const rows = parseInt(response.headers.get('X-Rows'), 10);
+    const names = response.headers.get('X-Columns').split(',');
+    const buffer = await response.arrayBuffer();
+    console.log(`📦 Received ${names.length} binary columns (${rows} rows, ${buffer.byteLength} bytes)`);
+    
+    // Plain arrays, since the plotting code maps points to objects
+    return names.map((_, i) => Array.from(new Float64Array(buffer, i * rows * 8, rows)));
+}
+
 // Auto-load when page loads
 document.addEventListener('DOMContentLoaded', function() {
     console.log('🚀 Page loaded, initializing...');
@@ -476,6 +499,10 @@ function createDataVisualizations() {
             
             // Create plots using the same functions as script.js
             createScatterPlot(validData, xColumn, yColumn);
+            if (trainingData.dataset) {
+                // Large datasets: replace the raw points with a server-side LTTB downsample
+                loadScatterDownsample(xColumn, yColumn);
+            }
             createDensityPlot(validData, xColumn, yColumn);
             createCostChart(); // Also create the cost chart
             
@@ -538,6 +565,23 @@ function createScatterPlot(data, xCol, yCol) {
     });
 }
 
+// Plot a downsample sized to the scatter canvas instead of every raw point
+async function loadScatterDownsample(xCol, yCol) {
+    try {
+        const canvas = document.getElementById('scatterChart');
+        const width = Math.max(100, Math.round(canvas ? canvas.clientWidth : 800));
+        const response = await fetch(`/api/plot-data?mode=lttb&width=${width}`);
+        if (!response.ok) return;
+        
+        const plotData = await response.json();
+        const points = plotData.x.map((x, i) => ({ [xCol]: x, [yCol]: plotData.y[i] }));
+        createScatterPlot(points, xCol, yCol);
+        console.log(`📉 Scatter downsampled: ${points.length} of ${plotData.total_points} points`);
+    } catch (error) {
+        console.error('❌ Error loading scatter downsample:', error);
+    }
+}
+
 function createDensityPlot(data, xCol, yCol) {
     console.log('🔄 Creating density plot with data:', { data: data.length, xCol, yCol });
     
@@ -747,7 +791,9 @@ function startTraining() {
     formData.append('epochs', epochs);
     formData.append('tolerance', tolerance);
     formData.append('early_stopping', earlyStopping);
-    formData.append('training_speed', trainingSpeed);
+    // Max speed: no delay between epochs, the backend streams a decimated trajectory
+    const maxSpeed = document.getElementById('maxSpeed')?.checked;
+    formData.append('training_speed', maxSpeed ? 'max' : trainingSpeed);
     formData.append('train_split', trainSplit);
     
     // Start streaming training
@@ -0,0 +1,128 @@
+"""CleaningPipeline against the original pandas cleaning semantics, and its stage cache."""
+
+import itertools
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.csv_loader import CSVLoader, CleaningPipeline
+from backend.data_processor import DataProcessor
+
+OPTIONS = [
+    dict(remove_duplicates=duplicates, remove_outliers=outliers, handle_missing=missing, remove_strings=strings)
+    for duplicates, outliers, missing, strings in itertools.product(
+        (True, False), (True, False), ("remove", "mean"), (True, False))
+]
+
+
+def dirty_frame(n=3000, seed=0):
+    """Integer-valued X/Y (so duplicates occur) with missing values, strings and outliers."""
+    rng = np.random.default_rng(seed)
+    x = rng.integers(0, 60, n).astype(object)
+    y = rng.integers(0, 25, n).astype(object)
+    x[rng.choice(n, 60, replace=False)] = np.nan
+    y[rng.choice(n, 60, replace=False)] = "n/a"
+    x[rng.choice(n, 8, replace=False)] = 1e6
+    return pd.DataFrame({"x": x, "y": y})
+
+
+def baseline_clean(df, remove_duplicates, remove_outliers, handle_missing, remove_strings):
+    """The cleaning CSVLoader.clean_data did before the float-block rewrite (remove_strings=True)."""
+    assert remove_strings
+    numeric = pd.Series(True, index=df.index)
+    for column in ("x", "y"):
+        numeric &= pd.to_numeric(df[column], errors='coerce').notna()
+    df = df[numeric].copy()
+    if handle_missing == "mean":
+        for column in ("x", "y"):
+            df[column] = df[column].fillna(df[column].mean())
+    else:
+        df = df.dropna(subset=["x", "y"])
+    if remove_duplicates:
+        df = df.drop_duplicates()
+    if remove_outliers:
+        q1, q3 = df[["x"]].quantile(0.25), df[["x"]].quantile(0.75)
+        iqr = q3 - q1
+        df = df[((df[["x"]] >= q1 - 1.5 * iqr) & (df[["x"]] <= q3 + 1.5 * iqr)).all(axis=1)]
+    for column in ("x", "y"):
+        df[column] = pd.to_numeric(df[column], errors='coerce')
+    return df.astype(np.float64)
+
+
+@pytest.mark.parametrize("options", [o for o in OPTIONS if o["remove_strings"]],
+                         ids=lambda o: ",".join(f"{k}={v}" for k, v in o.items()))
+def test_clean_data_matches_baseline(options):
+    df = dirty_frame()
+    expected = baseline_clean(df, **options)
+    result = CSVLoader("x", "y").clean_data(df, **options)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=True)
+
+
+@pytest.mark.parametrize("handle_missing", ["remove", "mean"])
+def test_strings_count_as_missing_when_kept(handle_missing):
+    df = pd.DataFrame({"x": [1, 2, "a", 4, None], "y": [1.0, 2.0, 3.0, "b", 5.0]})
+    result = CSVLoader("x", "y").clean_data(df, remove_duplicates=False, handle_missing=handle_missing,
+                                             remove_strings=False)
+    if handle_missing == "remove":
+        assert result.index.tolist() == [0, 1]
+    else:
+        assert result.index.tolist() == [0, 1, 2, 3, 4]
+        assert result.loc[2, "x"] == pytest.approx(np.mean([1, 2, 4]))
+        assert result.loc[3, "y"] == pytest.approx(np.mean([1.0, 2.0, 3.0, 5.0]))
+    assert not result.isna().any().any()
+
+
+def test_pipeline_matches_fresh_cleaning_in_any_order():
+    df = dirty_frame(seed=1)
+    loader = CSVLoader("x", "y")
+    pipeline = loader.pipeline(df)
+    rng = np.random.default_rng(2)
+    for i in rng.permutation(len(OPTIONS)).tolist() * 2:
+        pd.testing.assert_frame_equal(pipeline.clean(**OPTIONS[i]), loader.clean_data(df, **OPTIONS[i]))
+
+
+def test_toggling_an_option_recomputes_only_downstream_stages():
+    pipeline = CSVLoader("x", "y").pipeline(dirty_frame())
+    pipeline.clean()
+    assert pipeline.last_recomputed == list(CleaningPipeline.STAGES)
+
+    pipeline.clean(remove_outliers=True)
+    assert pipeline.last_recomputed == ["outliers"]
+
+    pipeline.clean(remove_duplicates=False)
+    assert pipeline.last_recomputed == ["duplicates", "outliers"]
+
+    pipeline.clean(handle_missing="mean")
+    assert pipeline.last_recomputed == ["missing", "duplicates", "outliers"]
+
+    pipeline.clean()
+    assert pipeline.last_recomputed == []
+
+
+def test_mean_fill_does_not_leak_into_other_options():
+    pipeline = CSVLoader("x", "y").pipeline(dirty_frame())
+    filled = pipeline.clean(handle_missing="mean", remove_strings=False)
+    removed = pipeline.clean(handle_missing="remove", remove_strings=False)
+    assert len(filled) > len(removed)
+    assert not removed.isna().any().any()
+
+
+def test_pipeline_survives_pickling():
+    pipeline = CSVLoader("x", "y").pipeline(dirty_frame())
+    expected = pipeline.clean(remove_outliers=True)
+    restored = pickle.loads(pickle.dumps(pipeline))
+    pd.testing.assert_frame_equal(restored.clean(remove_outliers=True), expected)
+    assert restored.last_recomputed == []
+    assert restored.nbytes == pipeline.nbytes > 0
+
+
+def test_data_processor_clean_drops_strings_missing_and_duplicates():
+    df = dirty_frame()
+    df["label"] = "a"
+    expected = baseline_clean(df[["x", "y"]], remove_duplicates=True, remove_outliers=False,
+                              handle_missing="remove", remove_strings=True)
+    result = DataProcessor("x", "y").clean(df)
+    pd.testing.assert_frame_equal(result[["x", "y"]], expected)
+    assert (result["label"] == "a").all()
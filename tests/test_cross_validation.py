@@ -0,0 +1,45 @@
+"""CrossValidator results for converging and exploding gradient descent."""
+
+import numpy as np
+import pytest
+
+from backend.cross_validation import CrossValidator
+
+
+def make_validator(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(50.0, 12.0, n)
+    return CrossValidator(x, 3.0 * x + rng.normal(0.0, 5.0, n))
+
+
+def test_gd_matches_normal_equation():
+    validator = make_validator()
+    closed = validator.run("normal_equation")
+    gd = validator.run("gd", learning_rate=0.1, max_epochs=5000, tolerance=1e-14)
+    assert gd["aggregate"]["folds_exploded"] == 0
+    for name in ("rmse_mean", "r2_mean", "pooled_rmse"):
+        assert gd["aggregate"][name] == pytest.approx(closed["aggregate"][name], rel=1e-6)
+
+
+def test_exploded_folds_are_not_scored():
+    # Diverges without overflowing theta: only the cost overflows
+    result = make_validator().run("gd", learning_rate=2.5, max_epochs=1000)
+    assert all(fold["status"] == "exploded" for fold in result["folds"])
+    assert all(fold["rmse"] is None and fold["theta1"] is None for fold in result["folds"])
+    assert result["aggregate"]["folds_evaluated"] == 0
+    assert result["aggregate"]["rmse_mean"] is None and result["aggregate"]["pooled_r2"] is None
+
+
+def test_aggregate_leaves_out_exploded_folds():
+    validator = make_validator()
+    params = np.tile([0.0, 3.0], (validator.folds.k, 1))
+    exploded = np.zeros(validator.folds.k, dtype=bool)
+    exploded[1] = True
+    folds = validator._evaluate(params, exploded)
+    aggregate = validator._aggregate(folds)
+
+    scored = [fold["rmse"] for i, fold in enumerate(folds) if i != 1]
+    assert folds[1]["rmse"] is None
+    assert aggregate["folds_evaluated"] == validator.folds.k - 1
+    assert aggregate["rmse_mean"] == pytest.approx(np.mean(scored))
+    assert aggregate["pooled_rmse"] is None
@@ -0,0 +1,56 @@
+"""Chunked single-pass parsing of uploaded CSV files."""
+
+import gzip
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.csv_ingest import read_csv_columns
+
+
+def write_csv(path, text, compression=None):
+    if compression == "gzip":
+        with gzip.open(path, "wt", newline="") as f:
+            f.write(text)
+    else:
+        with open(path, "w", newline="") as f:
+            f.write(text)
+    return str(path)
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_numeric_columns_across_chunks(tmp_path, compression):
+    rows = [f"{i},{2 * i},{'ab'[i % 2]}" for i in range(1, 1001)]
+    rows[10] = "11,,a"
+    path = write_csv(tmp_path / "data.csv", "x,y,z\n" + "\n".join(rows) + "\n", compression)
+
+    df, all_columns = read_csv_columns(path, ["x", "y"], compression, chunk_rows=64)
+    assert all_columns == ["x", "y", "z"]
+    assert df.dtypes.tolist() == [np.float64, np.float64]
+    np.testing.assert_array_equal(df["x"], np.arange(1, 1001))
+    assert np.isnan(df["y"][10]) and df["y"][999] == 2000
+
+
+def test_only_the_non_numeric_column_becomes_objects(tmp_path):
+    rows = [f"{i},{i}" for i in range(200)]
+    rows[150] = "150,n/a-ish"
+    path = write_csv(tmp_path / "data.csv", "x,y\n" + "\n".join(rows))
+
+    df, _ = read_csv_columns(path, ["x", "y"], chunk_rows=64)
+    assert df["x"].dtype == np.float64 and df["y"].dtype == object
+    assert len(df) == 200
+    # Rows parsed before the switch keep their numeric values
+    assert pd.to_numeric(df["y"], errors="coerce").isna().tolist() == [i == 150 for i in range(200)]
+
+
+def test_bare_carriage_return_line_endings(tmp_path):
+    path = write_csv(tmp_path / "data.csv", "x,y\r1,2\r3,4\r")
+    df, _ = read_csv_columns(path, ["x", "y"])
+    assert df.to_dict("list") == {"x": [1.0, 3.0], "y": [2.0, 4.0]}
+
+
+def test_missing_column(tmp_path):
+    path = write_csv(tmp_path / "data.csv", "x,y\n1,2\n")
+    with pytest.raises(KeyError):
+        read_csv_columns(path, ["x", "w"])
@@ -0,0 +1,55 @@
+"""SessionRegistry budget enforcement: spilling, restoring and busy sessions."""
+
+import numpy as np
+
+from backend.session_registry import SessionRegistry
+
+
+def fill(registry, session_id, rows=1000):
+    session = registry.get(session_id)
+    session['x_clean'] = np.arange(rows, dtype=np.float64)
+    return session
+
+
+def test_spill_and_restore(tmp_path):
+    registry = SessionRegistry(memory_budget_bytes=10_000, spill_dir=str(tmp_path))
+    first = fill(registry, "a" * 32)
+    fill(registry, "b" * 32)
+    registry.enforce_budget()
+
+    assert first.is_spilled and 'x_clean' not in first
+    assert registry.spills == 1
+
+    restored = registry.acquire("a" * 32)
+    try:
+        assert restored is first and not first.is_spilled
+        np.testing.assert_array_equal(first['x_clean'], np.arange(1000, dtype=np.float64))
+        # Restoring it went over the budget again, so the other session was spilled
+        assert registry.stats()["spilled_sessions"] == 1
+        assert [p.name for p in tmp_path.iterdir()] == ["b" * 32 + ".pkl"]
+    finally:
+        registry.release(restored)
+
+
+def test_busy_sessions_are_not_spilled(tmp_path):
+    registry = SessionRegistry(memory_budget_bytes=10_000, spill_dir=str(tmp_path))
+    held = registry.acquire("a" * 32)
+    held['x_clean'] = np.arange(1000, dtype=np.float64)
+    fill(registry, "b" * 32)
+    registry.enforce_budget()
+
+    assert not held.is_spilled
+    registry.release(held)
+    # A session chosen for spilling is skipped if a request acquired it meanwhile
+    held.in_flight += 1
+    assert not held.spill(str(tmp_path))
+    held.in_flight -= 1
+    assert held.spill(str(tmp_path))
+
+
+def test_max_sessions_evicts_idle_sessions():
+    registry = SessionRegistry(memory_budget_bytes=1 << 30, max_sessions=2)
+    for i in range(4):
+        registry.get(f"{i:032x}")
+    assert registry.stats()["sessions"] == 2
+    assert registry.evictions == 2
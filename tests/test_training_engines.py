@@ -0,0 +1,118 @@
+"""Numeric parity of the moments and compiled training engines with the full-pass engine."""
+
+import numpy as np
+import pytest
+
+from backend import gd_kernels
+from backend.linear_regression import LinearRegressionModel
+
+
+def make_model(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(50.0, 12.0, n)
+    y = 3.5 * x - 7.0 + rng.normal(0.0, 5.0, n)
+    return LinearRegressionModel(x, y)
+
+
+def run_epochs(model, engine, epochs=300, learning_rate=0.05):
+    return list(model.train_epoch_by_epoch(learning_rate, epochs, tolerance=0.0, early_stopping=False,
+                                           engine=engine, metrics_mode="exact"))
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_moments_engine_matches_full_engine(seed):
+    full = run_epochs(make_model(seed=seed), "full")
+    moments = run_epochs(make_model(seed=seed), "moments")
+
+    assert len(moments) == len(full)
+    for key in ("theta0", "theta1", "cost", "rmse", "mae", "r2"):
+        np.testing.assert_allclose([e[key] for e in moments], [e[key] for e in full],
+                                   rtol=1e-9, atol=1e-12, err_msg=key)
+
+
+def test_moments_cost_matches_full_cost():
+    model = make_model()
+    for theta in ([0.0, 0.0], [0.3, -1.2], [-2.0, 4.5]):
+        theta = np.array(theta)
+        assert model.compute_cost_from_moments(theta) == pytest.approx(model.compute_cost(theta), rel=1e-10)
+        np.testing.assert_allclose(model.compute_cost_and_gradients_from_moments(theta),
+                                   model.compute_cost_and_gradients(theta), rtol=1e-9, atol=1e-12)
+
+
+def test_moments_engine_after_training_split():
+    full_model, moments_model = make_model(), make_model()
+    np.random.seed(3)
+    split = full_model.train_test_split(train_ratio=0.8)
+    for model in (full_model, moments_model):
+        model.set_training_data(split['x_train'], split['y_train'])
+
+    full = run_epochs(full_model, "full", epochs=100)
+    moments = run_epochs(moments_model, "moments", epochs=100)
+    assert moments[-1]["theta0"] == pytest.approx(full[-1]["theta0"], rel=1e-9, abs=1e-12)
+    assert moments[-1]["theta1"] == pytest.approx(full[-1]["theta1"], rel=1e-9, abs=1e-12)
+
+
+def test_compiled_engine_matches_moments_engine():
+    moments = run_epochs(make_model(), "moments", epochs=500)
+    compiled_model = make_model()
+    blocks = list(compiled_model.train_compiled(0.05, 500, tolerance=0.0, early_stopping=False, snapshot_every=1))
+    snapshots = np.concatenate(blocks)
+
+    np.testing.assert_array_equal(snapshots[:, 0], [e["epoch"] for e in moments])
+    np.testing.assert_allclose(snapshots[:, 1], [e["theta0"] for e in moments], rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(snapshots[:, 2], [e["theta1"] for e in moments], rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(snapshots[:, 3], [e["cost"] for e in moments], rtol=1e-9, atol=1e-12)
+
+
+def test_decimated_run_that_explodes_is_not_converged():
+    model = make_model()
+    events = list(model.train_decimated(50.0, 1000, tolerance=0.0, early_stopping=True, every_n_epochs=10))
+    assert events[-1]["is_complete"]
+    assert events[-1]["epoch"] < 1000
+    assert not events[-1]["converged"]
+
+
+def test_diverging_cost_counts_as_exploded():
+    # Diverges by ~1.5x per epoch: the cost overflows long before theta does
+    model = make_model()
+    results = {r["learning_rate"]: r for r in model.sweep([0.1, 2.5, 3.0], max_epochs=1000)}
+    for lr in (2.5, 3.0):
+        assert results[lr]["status"] == "exploded"
+        assert results[lr]["epochs_run"] < 1000
+        assert results[lr]["final_cost"] is None and results[lr]["theta0"] is None
+    assert results[0.1]["status"] == "early_stopped" and results[0.1]["rank"] == 1
+
+    compiled = make_model()
+    list(compiled.train_compiled(2.5, 1000, tolerance=0.0, early_stopping=False))
+    assert compiled.compiled_status == gd_kernels.STATUS_EXPLODED
+    full = run_epochs(make_model(), "full", epochs=1000, learning_rate=2.5)
+    assert len(full) < 1000 and np.isfinite(full[-1]["cost"])
+
+
+def test_epoch_metrics_are_flushed_during_a_run():
+    from backend.instrumentation import EPOCHS_TOTAL, stage_timer
+
+    model = make_model()
+    counter, timer = EPOCHS_TOTAL.labels(engine="moments"), stage_timer("epoch_compute", model.m)
+    epochs_before, observed_before = counter.get(), timer.snapshot()[2]
+    events = model.train_epoch_by_epoch(0.05, 1000, tolerance=0.0, early_stopping=False)
+    for _ in range(model.EPOCH_METRICS_FLUSH_EPOCHS + 10):
+        next(events)
+    # Visible before the run ends, one histogram observation per epoch
+    assert counter.get() - epochs_before == model.EPOCH_METRICS_FLUSH_EPOCHS
+    assert timer.snapshot()[2] - observed_before == model.EPOCH_METRICS_FLUSH_EPOCHS
+    events.close()
+    # The next epoch's step is computed before an epoch is yielded
+    assert counter.get() - epochs_before == model.EPOCH_METRICS_FLUSH_EPOCHS + 11
+
+
+def test_fast_metrics_run_that_explodes_ends_with_exact_metrics():
+    model = make_model()
+    events = list(model.train_epoch_by_epoch(2.5, 1000, tolerance=0.0, early_stopping=False,
+                                             metrics_mode="fast"))
+    final = events[-1]
+    assert len(events) < 1000
+    assert final["is_complete"] and final["metrics_exact"] and not final["converged"]
+    assert not any(e["metrics_exact"] for e in events[:-1])
+    assert model.metrics_calculator.get_metrics_history()["rmse"][-1] == final["rmse"]
+    assert (model.theta0, model.theta1) == (final["theta0"], final["theta1"])